@@ -0,0 +1,299 @@
+"""
+Append-only activity log of project and task changes.
+
+Mutating endpoints call ``activity_log.record`` before committing. The entry
+is kept on the session and moved to an in-memory buffer when the session
+commits (or dropped if it rolls back), so only committed changes are logged
+and the request never waits for the log. The ``ActivityFlusher`` thread of
+each worker writes the buffer with one batched INSERT every
+``settings.activity_flush_seconds``, or as soon as
+``settings.activity_batch_size`` entries are pending, and once more when the
+worker stops. Entries still buffered when a worker is killed are lost, which
+is the price of keeping the log off the request path.
+
+Entries store only the fields a change wrote (see ActivityEntry). Their IDs
+follow the order the buffers were written in, not the order of the changes,
+so project feeds are read newest first by the time each change was made,
+and task feeds and compaction by the task's row version recorded with each
+change, through the ``(project_id, created_at, id)`` and
+``(task_id, task_version, id)`` indexes with keyset pagination. Run ``python -m app.activity`` from a
+scheduler to apply the retention policy:
+
+- Compaction: a task's "updated" entries older than
+  ``settings.activity_compact_after_days`` are merged into one entry holding
+  the latest value of every field they wrote.
+- Retention: entries older than ``settings.activity_retention_days`` are
+  deleted.
+"""
+import argparse
+import json
+import threading
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, delete, event, func, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.activity import ActivityEntry
+from app.polling import PollingThread
+
+# Oldest entries are dropped beyond this many pending ones (database unreachable)
+MAX_PENDING = 100_000
+
+# Session.info key of the entries recorded in the session's transaction
+SESSION_KEY = "activity"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot store {type(value).__name__} in the activity log")
+
+
+def encode_changes(changes: Optional[dict]) -> str:
+    """
+    Serialize the fields written by a change as compact JSON.
+
+    Args:
+        changes: Field names and their new values
+
+    Returns:
+        str: JSON object without whitespace
+    """
+    return json.dumps(changes or {}, separators=(",", ":"), default=_json_value)
+
+
+class ActivityLog:
+    """
+    Buffer of activity entries waiting to be written.
+
+    Attributes:
+        batch_size: Pending entries that trigger an immediate flush
+    """
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.flush_requested = threading.Event()
+        self._pending: list[dict] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, db: Session, project_id: int, task_id: Optional[int], actor_id: int, action: str,
+               changes: Optional[dict] = None, task_version: Optional[int] = None) -> None:
+        """
+        Log a change once ``db`` commits, without touching the database.
+
+        Args:
+            db: Session making the change
+            project_id: ID of the project
+            task_id: ID of the task (None for changes to the project itself)
+            actor_id: ID of the user who made the change
+            action: What was done (e.g. "created", "updated")
+            changes: Fields written and their new values
+            task_version: Row version of the task after the change, ordering
+                the task's entries (see ActivityEntry)
+        """
+        db.info.setdefault(SESSION_KEY, []).append({
+            "project_id": project_id, "task_id": task_id, "actor_id": actor_id, "action": action,
+            "changes": encode_changes(changes), "created_at": datetime.utcnow(), "task_version": task_version})
+
+    def append(self, entries: list[dict]) -> None:
+        """
+        Buffer committed entries for the next flush.
+
+        Args:
+            entries: Entries recorded by a committed session
+        """
+        with self._lock:
+            self._pending.extend(entries)
+            if len(self._pending) > MAX_PENDING:
+                del self._pending[:len(self._pending) - MAX_PENDING]
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush_requested.set()
+
+    def drain(self) -> list[dict]:
+        """Remove and return the pending entries."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def flush(self, bind: Engine) -> int:
+        """
+        Write the pending entries with one batched INSERT.
+
+        On failure the entries are put back, ahead of any recorded since.
+
+        Args:
+            bind: Engine (or connection) holding the activity log
+
+        Returns:
+            int: Number of entries written
+        """
+        pending = self.drain()
+        if not pending:
+            return 0
+        try:
+            with Session(bind=bind) as session:
+                session.execute(insert(ActivityEntry), pending)
+                session.commit()
+        except Exception:
+            with self._lock:
+                self._pending[:0] = pending
+            raise
+        return len(pending)
+
+
+class ActivityFlusher(PollingThread):
+    """
+    Background thread in each worker writing the activity log.
+
+    Flushes every ``flush_seconds`` (the longest time an entry stays
+    buffered), or sooner when the buffer requests it. Entries of a failed
+    flush are retried on the next one.
+
+    Attributes:
+        bind: Engine holding the activity log
+        activity: Buffer to flush
+    """
+    failure_message = "Activity log flush failed"
+
+    def __init__(self, bind: Engine, activity: ActivityLog, flush_seconds: float = 1.0):
+        super().__init__("activity-flusher", flush_seconds)
+        self.bind = bind
+        self.activity = activity
+
+    def wait(self) -> bool:
+        self.activity.flush_requested.wait(self.interval)
+        self.activity.flush_requested.clear()
+        return self._stopped.is_set()
+
+    def poll(self) -> None:
+        self.activity.flush(self.bind)
+
+    def stop(self) -> None:
+        """Stop the thread after writing the remaining entries."""
+        super().stop()
+        self.activity.flush_requested.set()
+        self.join()
+        self.activity.flush(self.bind)
+
+
+def compact(db: Session, before: datetime, batch_size: Optional[int] = None) -> int:
+    """
+    Merge the "updated" entries of each task made before ``before`` into one.
+
+    Updates are merged in the order of the task versions they recorded, not
+    of their IDs. The merged entry keeps the ID, time and version of the
+    task's last update in the range and the latest value of every field
+    written. Commits once per batch
+    of tasks.
+
+    Args:
+        db: Database session
+        before: Only entries older than this are merged
+        batch_size: Tasks compacted per transaction (defaults to settings.activity_batch_size)
+
+    Returns:
+        int: Number of entries removed
+    """
+    batch_size = batch_size or settings.activity_batch_size
+    old_updates = (ActivityEntry.action == "updated") & (ActivityEntry.created_at < before)
+    removed = 0
+    while True:
+        task_ids = db.scalars(select(ActivityEntry.task_id).where(old_updates, ActivityEntry.task_id.is_not(None))
+                              .group_by(ActivityEntry.task_id).having(func.count() > 1).limit(batch_size)).all()
+        if not task_ids:
+            return removed
+        entries = db.execute(select(ActivityEntry.id, ActivityEntry.task_id, ActivityEntry.changes)
+                             .where(old_updates, ActivityEntry.task_id.in_(task_ids))
+                             .order_by(ActivityEntry.task_id, ActivityEntry.task_version, ActivityEntry.id)).all()
+        merged: dict[int, tuple[int, dict]] = {}
+        obsolete = []
+        for entry in entries:
+            if entry.task_id in merged:
+                previous_id, changes = merged[entry.task_id]
+                obsolete.append(previous_id)
+                changes.update(json.loads(entry.changes))
+            else:
+                changes = json.loads(entry.changes)
+            merged[entry.task_id] = (entry.id, changes)
+        for entry_id, changes in merged.values():
+            db.execute(update(ActivityEntry).where(ActivityEntry.id == entry_id)
+                       .values(changes=encode_changes(changes)))
+        db.execute(delete(ActivityEntry).where(ActivityEntry.id.in_(obsolete)))
+        db.commit()
+        removed += len(obsolete)
+
+
+def purge(db: Session, before: datetime, batch_size: Optional[int] = None) -> int:
+    """
+    Delete the entries made before ``before``, committing once per batch.
+
+    Args:
+        db: Database session
+        before: Entries older than this are deleted
+        batch_size: Entries deleted per transaction (defaults to settings.activity_batch_size)
+
+    Returns:
+        int: Number of entries deleted
+    """
+    batch_size = batch_size or settings.activity_batch_size
+    deleted = 0
+    while True:
+        ids = db.scalars(select(ActivityEntry.id).where(ActivityEntry.created_at < before)
+                         .order_by(ActivityEntry.created_at).limit(batch_size)).all()
+        if not ids:
+            return deleted
+        db.execute(delete(ActivityEntry).where(ActivityEntry.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Apply the activity log's compaction and retention policies.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.activity", description="Compact and expire the activity log")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--compact-after-days", type=int, default=settings.activity_compact_after_days)
+    parser.add_argument("--retention-days", type=int, default=settings.activity_retention_days)
+    args = parser.parse_args(argv)
+    now = datetime.utcnow()
+    with Session(create_engine(args.database_url)) as db:
+        compacted = compact(db, now - timedelta(days=args.compact_after_days))
+        purged = purge(db, now - timedelta(days=args.retention_days))
+    print(f"Compacted {compacted} and deleted {purged} activity entries")
+    return 0
+
+
+activity_log = ActivityLog(batch_size=settings.activity_batch_size)
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed(session: Session) -> None:
+    entries = session.info.pop(SESSION_KEY, None)
+    if entries:
+        activity_log.append(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(SESSION_KEY, None)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
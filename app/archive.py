@@ -0,0 +1,116 @@
+"""
+Hot/cold task archiving.
+
+Completed work is moved out of the hot ``tasks`` table into ``tasks_archive``
+so the indexes used by listings and filters only cover live tasks and stay
+small enough to remain cached. Rows keep their IDs, so archived tasks are
+still served by the task endpoints, which fall back to the archive.
+
+Moves run as INSERT ... SELECT plus DELETE in primary-key batches, with a
+commit per batch. Run ``python -m app.archive --older-than-days N`` from a
+scheduler to archive done tasks across all projects.
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine, delete, insert, literal, select, DateTime
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.task import ArchivedTask, Task
+from app.schemas.task import TaskStatus
+
+# Columns copied between the hot and cold tables
+MOVED_COLUMNS = [column.name for column in ArchivedTask.__table__.columns if column.name != "archived_at"]
+
+
+def _move(db: Session, source, target, where, batch_size: int, extra: Optional[dict] = None) -> int:
+    moved = 0
+    names = MOVED_COLUMNS + list(extra or {})
+    while True:
+        ids = db.scalars(select(source.c.id).where(where).order_by(source.c.id).limit(batch_size)).all()
+        if not ids:
+            return moved
+        values = [source.c[name] for name in MOVED_COLUMNS] + [literal(value, DateTime)
+                                                               for value in (extra or {}).values()]
+        # Re-check the condition: rows may have changed since the IDs were selected
+        batch = source.c.id.in_(ids) & where
+        db.execute(insert(target).from_select(names, select(*values).where(batch)))
+        moved += db.execute(delete(source).where(batch)).rowcount
+        db.commit()
+
+
+def archive_tasks(db: Session, where, batch_size: Optional[int] = None) -> int:
+    """
+    Move tasks matching a condition from the hot table into the archive.
+
+    Args:
+        db: Database session (committed after every batch)
+        where: SQL condition over the tasks table
+        batch_size: Tasks moved per transaction (defaults to settings.archive_batch_size)
+
+    Returns:
+        int: Number of tasks archived
+    """
+    return _move(db, Task.__table__, ArchivedTask.__table__, where, batch_size or settings.archive_batch_size,
+                 {"archived_at": datetime.utcnow()})
+
+
+def restore_tasks(db: Session, where, batch_size: Optional[int] = None) -> int:
+    """
+    Move archived tasks matching a condition back into the hot table.
+
+    Args:
+        db: Database session (committed after every batch)
+        where: SQL condition over the tasks_archive table
+        batch_size: Tasks moved per transaction (defaults to settings.archive_batch_size)
+
+    Returns:
+        int: Number of tasks restored
+    """
+    return _move(db, ArchivedTask.__table__, Task.__table__, where, batch_size or settings.archive_batch_size)
+
+
+def completed_tasks(project_id: Optional[int] = None, completed_before: Optional[datetime] = None):
+    """
+    Build the condition selecting done tasks, optionally for one project and by age.
+
+    Args:
+        project_id: Restrict to one project
+        completed_before: Only tasks last updated before this time
+
+    Returns:
+        A SQL condition over the tasks table
+    """
+    condition = Task.status == TaskStatus.DONE
+    if project_id is not None:
+        condition &= Task.project_id == project_id
+    if completed_before is not None:
+        condition &= Task.updated_at < completed_before
+    return condition
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Archive done tasks that have not changed for a number of days.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.archive", description="Archive completed tasks")
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--older-than-days", type=int, default=settings.archive_after_days)
+    args = parser.parse_args(argv)
+    cutoff = datetime.utcnow() - timedelta(days=args.older_than_days)
+    with Session(create_engine(args.database_url)) as db:
+        moved = archive_tasks(db, completed_tasks(completed_before=cutoff))
+    print(f"Archived {moved} tasks")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
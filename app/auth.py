@@ -1,9 +1,13 @@
 """
 Authentication utilities for password hashing and JWT token management.
 
-This module provides functions for secure password handling using bcrypt
-and JWT token creation/verification for user authentication.
+This module provides functions for secure password handling using bcrypt,
+JWT access token creation/verification and refresh token generation for
+user authentication.
 """
+import hashlib
+import secrets
+import uuid
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException
@@ -11,6 +15,8 @@ from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from app.config import settings
+from app.revocation import revocations
+from app.tracing import traced
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -44,7 +50,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def create_access_token(data: dict) -> str:
     """
-    Create a JWT access token with expiration time.
+    Create a JWT access token with expiration time and a unique ID.
 
     Args:
         data: Dictionary containing claims to encode in the token
@@ -54,28 +60,76 @@ def create_access_token(data: dict) -> str:
     """
     to_encode = data.copy()
     expires_in = datetime.utcnow() + timedelta(minutes=settings.access_token_expiration_minutes)
-    to_encode.update({"exp": expires_in})
+    to_encode.update({"exp": expires_in, "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
 
 
-def verify_access_token(token: str) -> str:
+def create_refresh_token() -> tuple[str, str]:
     """
-    Verify and decode a JWT access token to extract the user email.
+    Generate a random refresh token.
+
+    Returns:
+        tuple[str, str]: The token for the client and the digest to store
+    """
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Digest a refresh token for storage and lookup.
+
+    Refresh tokens are 256 random bits, not passwords, so a single SHA-256
+    round is as safe as bcrypt here and costs microseconds.
+
+    Args:
+        token: The refresh token
+
+    Returns:
+        str: Hex SHA-256 digest of the token
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a JWT access token and return its claims.
+
+    The token is checked against the in-memory revocation list, which does
+    not touch the database.
 
     Args:
         token: The JWT token to verify
 
     Returns:
-        str: The email address extracted from the token
+        dict: The token's claims, including "sub" (the user email)
 
     Raises:
-        HTTPException: If token is invalid or missing email claim
+        HTTPException: If the token is invalid, revoked or missing its email claim
     """
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return email
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("jti") in revocations:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+    return payload
+
+
+@traced()
+def verify_access_token(token: str) -> str:
+    """
+    Verify and decode a JWT access token to extract the user email.
+
+    Args:
+        token: The JWT token to verify
+
+    Returns:
+        str: The email address extracted from the token
+
+    Raises:
+        HTTPException: If token is invalid, revoked or missing email claim
+    """
+    return decode_access_token(token)["sub"]
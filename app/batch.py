@@ -0,0 +1,43 @@
+"""
+Batch lookup helpers.
+
+Batch endpoints take a comma-separated ``ids`` parameter and resolve every ID
+with a single ``IN`` query instead of one request per item. IDs that cannot
+be returned are reported individually next to the items that can.
+"""
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+def parse_ids(ids: str, max_ids: int = 0) -> list[int]:
+    """
+    Parse a comma-separated ID list such as "3,1,7".
+
+    Duplicates are dropped; the first occurrence keeps its position.
+
+    Args:
+        ids: Raw ``ids`` parameter
+        max_ids: Maximum number of distinct IDs (defaults to settings.max_batch_ids)
+
+    Returns:
+        list[int]: Distinct IDs in request order
+
+    Raises:
+        HTTPException: If an ID is not an integer, none are given, or too many are given
+    """
+    max_ids = max_ids or settings.max_batch_ids
+    parsed: dict[int, None] = {}
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            parsed[int(part)] = None
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid ID: {part!r}")
+    if not parsed:
+        raise HTTPException(status_code=422, detail="At least one ID is required")
+    if len(parsed) > max_ids:
+        raise HTTPException(status_code=422, detail=f"At most {max_ids} IDs are allowed per request")
+    return list(parsed)
@@ -0,0 +1,199 @@
+"""
+Negotiated response compression middleware.
+
+This module provides an ASGI middleware that compresses responses with
+zstd, brotli or gzip depending on the client's ``Accept-Encoding`` header.
+Complete bodies below a size threshold are sent as-is; streamed bodies are
+compressed chunk by chunk and flushed after every chunk so clients can start
+decoding before the stream ends. Large chunks are compressed in a worker
+thread so the event loop keeps serving other requests.
+
+brotli and zstd are optional: they are offered only when the ``brotli`` and
+``zstandard`` packages are installed. gzip is always available.
+"""
+import zlib
+from typing import Optional
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Server preference when the client accepts several encodings equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+# Content types whose bodies are already compressed or not worth compressing
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip",
+                           "application/octet-stream")
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the encodings supported by the installed libraries, in preference order."""
+    return tuple(e for e in PREFERENCE if e == "gzip" or (e == "br" and brotli) or (e == "zstd" and zstandard))
+
+
+def negotiate(accept_encoding: str, supported: tuple[str, ...]) -> Optional[str]:
+    """
+    Pick the response encoding from an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Raw header value, e.g. "gzip;q=0.8, br"
+        supported: Encodings the server can produce, in preference order
+
+    Returns:
+        Optional[str]: The chosen encoding, or None to send the body uncompressed
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class StreamCompressor:
+    """
+    Incremental compressor with a common interface across encodings.
+
+    Attributes:
+        encoding: Content-Encoding produced by this compressor
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._zstd = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it immediately."""
+        if self.encoding == "gzip":
+            return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zstd.compress(data) + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the final chunk and terminate the stream."""
+        if self.encoding == "gzip":
+            return self._zlib.compress(data) + self._zlib.flush()
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zstd.compress(data) + self._zstd.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP responses.
+
+    Attributes:
+        app: Wrapped ASGI application
+        minimum_size: Complete bodies smaller than this are not compressed
+        levels: Compression level per encoding
+        offload_size: Chunks at least this large are compressed in a worker thread
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_level: int = 4,
+                 zstd_level: int = 3, offload_size: int = 64 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_level, "zstd": zstd_level}
+        self.offload_size = offload_size
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressedResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def _compress(self, call, data: bytes) -> bytes:
+        if len(data) >= self.middleware.offload_size:
+            return await anyio.to_thread.run_sync(call, data)
+        return call(data)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = ("content-encoding" in headers or content_type.startswith(INCOMPRESSIBLE_PREFIXES))
+            self.start_message = message
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                headers.add_vary_header("Accept-Encoding")
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.compressor = StreamCompressor(self.encoding, self.middleware.levels[self.encoding])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # The compressed bytes differ from the identity representation
+            if "etag" in headers and not headers["etag"].startswith("W/"):
+                headers["ETag"] = "W/" + headers["etag"]
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = await self._compress(self.compressor.finish, body)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start_message)
+
+        call = self.compressor.compress if more_body else self.compressor.finish
+        await self.send({"type": "http.response.body", "body": await self._compress(call, body),
+                         "more_body": more_body})
@@ -0,0 +1,41 @@
+"""
+Optimistic concurrency helpers.
+
+Tasks and projects carry a ``version`` column that SQLAlchemy increments on
+every update (``version_id_col``). It is exposed as the ``ETag`` of the
+single-resource endpoints, and updates sent with ``If-Match`` only apply while
+the row still has one of the given versions; otherwise they fail with 412 and
+the client re-reads and retries instead of silently overwriting a concurrent
+edit.
+
+The tag identifies the resource's version rather than its bytes, so weak tags
+(``W/"3"``, produced when the response is compressed) match like strong ones.
+"""
+from typing import Optional
+
+
+def etag(version: int) -> str:
+    """Return the entity tag for a resource version."""
+    return f'"{version}"'
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[list[int]]:
+    """
+    Parse an ``If-Match`` header into the versions it accepts.
+
+    Args:
+        if_match: Raw header value, e.g. '"3", W/"4"' (None if absent)
+
+    Returns:
+        Optional[list[int]]: Accepted versions, or None when any version is
+        accepted (no header or ``*``). Tags this API never issues are
+        ignored, so a header made only of those matches nothing.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if len(tag) >= 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
@@ -4,6 +4,10 @@ Application configuration settings.
 This module defines the configuration settings for the TaskForge application,
 including database connection, JWT secret key, and token expiration.
 """
+import os
+import tempfile
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,10 +19,114 @@ class Settings(BaseSettings):
         database_url: SQLAlchemy database connection URL
         secret_key: Secret key for JWT token signing
         access_token_expiration_minutes: JWT token expiration time in minutes
+        refresh_token_expiration_days: Refresh token lifetime in days
+        revocation_sync_seconds: Seconds before a token revoked through one worker is rejected by the others
+        max_page_size: Largest page size accepted by paginated listings
+        max_batch_ids: Most IDs accepted by one batch lookup (``?ids=``)
+        idempotency_ttl_seconds: How long the response to a POST with an ``Idempotency-Key`` is kept for retries
+        idempotency_wait_seconds: Longest a duplicate request waits for the in-flight request with its key
+        idempotency_lock_seconds: An in-flight key whose request has not finished after this long can be reclaimed
+        compression_minimum_size: Responses smaller than this many bytes are sent uncompressed
+        compression_gzip_level: gzip compression level (1-9)
+        compression_brotli_level: brotli quality (0-11)
+        compression_zstd_level: zstd compression level (1-22)
+        compression_offload_size: Chunks at least this large are compressed off the event loop
+        deletion_batch_size: Tasks removed per transaction by background project deletion
+        deletion_stale_seconds: A running deletion job without progress for this long is resumed
+        archive_batch_size: Tasks moved per transaction between the hot and archive tables
+        archive_after_days: Default age of done tasks archived by ``python -m app.archive``
+        max_task_depth: Deepest subtask level allowed below a top-level task
+        due_soon_minutes: How long before its due date a task triggers a "due soon" notification
+        scheduler_window_seconds: Span of upcoming due events the scheduler keeps in memory
+        scheduler_tick_seconds: Seconds between checks for due events
+        activity_flush_seconds: Longest time an activity log entry is buffered before being written
+        activity_batch_size: Buffered activity entries that trigger a write; also the batch size of retention jobs
+        activity_compact_after_days: Task updates older than this are merged into one activity entry per task
+        activity_retention_days: Activity entries older than this are deleted by ``python -m app.activity``
+        membership_cache_users: Users whose project memberships each worker keeps in memory
+        membership_inline_ids: Project listings of users in more projects than this read the
+            memberships table instead of binding every ID of the cached map
+        view_cache_views: Saved view results each worker keeps in memory
+        view_cache_max_rows: Saved views matching more tasks than this are not cached
+        view_cache_ttl_seconds: Age at which a cached saved view result is reloaded, bounding
+            staleness from activity log entries lost by a killed worker
+        view_sync_seconds: Seconds between applying other workers' task changes to cached views
+        replica_url: Optional read replica connection URL for read-only endpoints
+        replica_sticky_seconds: Reads go to the primary for this long after a client's write
+        replica_retry_seconds: An unreachable replica is skipped for this long before retrying
+        bind: Address the production server (``app.serving``) listens on
+        web_concurrency: Number of worker processes (0 = one per CPU core)
+        worker_max_requests: A worker is replaced after serving about this many requests (0 = never)
+        worker_max_requests_jitter: Random spread added to worker_max_requests so workers do not restart together
+        worker_max_memory_mb: A worker whose resident memory exceeds this is replaced (0 = no limit)
+        worker_graceful_timeout: Seconds a stopping worker is given to finish in-flight requests
+        sql_profiling: Record the SQL issued by each request and report it in response headers
+        sql_repeat_threshold: A statement shape executed this many times in one request is flagged as N+1
+        admin_emails: Users allowed to use the admin endpoints (e.g. the CPU profiler)
+        profile_dir: Directory shared by all workers for CPU profile triggers and results
+        profile_interval_ms: Default milliseconds between CPU profile samples
+        profile_max_seconds: Longest CPU profile an admin can request
+        profile_max_overhead: Largest fraction of wall time the profiler may spend sampling
+        tracing_exporter: Span exporter: "none", "console", "file", "otlp" or "package.module:Class"
+        tracing_sample_rate: Fraction of new traces recorded (0.0-1.0)
+        tracing_file: Output file of the "file" exporter
+        tracing_otlp_endpoint: OTLP/HTTP traces URL of the "otlp" exporter
+        tracing_service_name: service.name reported with exported spans
     """
     database_url: str = "sqlite:///./tracker.db"
     secret_key: str = "a_very_secret_key_that_should_be_changed_in_production"
     access_token_expiration_minutes: int = 30
+    refresh_token_expiration_days: int = 30
+    revocation_sync_seconds: float = 5.0
+    max_page_size: int = 1000
+    max_batch_ids: int = 500
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_wait_seconds: float = 10.0
+    idempotency_lock_seconds: int = 60
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_level: int = 4
+    compression_zstd_level: int = 3
+    compression_offload_size: int = 64 * 1024
+    deletion_batch_size: int = 1000
+    deletion_stale_seconds: int = 300
+    archive_batch_size: int = 1000
+    archive_after_days: int = 30
+    max_task_depth: int = 10
+    due_soon_minutes: int = 24 * 60
+    scheduler_window_seconds: int = 300
+    scheduler_tick_seconds: float = 1.0
+    activity_flush_seconds: float = 1.0
+    activity_batch_size: int = 500
+    activity_compact_after_days: int = 30
+    activity_retention_days: int = 365
+    membership_cache_users: int = 10_000
+    membership_inline_ids: int = 500
+    view_cache_views: int = 1000
+    view_cache_max_rows: int = 10_000
+    view_cache_ttl_seconds: float = 300.0
+    view_sync_seconds: float = 1.0
+    replica_url: Optional[str] = None
+    replica_sticky_seconds: int = 10
+    replica_retry_seconds: int = 30
+    bind: str = "0.0.0.0:8000"
+    web_concurrency: int = 0
+    worker_max_requests: int = 10000
+    worker_max_requests_jitter: int = 1000
+    worker_max_memory_mb: int = 0
+    worker_graceful_timeout: int = 30
+    sql_profiling: bool = False
+    sql_repeat_threshold: int = 5
+    admin_emails: list[str] = []
+    profile_dir: str = os.path.join(tempfile.gettempdir(), "taskforge-profiles")
+    profile_interval_ms: int = 10
+    profile_max_seconds: int = 60
+    profile_max_overhead: float = 0.05
+    tracing_exporter: str = "none"
+    tracing_sample_rate: float = 1.0
+    tracing_file: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_service_name: str = "taskforge"
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
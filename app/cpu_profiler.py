@@ -0,0 +1,407 @@
+"""
+Sampling CPU profiler.
+
+``StackSampler`` records the Python stack of every thread at a fixed
+interval from a background thread, so profiled code runs unmodified. The
+interval is stretched whenever taking a sample would cost more than
+``max_overhead`` of wall time, which caps the profiler's own overhead.
+Results are collapsed stacks (``frame;frame;frame count`` per line), the
+input format of flamegraph.pl and speedscope, or a self-contained SVG
+flamegraph from ``render_svg``. Threads parked in ``threading``, ``queue``
+or ``selectors`` waits are left out, so idle workers do not drown the
+request threads.
+
+Profiles span every worker process through a shared directory
+(``settings.profile_dir``): ``ProfileSessions.start`` writes a trigger file,
+each worker's ``ProfileTriggerWatcher`` picks it up and samples until the
+deadline, and writes its own output file, which ``ProfileSessions.collect``
+merges. ``ProfileHeaderMiddleware`` profiles single requests sent by an
+admin with an ``X-Profile`` header, one request per process at a time.
+"""
+import html
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import verify_access_token
+from app.config import settings
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Leaf frames in these modules mean the thread is idle, not using CPU
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+
+# Profile files older than this are removed when a new profile starts
+RETENTION_SECONDS = 3600
+
+
+def _frame_label(frame) -> str:
+    filename = frame.f_code.co_filename
+    if filename.startswith(ROOT_DIR):
+        filename = os.path.relpath(filename, ROOT_DIR)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.f_code.co_name}"
+
+
+def collapse(frame) -> Optional[str]:
+    """
+    Render a stack as ``root;...;leaf`` labels, or None for an idle thread.
+
+    Args:
+        frame: Innermost frame of the stack
+
+    Returns:
+        Optional[str]: Collapsed stack
+    """
+    if os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Samples the stacks of all other threads from a background thread.
+
+    Attributes:
+        interval: Current seconds between samples (grows to respect max_overhead)
+        max_overhead: Largest fraction of wall time spent taking samples
+        stacks: Collapsed stack -> number of samples
+        samples: Number of sampling rounds taken
+    """
+
+    def __init__(self, interval: float = 0.01, max_overhead: float = 0.05):
+        self.base_interval = interval
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.busy = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._started_at = 0.0
+        self._elapsed = 0.0
+
+    def start(self) -> "StackSampler":
+        """Start sampling."""
+        self._started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Stop sampling and return the collected stacks."""
+        self._stopped.set()
+        self._thread.join()
+        self._elapsed = time.perf_counter() - self._started_at
+        return self.stacks
+
+    @property
+    def overhead(self) -> float:
+        """Fraction of wall time spent taking samples."""
+        elapsed = self._elapsed or time.perf_counter() - self._started_at
+        return self.busy / elapsed if elapsed else 0.0
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            started = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = collapse(frame)
+                if stack is not None:
+                    self.stacks[stack] += 1
+            self.samples += 1
+            cost = time.perf_counter() - started
+            self.busy += cost
+            self.interval = max(self.base_interval, cost / self.max_overhead)
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Render stacks in collapsed format, one ``stack count`` line each."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def parse_collapsed(text: str) -> Counter:
+    """Parse collapsed-format text back into a Counter."""
+    stacks: Counter[str] = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack:
+            stacks[stack] += int(count)
+    return stacks
+
+
+def render_svg(stacks: Counter, width: int = 1200, row_height: int = 16) -> str:
+    """
+    Render stacks as a flamegraph (roots at the bottom, width proportional to samples).
+
+    Args:
+        stacks: Collapsed stack -> number of samples
+        width: Image width in pixels
+        row_height: Height of one frame in pixels
+
+    Returns:
+        str: SVG document
+    """
+    tree: dict = {}
+    for stack, count in stacks.items():
+        node = tree
+        for label in stack.split(";"):
+            entry = node.setdefault(label, [0, {}])
+            entry[0] += count
+            node = entry[1]
+    total = sum(stacks.values()) or 1
+    depth = max((stack.count(";") + 1 for stack in stacks), default=0)
+    height = (depth + 1) * row_height
+    scale = width / total
+    rects = []
+
+    def draw(node: dict, x: float, level: int) -> None:
+        for label, (count, children) in sorted(node.items()):
+            w = count * scale
+            if w >= 0.5:
+                y = height - (level + 1) * row_height
+                hue = 20 + zlib.crc32(label.encode()) % 40
+                title = html.escape(f"{label} ({count} samples, {100 * count / total:.1f}%)")
+                text = html.escape(label[:int(w / 7)]) if w > 21 else ""
+                rects.append(f'<g><title>{title}</title><rect x="{x:.1f}" y="{y}" width="{w:.1f}" '
+                             f'height="{row_height - 1}" fill="hsl({hue},90%,60%)"/>'
+                             f'<text x="{x + 3:.1f}" y="{y + row_height - 4}">{text}</text></g>')
+                draw(children, x, level + 1)
+            x += w
+
+    draw(tree, 0.0, 0)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'font-family="monospace" font-size="11">{"".join(rects)}</svg>')
+
+
+class ProfileSessions:
+    """
+    Profiles shared by all worker processes through a directory.
+
+    Files per profile ``id``: ``id.json`` (trigger with the deadline and
+    interval), ``id.<pid>.running`` while a worker samples, and
+    ``id.<pid>.collapsed`` with each worker's result.
+
+    Attributes:
+        directory: Shared directory
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - RETENTION_SECONDS
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def start(self, seconds: float, interval: float, profile_id: Optional[str] = None) -> dict:
+        """
+        Ask every worker to sample for ``seconds``.
+
+        Args:
+            seconds: Profile duration
+            interval: Seconds between samples
+            profile_id: Optional ID (generated when omitted)
+
+        Returns:
+            dict: The trigger (id, until, interval)
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._prune()
+        trigger = {"id": profile_id or uuid.uuid4().hex, "until": time.time() + seconds, "interval": interval}
+        temporary = self.directory / f".{trigger['id']}.tmp"
+        temporary.write_text(json.dumps(trigger))
+        os.replace(temporary, self.directory / f"{trigger['id']}.json")
+        return trigger
+
+    def triggers(self) -> list[dict]:
+        """Return the triggers whose deadline has not passed."""
+        if not self.directory.is_dir():
+            return []
+        found = []
+        for path in self.directory.glob("*.json"):
+            try:
+                trigger = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if trigger["until"] > time.time():
+                found.append(trigger)
+        return found
+
+    def write(self, profile_id: str, stacks: Counter) -> None:
+        """Store this process's result for a profile."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.{os.getpid()}.collapsed").write_text(format_collapsed(stacks))
+
+    def collect(self, profile_id: str) -> tuple[bool, Counter]:
+        """
+        Merge the results of every worker for a profile.
+
+        Args:
+            profile_id: Profile ID
+
+        Returns:
+            tuple: Whether all workers have finished, and the merged stacks
+
+        Raises:
+            KeyError: If the profile does not exist
+        """
+        trigger_path = self.directory / f"{profile_id}.json"
+        results = list(self.directory.glob(f"{profile_id}.*.collapsed"))
+        if not trigger_path.exists() and not results:
+            raise KeyError(profile_id)
+        running = any(self.directory.glob(f"{profile_id}.*.running"))
+        until = json.loads(trigger_path.read_text())["until"] if trigger_path.exists() else 0
+        # A worker may not have noticed the trigger yet right after it was written
+        finished = not running and time.time() >= until and (results or time.time() >= until + 2)
+        stacks: Counter[str] = Counter()
+        for path in results:
+            stacks.update(parse_collapsed(path.read_text()))
+        return bool(finished), stacks
+
+    def run(self, trigger: dict, max_overhead: float) -> None:
+        """Sample this process until the trigger's deadline and write the result."""
+        marker = self.directory / f"{trigger['id']}.{os.getpid()}.running"
+        marker.touch()
+        try:
+            sampler = StackSampler(trigger["interval"], max_overhead).start()
+            time.sleep(max(0.0, trigger["until"] - time.time()))
+            self.write(trigger["id"], sampler.stop())
+        finally:
+            marker.unlink(missing_ok=True)
+
+
+class ProfileTriggerWatcher(threading.Thread):
+    """
+    Background thread in each worker starting the profiles requested by any worker.
+
+    Attributes:
+        sessions: Shared profile directory
+        poll_seconds: Seconds between checks for new triggers
+        max_overhead: Overhead cap passed to the samplers
+    """
+
+    def __init__(self, sessions: ProfileSessions, poll_seconds: float = 1.0, max_overhead: float = 0.05):
+        super().__init__(name="profile-triggers", daemon=True)
+        self.sessions = sessions
+        self.poll_seconds = poll_seconds
+        self.max_overhead = max_overhead
+        self.seen: set[str] = set()
+        self._stopped = threading.Event()
+
+    def poll(self) -> list[threading.Thread]:
+        """Start sampling for every new trigger; return the sampling threads."""
+        started = []
+        for trigger in self.sessions.triggers():
+            if trigger["id"] in self.seen:
+                continue
+            self.seen.add(trigger["id"])
+            thread = threading.Thread(target=self.sessions.run, args=(trigger, self.max_overhead),
+                                      name=f"profile-{trigger['id']}", daemon=True)
+            thread.start()
+            started.append(thread)
+        return started
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.poll_seconds):
+            self.poll()
+
+    def stop(self) -> None:
+        """Stop watching for triggers."""
+        self._stopped.set()
+
+
+def is_admin_token(authorization: Optional[str]) -> bool:
+    """
+    Check whether an ``Authorization`` header carries an admin's access token.
+
+    Args:
+        authorization: Raw header value
+
+    Returns:
+        bool: True if the token is valid and its subject is in settings.admin_emails
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        return verify_access_token(token) in settings.admin_emails
+    except HTTPException:
+        return False
+
+
+class ProfileHeaderMiddleware:
+    """
+    ASGI middleware profiling single requests that carry an ``X-Profile`` header.
+
+    Only admins may trigger it, and at most one request per process is
+    profiled at a time; other requests with the header run unprofiled. The
+    response's ``X-Profile-Id`` header names the profile to fetch from
+    ``GET /admin/profiles/{id}``. All threads are sampled, so concurrent
+    requests in the same worker appear in the profile too.
+
+    Attributes:
+        app: Wrapped ASGI application
+        sessions: Where results are stored
+        interval: Seconds between samples
+        max_overhead: Overhead cap passed to the sampler
+    """
+
+    def __init__(self, app: ASGIApp, sessions: ProfileSessions, interval: float = 0.005,
+                 max_overhead: float = 0.05):
+        self.app = app
+        self.sessions = sessions
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if "x-profile" not in headers or not is_admin_token(headers.get("authorization")):
+            await self.app(scope, receive, send)
+            return
+        if not self._lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = StackSampler(self.interval, self.max_overhead).start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = sampler.stop()
+            self._lock.release()
+            self.sessions.write(profile_id, stacks)
+
+
+profile_sessions = ProfileSessions(settings.profile_dir)
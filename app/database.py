@@ -3,20 +3,55 @@ Database configuration and session management.
 
 This module sets up the SQLAlchemy engine, session factory, and base class
 for database models. It also provides a dependency function for database sessions.
+When ``settings.replica_url`` is set, a second engine and session factory are
+created for the read replica (see ``app.replicas`` for request routing).
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import settings
 
 DATABASE_URL = settings.database_url
 
-engine = create_engine(DATABASE_URL,
-                       connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+
+def make_engine(url: str, **options) -> Engine:
+    """
+    Create an engine, allowing SQLite connections to be shared across threads.
+
+    Args:
+        url: SQLAlchemy database URL
+        **options: Extra create_engine options
+
+    Returns:
+        Engine: The new engine
+    """
+    return create_engine(url, connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+                         **options)
+
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Read replica; pre-ping so a replica that went away is noticed at checkout, not mid-query
+replica_engine = make_engine(settings.replica_url, pool_pre_ping=True) if settings.replica_url else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
 Base = declarative_base()
 
 
+def dispose_engines() -> None:
+    """
+    Drop pooled connections inherited from a parent process.
+
+    Called in every worker right after fork when the app is preloaded. The
+    pools are replaced without closing the inherited connections
+    (``close=False``), since those sockets still belong to the parent.
+    """
+    for bound in (engine, replica_engine):
+        if bound is not None:
+            bound.dispose(close=False)
+
+
 def get_db():
     """
     Dependency function that provides a database session.
@@ -0,0 +1,101 @@
+"""
+Background deletion of projects.
+
+Deleting a project with the ORM cascade loads every task into memory and
+removes them one by one in a single long transaction. Instead, the delete
+endpoint hides the project, records a ProjectDeletion job and returns
+immediately; the job then removes task dependencies and notifications, hot
+and archived tasks and their hierarchy rows in primary-key batches, committing after each batch
+so locks are held only briefly, and finally removes the project row.
+
+Jobs are claimed with a conditional UPDATE, so several workers resuming
+jobs after a restart never process the same job twice.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.deletion import ProjectDeletion
+from app.models.dependency import TaskDependency
+from app.models.hierarchy import TaskClosure
+from app.models.member import ProjectMember
+from app.models.notification import TaskNotification
+from app.models.project import Project
+from app.models.task import ArchivedTask, Task
+from app.models.view import SavedView
+
+
+def _claim(session: Session, deletion_id: int, stale_before: datetime) -> bool:
+    claimable = (ProjectDeletion.status == "pending") | (
+            (ProjectDeletion.status == "running") & (ProjectDeletion.heartbeat_at < stale_before))
+    result = session.execute(update(ProjectDeletion)
+                             .where(ProjectDeletion.id == deletion_id, claimable)
+                             .values(status="running", heartbeat_at=datetime.utcnow()))
+    session.commit()
+    return result.rowcount == 1
+
+
+def run_project_deletion(bind: Engine, deletion_id: int, batch_size: int | None = None) -> None:
+    """
+    Delete a project's tasks in batches, then the project itself.
+
+    Args:
+        bind: Engine (or connection) to run the job on
+        deletion_id: ID of the ProjectDeletion job
+        batch_size: Tasks deleted per transaction (defaults to settings.deletion_batch_size)
+    """
+    batch_size = batch_size or settings.deletion_batch_size
+    with Session(bind=bind) as session:
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.deletion_stale_seconds)
+        if not _claim(session, deletion_id, stale_before):
+            return
+        job = session.get(ProjectDeletion, deletion_id)
+        try:
+            task_tables = (Task.__table__, ArchivedTask.__table__)
+            for table in (TaskDependency.__table__, TaskNotification.__table__, ProjectMember.__table__,
+                          SavedView.__table__, *task_tables):
+                while True:
+                    ids = session.scalars(select(table.c.id).where(table.c.project_id == job.project_id)
+                                          .order_by(table.c.id).limit(batch_size)).all()
+                    if not ids:
+                        break
+                    session.execute(delete(table).where(table.c.project_id == job.project_id, table.c.id.in_(ids)))
+                    if table in task_tables:
+                        session.execute(delete(TaskClosure).where(TaskClosure.descendant_id.in_(ids)))
+                        job.tasks_deleted += len(ids)
+                    job.heartbeat_at = datetime.utcnow()
+                    session.commit()
+            session.execute(delete(Project.__table__).where(Project.id == job.project_id))
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            job.status = "failed"
+            job.error = str(exc)
+            job.finished_at = datetime.utcnow()
+            session.commit()
+            raise
+
+
+def resume_project_deletions(bind: Engine) -> int:
+    """
+    Run deletion jobs left pending or abandoned by a previous process.
+
+    Args:
+        bind: Engine to run the jobs on
+
+    Returns:
+        int: Number of jobs found for resumption
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.deletion_stale_seconds)
+    with Session(bind=bind) as session:
+        ids = session.scalars(select(ProjectDeletion.id).where(
+            (ProjectDeletion.status == "pending") |
+            ((ProjectDeletion.status == "running") & (ProjectDeletion.heartbeat_at < stale_before)))).all()
+    for deletion_id in ids:
+        run_project_deletion(bind, deletion_id)
+    return len(ids)
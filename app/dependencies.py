@@ -2,19 +2,28 @@
 FastAPI dependency functions for request handling.
 
 This module provides dependency functions used across API endpoints,
-particularly for user authentication and authorization.
+particularly for user authentication and project authorization.
 """
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import false, select
+from sqlalchemy.orm import Session, Query
 
 from app.auth import verify_access_token
+from app.config import settings
 from app.database import get_db
+from app.models.member import ProjectMember
+from app.models.project import Project
 from app.models.user import User
+from app.permissions import ROLE_RANK, memberships
+from app.replicas import get_read_db
+from app.schemas.member import ProjectRole
+from app.tracing import traced
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
+@traced()
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """
     Retrieve the current authenticated user from the JWT token.
@@ -34,3 +43,92 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     return user
+
+
+def get_current_reader(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> User:
+    """
+    Retrieve the current authenticated user for a read-only endpoint.
+
+    Same as ``get_current_user`` but looks the user up on the session from
+    ``get_read_db``, so read-only requests do not touch the primary.
+
+    Args:
+        token: JWT access token from the Authorization header
+        db: Read session dependency
+
+    Returns:
+        User: The authenticated user object
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    return get_current_user(token, db)
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Require the authenticated user to be an administrator.
+
+    Args:
+        current_user: Authenticated user dependency
+
+    Returns:
+        User: The authenticated administrator
+
+    Raises:
+        HTTPException: If the user is not listed in settings.admin_emails
+    """
+    if current_user.email not in settings.admin_emails:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+def member_projects(db: Session, user: User, role: ProjectRole = ProjectRole.VIEWER) -> Query:
+    """
+    Build a query over the live projects in which a user has at least ``role``.
+
+    Projects with a pending deletion are excluded, so they disappear from every
+    endpoint as soon as the deletion is requested. The user's projects come
+    from the cached membership map (see app.permissions), so the query does
+    not join the membership table, unless the user is in more than
+    ``settings.membership_inline_ids`` projects: binding that many IDs costs
+    as much as the index range scan of the user's memberships (see
+    benchmarks/bench_permissions.py), and can exceed the database's limit on
+    bound parameters.
+
+    Args:
+        db: Database session
+        user: The authenticated user
+        role: Least role required
+
+    Returns:
+        Query: Query over the user's live projects
+    """
+    project_ids = memberships.project_ids(db, user, role)
+    if len(project_ids) > settings.membership_inline_ids:
+        roles = [granted.value for granted, rank in ROLE_RANK.items() if rank >= ROLE_RANK[role]]
+        project_ids = select(ProjectMember.project_id).where(ProjectMember.user_id == user.id,
+                                                             ProjectMember.role.in_(roles))
+    return db.query(Project).filter(Project.id.in_(project_ids), Project.deleted_at.is_(None))
+
+
+def member_project(db: Session, user: User, project_id: int, role: ProjectRole = ProjectRole.VIEWER) -> Query:
+    """
+    Build a query over one project, matching nothing unless the user has at least ``role`` in it.
+
+    The role is checked against the cached membership map, so the query is a
+    primary key lookup.
+
+    Args:
+        db: Database session
+        user: The authenticated user
+        project_id: ID of the project
+        role: Least role required
+
+    Returns:
+        Query: Query over the project if it is live and the user may access it
+    """
+    query = db.query(Project).filter(Project.id == project_id, Project.deleted_at.is_(None))
+    if not memberships.allows(db, user, project_id, role):
+        query = query.filter(false())
+    return query
@@ -0,0 +1,125 @@
+"""
+Sparse fieldsets and compact list layouts.
+
+This module implements the ``fields`` and ``format`` query parameters. A
+fieldset narrows both the columns loaded from the database (``load_only``)
+and the keys written to the response, and bypasses Pydantic model building
+for the selected values. The columnar layout returns one array per field
+instead of one object per row, so field names are written once per
+response rather than once per row.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Iterable, Literal, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+ListFormat = Literal["objects", "columnar"]
+
+
+def parse_fields(fields: Optional[str], schema: type[BaseModel]) -> Optional[list[str]]:
+    """
+    Parse a comma-separated fieldset against a response schema.
+
+    The ``id`` field is always included so clients can correlate rows.
+
+    Args:
+        fields: Raw ``fields`` parameter (None selects every field)
+        schema: Response schema whose fields may be selected
+
+    Returns:
+        Optional[list[str]]: Selected fields in schema order, or None for all
+
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in schema.model_fields if name in requested or name == "id"]
+
+
+def load_fields(model, fields: Optional[list[str]], extra: Iterable[str] = ()):
+    """
+    Build a ``load_only`` option for the selected fields.
+
+    Args:
+        model: Mapped class being queried
+        fields: Selected fields (None loads every column)
+        extra: Additional attributes the endpoint needs, e.g. sort keys
+
+    Returns:
+        A loader option to pass to ``Query.options``, or None
+    """
+    if fields is None:
+        return None
+    names = dict.fromkeys([*fields, *extra])
+    return load_only(*[getattr(model, name) for name in names])
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def as_dict(obj, fields: list[str]) -> dict:
+    """
+    Extract the selected fields of an object as JSON-ready values.
+
+    Args:
+        obj: ORM object (or any object with the field attributes)
+        fields: Selected fields
+
+    Returns:
+        dict: Field values with datetimes and enums converted to strings
+    """
+    return {name: _plain(getattr(obj, name)) for name in fields}
+
+
+def render_item(obj, fields: list[str], headers: Optional[dict] = None) -> JSONResponse:
+    """
+    Render a single object restricted to a fieldset.
+
+    Args:
+        obj: ORM object (or any object with the field attributes)
+        fields: Selected fields
+        headers: Optional extra response headers
+
+    Returns:
+        JSONResponse: Object with only the selected keys
+    """
+    return JSONResponse(as_dict(obj, fields), headers=headers)
+
+
+def render_list(objs: list, fields: list[str], list_format: ListFormat = "objects",
+                headers: Optional[dict] = None) -> JSONResponse:
+    """
+    Render a list of objects restricted to a fieldset.
+
+    Args:
+        objs: ORM objects to render
+        fields: Selected fields
+        list_format: "objects" for a list of objects, "columnar" for an object
+            mapping each field to an array of values
+        headers: Optional extra response headers
+
+    Returns:
+        JSONResponse: The rendered list
+    """
+    if list_format == "columnar":
+        return JSONResponse({name: [_plain(getattr(obj, name)) for obj in objs] for name in fields}, headers=headers)
+    return JSONResponse([as_dict(obj, fields) for obj in objs], headers=headers)
+
+
+def all_fields(schema: type[BaseModel]) -> list[str]:
+    """Return every field of a response schema, in declaration order."""
+    return list(schema.model_fields)
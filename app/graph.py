@@ -0,0 +1,177 @@
+"""
+Task dependency graph operations.
+
+Tasks of a project are kept in a topological order (``Task.topo_order``, see
+``topo_rank``) in which every blocker comes before the tasks it blocks. Adding
+an edge uses the Pearce-Kelly incremental algorithm: when the blocker already
+ranks before the blocked task, which is the usual case, the order is still
+valid and the edge is inserted without reading the graph. Otherwise only the
+tasks ranked between the two endpoints that are connected to them are visited,
+one query per level, and reordered among the ranks they already hold. A cycle
+exists exactly when that search reaches the blocker.
+
+Ready sets and critical paths are computed in SQL or over the ancestors of a
+single task, never over the whole project graph.
+"""
+from typing import Optional
+
+from sqlalchemy import and_, exists, literal, select, update
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.models.dependency import TaskDependency
+from app.models.task import Task, topo_rank
+from app.schemas.task import TaskStatus
+
+
+class CycleError(ValueError):
+    """Raised when a dependency would make a task (indirectly) block itself."""
+
+
+def _visit(db: Session, start: int, forward: bool, bound: int) -> dict[int, int]:
+    """
+    Collect tasks connected to ``start`` whose rank lies on the near side of ``bound``.
+
+    Args:
+        db: Database session
+        start: Task to start from
+        forward: Follow edges to blocked tasks (True) or to blockers (False)
+        bound: Forward: include ranks <= bound; backward: include ranks >= bound
+
+    Returns:
+        dict[int, int]: Visited task ID -> current rank, including ``start``
+    """
+    source, target = (TaskDependency.blocked_by_id, TaskDependency.task_id) if forward else \
+        (TaskDependency.task_id, TaskDependency.blocked_by_id)
+    in_window = topo_rank <= bound if forward else topo_rank >= bound
+    visited = {start: db.scalar(select(topo_rank).where(Task.id == start))}
+    frontier = [start]
+    while frontier:
+        rows = db.execute(select(Task.id, topo_rank).join(TaskDependency, target == Task.id)
+                          .where(source.in_(frontier), in_window)).all()
+        frontier = [task_id for task_id, _ in rows if task_id not in visited]
+        visited.update(rows)
+    return visited
+
+
+def add_dependency(db: Session, task: Task, blocker: Task) -> TaskDependency:
+    """
+    Record that ``task`` is blocked by ``blocker``, keeping the topological order.
+
+    The caller commits. Concurrent changes to the same project's graph must be
+    serialized by the caller (e.g. by locking the project row).
+
+    Args:
+        db: Database session
+        task: The blocked task
+        blocker: The task that must be done first
+
+    Returns:
+        TaskDependency: The new or already existing edge
+
+    Raises:
+        CycleError: If ``blocker`` already depends on ``task``, directly or not
+    """
+    existing = db.query(TaskDependency).filter(TaskDependency.task_id == task.id,
+                                               TaskDependency.blocked_by_id == blocker.id).first()
+    if existing is not None:
+        return existing
+    if task.id == blocker.id:
+        raise CycleError("A task cannot depend on itself")
+
+    lower = db.scalar(select(topo_rank).where(Task.id == blocker.id))
+    upper = db.scalar(select(topo_rank).where(Task.id == task.id))
+    if lower > upper:
+        after = _visit(db, task.id, forward=True, bound=lower)
+        if blocker.id in after:
+            raise CycleError("Dependency would create a cycle")
+        before = _visit(db, blocker.id, forward=False, bound=upper)
+        # Reuse the affected ranks: blockers' side first, each side keeping its relative order
+        ranks = sorted([*before.values(), *after.values()])
+        moved = sorted(before, key=before.get) + sorted(after, key=after.get)
+        for task_id, rank in zip(moved, ranks):
+            # Reordering is bookkeeping, not an edit: keep updated_at (and with it the version) as they are
+            db.execute(update(Task).where(Task.id == task_id).values(topo_order=rank, updated_at=Task.updated_at))
+        db.expire_all()
+
+    edge = TaskDependency(task_id=task.id, blocked_by_id=blocker.id, project_id=task.project_id)
+    db.add(edge)
+    db.flush()
+    return edge
+
+
+def ready_tasks(db: Session, project_id: int) -> Query:
+    """
+    Build a query over a project's todo tasks whose blockers are all done.
+
+    Blockers that were archived count as done.
+
+    Args:
+        db: Database session
+        project_id: Project to look in
+
+    Returns:
+        Query: Query over the ready tasks
+    """
+    blocker = aliased(Task)
+    blocked = exists().where(TaskDependency.task_id == Task.id, blocker.id == TaskDependency.blocked_by_id,
+                             blocker.status != TaskStatus.DONE)
+    return db.query(Task).filter(Task.project_id == project_id, Task.status == TaskStatus.TODO, ~blocked)
+
+
+def critical_path(db: Session, project_id: int, target_id: Optional[int] = None) -> list[Task]:
+    """
+    Find the longest chain of unfinished blockers leading to a task.
+
+    Only the unfinished ancestors of the target are read, with one recursive
+    query, and walked in topological order. Among equally long chains the one
+    through earlier due dates wins.
+
+    Args:
+        db: Database session
+        project_id: Project to look in
+        target_id: Task the chain ends at; defaults to the unfinished task
+            with the earliest due date
+
+    Returns:
+        list[Task]: The chain, first blocker first and the target last
+        (empty when there is no target)
+    """
+    unfinished = Task.status != TaskStatus.DONE
+    if target_id is None:
+        target_id = db.scalar(select(Task.id).where(Task.project_id == project_id, unfinished,
+                                                    Task.due_date.is_not(None))
+                              .order_by(Task.due_date, Task.id).limit(1))
+        if target_id is None:
+            return []
+
+    ancestors = select(literal(target_id).label("id")).cte("ancestors", recursive=True)
+    ancestors = ancestors.union(
+        select(TaskDependency.blocked_by_id)
+        .join(ancestors, TaskDependency.task_id == ancestors.c.id)
+        .join(Task, and_(Task.id == TaskDependency.blocked_by_id, unfinished)))
+    nodes = db.execute(select(Task.id, topo_rank, Task.due_date).where(Task.id.in_(select(ancestors.c.id)))
+                       .order_by(topo_rank)).all()
+    ids = [task_id for task_id, _, _ in nodes]
+    blockers: dict[int, list[int]] = {task_id: [] for task_id in ids}
+    for task_id, blocker_id in db.execute(select(TaskDependency.task_id, TaskDependency.blocked_by_id)
+                                          .where(TaskDependency.task_id.in_(ids),
+                                                 TaskDependency.blocked_by_id.in_(ids))):
+        blockers[task_id].append(blocker_id)
+
+    # Longest chain ending at each node, visited blockers-first thanks to the topological order
+    due = {task_id: due_date for task_id, _, due_date in nodes}
+    length: dict[int, int] = {}
+    previous: dict[int, Optional[int]] = {}
+    for task_id in ids:
+        best = min(blockers[task_id], default=None,
+                   key=lambda b: (-length[b], due[b] is None, due[b] or 0, b))
+        length[task_id] = 1 + (length[best] if best is not None else 0)
+        previous[task_id] = best
+
+    chain = []
+    node: Optional[int] = target_id if target_id in length else None
+    while node is not None:
+        chain.append(node)
+        node = previous[node]
+    tasks = {task.id: task for task in db.query(Task).filter(Task.id.in_(chain))}
+    return [tasks[task_id] for task_id in reversed(chain)]
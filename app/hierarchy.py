@@ -0,0 +1,169 @@
+"""
+Subtask hierarchy operations.
+
+The hierarchy is stored twice: ``Task.parent_id`` for the direct parent and
+the ``task_closure`` table (see TaskClosure) pairing every task with each of
+its ancestors. Listing a subtree or counting its statuses is then a single
+query driven by the closure primary key, with no recursion.
+
+Moving a subtree rewrites only the closure rows that connect the subtree to
+its old and new ancestors. Because depth is capped by
+``settings.max_task_depth`` a move touches at most ``subtree size x depth``
+rows, however large the rest of the project is.
+"""
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, or_, select, true, union_all
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.config import settings
+from app.models.dependency import TaskDependency
+from app.models.hierarchy import TaskClosure
+from app.models.notification import TaskNotification
+from app.models.task import ArchivedTask, Task
+from app.schemas.task import TaskStatus
+
+
+class HierarchyError(ValueError):
+    """Raised when a parent change would create a loop or exceed the depth limit."""
+
+
+def _depth(db: Session, task_id: int) -> int:
+    """Return how many levels a task sits below its top-level ancestor."""
+    return db.scalar(select(func.max(TaskClosure.depth)).where(TaskClosure.descendant_id == task_id)) or 0
+
+
+def _height(db: Session, task_id: int) -> int:
+    """Return how many levels of subtasks a task has below it."""
+    return db.scalar(select(func.max(TaskClosure.depth)).where(TaskClosure.ancestor_id == task_id)) or 0
+
+
+def attach(db: Session, task: Task, parent: Optional[Task] = None) -> None:
+    """
+    Record a new task in the hierarchy, optionally below ``parent``.
+
+    The task must already be flushed, with ``parent_id`` set, so it has an ID.
+    The caller commits.
+
+    Args:
+        db: Database session
+        task: The new task
+        parent: Optional parent task of the same project
+
+    Raises:
+        HierarchyError: If the task would be nested deeper than allowed
+    """
+    if parent is not None:
+        if _depth(db, parent.id) + 1 > settings.max_task_depth:
+            raise HierarchyError(f"Subtasks cannot be nested more than {settings.max_task_depth} levels deep")
+        db.execute(insert(TaskClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(TaskClosure.ancestor_id, literal(task.id), TaskClosure.depth + 1)
+            .where(TaskClosure.descendant_id == parent.id)))
+    db.add(TaskClosure(ancestor_id=task.id, descendant_id=task.id, depth=0))
+
+
+def move(db: Session, task: Task, parent: Optional[Task]) -> None:
+    """
+    Move a task and all of its subtasks below another parent.
+
+    The caller commits. Concurrent moves within a project must be serialized
+    by the caller (e.g. by locking the project row).
+
+    Args:
+        db: Database session
+        task: Root of the subtree to move
+        parent: New parent task of the same project, or None to make the
+            task top-level
+
+    Raises:
+        HierarchyError: If ``parent`` lies inside the subtree or the subtree
+        would end up nested deeper than allowed
+    """
+    new_depth = 0
+    if parent is not None:
+        inside = db.scalar(select(TaskClosure.depth).where(TaskClosure.ancestor_id == task.id,
+                                                           TaskClosure.descendant_id == parent.id))
+        if inside is not None or parent.id == task.id:
+            raise HierarchyError("A task cannot be moved below itself or one of its subtasks")
+        new_depth = _depth(db, parent.id) + 1
+    if new_depth + _height(db, task.id) > settings.max_task_depth:
+        raise HierarchyError(f"Subtasks cannot be nested more than {settings.max_task_depth} levels deep")
+
+    subtree = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task.id)
+    old_ancestors = db.scalars(select(TaskClosure.ancestor_id).where(TaskClosure.descendant_id == task.id,
+                                                                     TaskClosure.depth > 0)).all()
+    if old_ancestors:
+        db.execute(delete(TaskClosure).where(TaskClosure.ancestor_id.in_(old_ancestors),
+                                             TaskClosure.descendant_id.in_(subtree)))
+    if parent is not None:
+        # Every new ancestor (the parent included) paired with every task of the subtree
+        above, below = aliased(TaskClosure), aliased(TaskClosure)
+        db.execute(insert(TaskClosure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .join_from(above, below, true())
+            .where(above.descendant_id == parent.id, below.ancestor_id == task.id)))
+    task.parent_id = parent.id if parent is not None else None
+
+
+def subtasks(db: Session, task_id: int, max_depth: Optional[int] = None) -> Query:
+    """
+    Build a query over the live descendants of a task.
+
+    Args:
+        db: Database session
+        task_id: Root of the subtree (not included)
+        max_depth: Optional number of levels to include (1 for direct children)
+
+    Returns:
+        Query: Query over the subtasks
+    """
+    query = db.query(Task).join(TaskClosure, TaskClosure.descendant_id == Task.id).filter(
+        TaskClosure.ancestor_id == task_id, TaskClosure.depth > 0)
+    if max_depth is not None:
+        query = query.filter(TaskClosure.depth <= max_depth)
+    return query
+
+
+def rollup(db: Session, task_id: int) -> dict[TaskStatus, int]:
+    """
+    Count the statuses of a task and all of its subtasks, archived ones included.
+
+    Args:
+        db: Database session
+        task_id: Root of the subtree
+
+    Returns:
+        dict[TaskStatus, int]: Number of tasks per status (every status present)
+    """
+    subtree = select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)
+    statuses = union_all(select(Task.status).where(Task.id.in_(subtree)),
+                         select(ArchivedTask.status).where(ArchivedTask.id.in_(subtree))).subquery()
+    counts = dict.fromkeys(TaskStatus, 0)
+    counts.update(db.execute(select(statuses.c.status, func.count()).group_by(statuses.c.status)).all())
+    return counts
+
+
+def delete_subtree(db: Session, task_id: int) -> int:
+    """
+    Delete a task with all of its subtasks, archived ones included.
+
+    Their closure rows, dependencies and notifications are removed as well.
+    The caller commits.
+
+    Args:
+        db: Database session
+        task_id: Root of the subtree
+
+    Returns:
+        int: Number of tasks deleted
+    """
+    ids = db.scalars(select(TaskClosure.descendant_id).where(TaskClosure.ancestor_id == task_id)).all() or [task_id]
+    db.execute(delete(TaskDependency).where(or_(TaskDependency.task_id.in_(ids),
+                                                TaskDependency.blocked_by_id.in_(ids))))
+    db.execute(delete(TaskClosure).where(TaskClosure.descendant_id.in_(ids)))
+    db.execute(delete(TaskNotification).where(TaskNotification.task_id.in_(ids)))
+    deleted = db.execute(delete(Task).where(Task.id.in_(ids))).rowcount
+    deleted += db.execute(delete(ArchivedTask).where(ArchivedTask.id.in_(ids))).rowcount
+    return deleted
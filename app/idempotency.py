@@ -0,0 +1,256 @@
+"""
+Idempotency keys for POST endpoints.
+
+A client that times out cannot tell whether its request was executed, so it
+retries. Sending the same ``Idempotency-Key`` header with every attempt makes
+the retries safe: the first request claims the key, and later ones with the
+same key are answered with the first request's stored response instead of
+being executed again. Keys are scoped to the authenticated user and kept for
+``settings.idempotency_ttl_seconds``.
+
+A duplicate that arrives while the first request is still running waits for
+it (up to ``settings.idempotency_wait_seconds``, then 409) rather than
+running concurrently, so a burst of retries after a latency spike still
+produces exactly one write. The wait is async, so waiters hold no threadpool
+thread (only the database claim runs in one). Waiters in the worker running
+the first request are woken by an event; waiters in other workers poll the
+key's row. A claim
+whose request never finishes (e.g. its worker died) can be taken over after
+``settings.idempotency_lock_seconds``.
+
+Requests that fail with an exception (including HTTPException) release the
+key, since their transaction was rolled back and retrying is harmless.
+Routers opt in with ``route_class=IdempotentRoute``.
+
+A claim drops the expired keys of the user claiming; ``IdempotencyPurge``
+deletes those of every user periodically, so stored responses of users who
+stop sending requests do not accumulate.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+import anyio
+from fastapi import Depends, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.models.idempotency import IdempotencyKey
+from app.models.user import User
+from app.polling import PollingThread
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Seconds between checks of a key claimed by another worker
+POLL_SECONDS = 0.1
+
+# Seconds between purges of expired keys, and keys deleted per transaction
+PURGE_SECONDS = 3600
+PURGE_BATCH_SIZE = 1000
+
+# Events of the keys claimed by requests running in this process, with the loop they belong to
+_in_flight: dict[tuple[int, str], tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+_in_flight_lock = threading.Lock()
+
+
+class IdempotentReplay(Exception):
+    """Raised by the claim dependency to answer with a stored response."""
+
+    def __init__(self, response: Response):
+        self.response = response
+
+
+def fingerprint(method: str, url: str, body: bytes) -> str:
+    """
+    Digest a request, to detect a key reused for a different request.
+
+    Args:
+        method: HTTP method
+        url: Path and query string
+        body: Raw request body
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(f"{method} {url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def _try_claim(session: Session, user_id: int, key: str, request_fingerprint: str) -> Optional[IdempotencyKey]:
+    """Insert the key's row and return None, or return the row of whoever holds the key."""
+    now = datetime.utcnow()
+    # Expired keys of the user, including abandoned claims, are dropped first
+    session.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.expires_at <= now))
+    session.add(IdempotencyKey(user_id=user_id, key=key, fingerprint=request_fingerprint,
+                               expires_at=now + timedelta(seconds=settings.idempotency_lock_seconds)))
+    try:
+        session.commit()
+        return None
+    except IntegrityError:
+        session.rollback()
+    existing = session.query(IdempotencyKey).filter(IdempotencyKey.user_id == user_id,
+                                                    IdempotencyKey.key == key).first()
+    if existing is None:
+        # Released between the insert and the lookup: claim it on the next attempt
+        return _try_claim(session, user_id, key, request_fingerprint)
+    return existing
+
+
+def _claim(bind: Engine, user_id: int, key: str, request_fingerprint: str) -> Optional[IdempotencyKey]:
+    """Run ``_try_claim`` in a session of its own."""
+    with Session(bind=bind) as session:
+        return _try_claim(session, user_id, key, request_fingerprint)
+
+
+async def claim_idempotency_key(request: Request, idempotency_key: Optional[str] = Header(None, max_length=255),
+                          current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> None:
+    """
+    Claim the request's idempotency key, or wait for the request that holds it.
+
+    Args:
+        request: The incoming request
+        idempotency_key: Value of the ``Idempotency-Key`` header
+        current_user: Authenticated user dependency
+        db: Database session dependency (only its engine is used)
+
+    Raises:
+        IdempotentReplay: If the key was already used for this request
+        HTTPException: 422 if the key was used for a different request, 409 if
+        the request holding it is still running after the wait
+    """
+    if idempotency_key is None:
+        return
+    bind = db.get_bind()
+    in_flight = (current_user.id, idempotency_key)
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    while True:
+        existing = await run_in_threadpool(_claim, bind, current_user.id, idempotency_key,
+                                           request.state.idempotency_fingerprint)
+        if existing is None:
+            with _in_flight_lock:
+                _in_flight[in_flight] = (asyncio.get_running_loop(), asyncio.Event())
+            request.state.idempotency = (bind, current_user.id, idempotency_key)
+            return
+        if existing.fingerprint != request.state.idempotency_fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if existing.status_code is not None:
+            raise IdempotentReplay(Response(content=existing.body, status_code=existing.status_code,
+                                            media_type=existing.media_type, headers={REPLAYED_HEADER: "true"}))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        loop, event = _in_flight.get(in_flight, (None, None))
+        if loop is asyncio.get_running_loop():
+            with anyio.move_on_after(remaining):
+                await event.wait()
+        else:
+            await anyio.sleep(min(POLL_SECONDS, remaining))
+
+
+def _finish(bind: Engine, user_id: int, key: str, response: Optional[Response]) -> None:
+    """Store the response for the key, or release the key if there is none; wake local waiters."""
+    with Session(bind=bind) as session:
+        owned = (IdempotencyKey.user_id == user_id) & (IdempotencyKey.key == key)
+        if response is None:
+            session.execute(delete(IdempotencyKey).where(owned))
+        else:
+            session.execute(update(IdempotencyKey).where(owned).values(
+                status_code=response.status_code, media_type=response.media_type, body=bytes(response.body),
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.idempotency_ttl_seconds)))
+        session.commit()
+    with _in_flight_lock:
+        loop, event = _in_flight.pop((user_id, key), (None, None))
+    if event is not None:
+        # Runs in the threadpool: the event is set by its own loop
+        loop.call_soon_threadsafe(event.set)
+
+
+def purge_expired(bind: Engine, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Delete the expired keys of every user, abandoned claims included.
+
+    Args:
+        bind: Engine (or connection) holding the keys
+        batch_size: Keys deleted per transaction
+
+    Returns:
+        int: Number of keys deleted
+    """
+    now = datetime.utcnow()
+    purged = 0
+    while True:
+        with Session(bind=bind) as session:
+            expired = select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(batch_size)
+            deleted = session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired))).rowcount
+            session.commit()
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+
+
+class IdempotencyPurge(PollingThread):
+    """
+    Background thread in each worker purging expired idempotency keys.
+
+    Attributes:
+        bind: Engine holding the keys
+    """
+    failure_message = "Idempotency key purge failed"
+
+    def __init__(self, bind: Engine, purge_seconds: float = PURGE_SECONDS):
+        super().__init__("idempotency-purge", purge_seconds)
+        self.bind = bind
+
+    def poll(self) -> None:
+        purge_expired(self.bind)
+
+
+class IdempotentRoute(APIRoute):
+    """
+    Route class adding ``Idempotency-Key`` support to a router's POST endpoints.
+
+    The claim dependency is prepended to every POST route; the route handler
+    fingerprints the request before it runs and stores or releases the key
+    after it.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if "POST" in (kwargs.get("methods") or ()):
+            kwargs["dependencies"] = [Depends(claim_idempotency_key), *(kwargs.get("dependencies") or [])]
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            if request.method != "POST" or IDEMPOTENCY_HEADER not in request.headers:
+                return await handler(request)
+            url = f"{request.url.path}?{request.url.query}"
+            request.state.idempotency_fingerprint = fingerprint(request.method, url, await request.body())
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response
+            except Exception:
+                if getattr(request.state, "idempotency", None) is not None:
+                    await run_in_threadpool(_finish, *request.state.idempotency, None)
+                raise
+            if getattr(request.state, "idempotency", None) is not None:
+                # Server errors are not stored, so the client can retry them
+                stored = response if response.status_code < 500 and hasattr(response, "body") else None
+                await run_in_threadpool(_finish, *request.state.idempotency, stored)
+            return response
+
+        return idempotent_handler
@@ -1,23 +1,139 @@
 """
 TaskForge - A FastAPI-based task and project management application.
 
-This module initializes the FastAPI application, registers all routers,
-and creates the database tables.
+This module initializes the FastAPI application, registers middleware and
+all routers, and creates the database tables.
 """
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
 import app.database as db
+import app.tracing as tracing
+from app.activity import ActivityFlusher, activity_log
+from app.compression import CompressionMiddleware
+from app.config import settings
+from app.cpu_profiler import ProfileHeaderMiddleware, ProfileTriggerWatcher, profile_sessions
+from app.deletion import resume_project_deletions
+from app.idempotency import IdempotencyPurge
+from app.profiling import SQLProfilingMiddleware, instrument
+from app.replicas import ReplicaStickinessMiddleware
+from app.revocation import RevocationSync, revocations
+from app.routers.activity import project_activity_router, task_activity_router
+from app.routers.admin import admin_router
 from app.routers.auth import auth_router
+from app.routers.dependencies import dependency_router, planning_router
+from app.routers.members import member_router
+from app.routers.notifications import notification_router
 from app.routers.projects import project_router
 from app.routers.tasks import task_router, task_detail_router
+from app.routers.views import project_view_router, view_router
+from app.saved_views import ViewSync, view_cache
+from app.scheduler import DueSchedulerThread, due_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: resume background jobs interrupted by a restart,
+    load the revoked access tokens and keep them in sync, purge expired
+    idempotency keys, run the due-date scheduler, the activity log writer
+    and the saved view sync, and watch for CPU profiles requested through
+    any worker.
+
+    Args:
+        app: The FastAPI application
+    """
+    threading.Thread(target=resume_project_deletions, args=(db.engine,), name="project-deletions",
+                     daemon=True).start()
+    revocations.sync(db.engine)
+    revocation_sync = RevocationSync(db.engine, revocations, poll_seconds=settings.revocation_sync_seconds)
+    revocation_sync.start()
+    idempotency_purge = IdempotencyPurge(db.engine)
+    idempotency_purge.start()
+    scheduler = DueSchedulerThread(db.engine, due_scheduler, tick_seconds=settings.scheduler_tick_seconds)
+    scheduler.start()
+    activity_flusher = ActivityFlusher(db.engine, activity_log, flush_seconds=settings.activity_flush_seconds)
+    activity_flusher.start()
+    view_cache.sync(db.engine)
+    view_sync = ViewSync(db.engine, view_cache, poll_seconds=settings.view_sync_seconds)
+    view_sync.start()
+    watcher = ProfileTriggerWatcher(profile_sessions, max_overhead=settings.profile_max_overhead)
+    watcher.start()
+    yield
+    watcher.stop()
+    revocation_sync.stop()
+    idempotency_purge.stop()
+    scheduler.stop()
+    activity_flusher.stop()
+    view_sync.stop()
+    if tracing.tracer.enabled:
+        tracing.tracer.processor.flush()
+
+
+TaskForge = FastAPI(lifespan=lifespan)
+
+
+@TaskForge.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError) -> JSONResponse:
+    """
+    Report a row changed by a concurrent request between loading and flushing it.
+
+    Args:
+        request: The failed request
+        exc: Error raised by the versioned flush
+
+    Returns:
+        JSONResponse: 409 response asking the client to retry
+    """
+    return JSONResponse(status_code=409, content={"detail": "Resource was modified by another request, retry"})
+
+
+TaskForge.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size,
+                         gzip_level=settings.compression_gzip_level, brotli_level=settings.compression_brotli_level,
+                         zstd_level=settings.compression_zstd_level, offload_size=settings.compression_offload_size)
+
+TaskForge.add_middleware(ReplicaStickinessMiddleware, sticky_seconds=settings.replica_sticky_seconds)
+
+if settings.sql_profiling:
+    for profiled_engine in (db.engine, db.replica_engine):
+        if profiled_engine is not None:
+            instrument(profiled_engine)
+    TaskForge.add_middleware(SQLProfilingMiddleware, repeat_threshold=settings.sql_repeat_threshold)
+
+TaskForge.add_middleware(ProfileHeaderMiddleware, sessions=profile_sessions,
+                         max_overhead=settings.profile_max_overhead)
+
+exporter = tracing.make_exporter(settings.tracing_exporter, settings.tracing_file, settings.tracing_otlp_endpoint,
+                                 settings.tracing_service_name)
+if exporter is not None:
+    tracing.configure(exporter, settings.tracing_sample_rate)
+    for traced_engine in (db.engine, db.replica_engine):
+        if traced_engine is not None:
+            tracing.instrument_engine(traced_engine)
+    tracing.instrument_serialization()
 
-TaskForge = FastAPI()
+# Outermost, so the request span covers every other middleware
+TaskForge.add_middleware(tracing.TracingMiddleware)
 
+TaskForge.include_router(admin_router)
 TaskForge.include_router(auth_router)
 TaskForge.include_router(project_router)
 TaskForge.include_router(task_router)
 TaskForge.include_router(task_detail_router)
+TaskForge.include_router(dependency_router)
+TaskForge.include_router(planning_router)
+TaskForge.include_router(member_router)
+TaskForge.include_router(notification_router)
+TaskForge.include_router(project_activity_router)
+TaskForge.include_router(task_activity_router)
+TaskForge.include_router(project_view_router)
+TaskForge.include_router(view_router)
 
+# Creates missing tables only; changes to existing tables go through `python -m app.migrations`
 db.Base.metadata.create_all(bind=db.engine)
 
 
@@ -0,0 +1,8 @@
+"""
+Versioned schema migrations.
+
+Run ``python -m app.migrations --help`` for the command line interface.
+"""
+from app.migrations.runner import Migration, MigrationRunner, Operations, PlannedStep, discover_migrations
+
+__all__ = ["Migration", "MigrationRunner", "Operations", "PlannedStep", "discover_migrations"]
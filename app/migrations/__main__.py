@@ -0,0 +1,54 @@
+"""
+Command line interface for schema migrations.
+
+Usage:
+    python -m app.migrations status
+    python -m app.migrations upgrade [--to REVISION] [--dry-run]
+"""
+import argparse
+
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.migrations.runner import MigrationRunner
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Parse arguments and run the requested migration command.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="TaskForge schema migrations")
+    parser.add_argument("--database-url", default=settings.database_url, help="Database to migrate")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Show applied and pending revisions")
+    upgrade = commands.add_parser("upgrade", help="Apply pending revisions")
+    upgrade.add_argument("--to", dest="target", help="Stop after this revision")
+    upgrade.add_argument("--dry-run", action="store_true", help="Print planned statements and time estimates")
+    args = parser.parse_args(argv)
+
+    runner = MigrationRunner(create_engine(args.database_url))
+    if args.command == "status":
+        applied = runner.applied()
+        for migration in runner.migrations:
+            state = f"applied {applied[migration.revision]:%Y-%m-%d %H:%M}" if migration.revision in applied \
+                else "pending"
+            print(f"{migration.revision}  {state:<24} {migration.description}")
+        return 0
+
+    steps = runner.upgrade(target=args.target, dry_run=args.dry_run)
+    for step in steps:
+        estimate = f"~{step.rows} rows, ~{step.estimated_seconds:.1f}s" if step.table and args.dry_run else ""
+        print(f"[{step.revision}] {step.sql}  {estimate}".rstrip())
+    if args.dry_run:
+        print(f"Estimated total: {sum(step.estimated_seconds for step in steps):.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,7 @@
+"""
+Migration scripts, applied in revision order.
+
+Each module defines ``revision``, ``description`` and ``upgrade(op)``. Every
+operation must be idempotent so that databases created with ``create_all``
+can be brought under migration control by running all revisions.
+"""
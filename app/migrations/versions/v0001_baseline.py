@@ -0,0 +1,16 @@
+"""
+Baseline schema: users, projects and tasks.
+
+Tables are created from the current model definitions, so on a fresh database
+later revisions find their columns and indexes already present and skip them.
+"""
+from app.database import Base
+from app.models import project, task, user  # noqa: F401  (registers the tables on Base.metadata)
+
+revision = "0001"
+description = "Baseline users, projects and tasks tables"
+
+
+def upgrade(op):
+    for name in ("users", "projects", "tasks"):
+        op.create_table(Base.metadata.tables[name])
@@ -0,0 +1,11 @@
+"""
+Index the foreign keys used by every ownership and listing query.
+"""
+revision = "0002"
+description = "Index projects.owner_id, tasks.project_id and tasks.assignee_id"
+
+
+def upgrade(op):
+    op.create_index("ix_projects_owner_id", "projects", ["owner_id"])
+    op.create_index("ix_tasks_project_id", "tasks", ["project_id"])
+    op.create_index("ix_tasks_assignee_id", "tasks", ["assignee_id"])
@@ -0,0 +1,58 @@
+"""
+Store task status and priority as small-integer codes.
+
+Legacy databases keep both columns as free-form strings. The conversion adds
+nullable code columns, backfills them in key-range batches, then swaps them in
+with a short transaction that first converts any rows written during the
+backfill. On PostgreSQL the CHECK constraints are added NOT VALID and then
+validated, which scans the table without blocking writes. SQLite cannot add
+constraints to an existing table, so there the application-side type is the
+only guard.
+"""
+from sqlalchemy import Column, Integer, SmallInteger
+
+from app.models.task import PRIORITY_CODES, STATUS_CODES, priority_type, status_type
+
+revision = "0003"
+description = "Convert tasks.status and tasks.priority to small-integer codes"
+
+
+def _case(column: str, codes: dict, default: int) -> str:
+    whens = " ".join(f"WHEN '{member.value}' THEN {code}" for member, code in codes.items())
+    return f"CASE {column} {whens} ELSE {default} END"
+
+
+def upgrade(op):
+    if not isinstance(op.column_type("tasks", "status"), Integer):
+        op.add_column("tasks", Column("status_code", SmallInteger, nullable=True))
+        op.add_column("tasks", Column("priority_code", SmallInteger, nullable=True))
+        assignments = (f"status_code = {_case('status', STATUS_CODES, 0)}, "
+                       f"priority_code = {_case('priority', PRIORITY_CODES, 2)}")
+        op.backfill("tasks", assignments, where="status_code IS NULL")
+
+        swap = []
+        if op.dialect == "postgresql":
+            swap.append("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+        swap += [
+            f"UPDATE tasks SET {assignments} WHERE status_code IS NULL",
+            "ALTER TABLE tasks DROP COLUMN status",
+            "ALTER TABLE tasks DROP COLUMN priority",
+            "ALTER TABLE tasks RENAME COLUMN status_code TO status",
+            "ALTER TABLE tasks RENAME COLUMN priority_code TO priority",
+        ]
+        op.execute(swap, table="tasks")
+
+        if op.dialect == "postgresql":
+            for name, clause in (("ck_tasks_status", status_type.check_clause("status")),
+                                 ("ck_tasks_priority", priority_type.check_clause("priority")),
+                                 ("ck_tasks_status_not_null", "status IS NOT NULL"),
+                                 ("ck_tasks_priority_not_null", "priority IS NOT NULL")):
+                op.execute(f"ALTER TABLE tasks ADD CONSTRAINT {name} CHECK ({clause}) NOT VALID", table="tasks")
+                op.execute(f"ALTER TABLE tasks VALIDATE CONSTRAINT {name}", table="tasks")
+            # SET NOT NULL reuses the validated constraints instead of rescanning the table
+            op.execute(["ALTER TABLE tasks ALTER COLUMN status SET NOT NULL",
+                        "ALTER TABLE tasks ALTER COLUMN priority SET NOT NULL",
+                        "ALTER TABLE tasks DROP CONSTRAINT ck_tasks_status_not_null",
+                        "ALTER TABLE tasks DROP CONSTRAINT ck_tasks_priority_not_null"], table="tasks")
+
+    op.create_index("ix_tasks_project_id_status", "tasks", ["project_id", "status"])
@@ -0,0 +1,17 @@
+"""
+Composite indexes for sorted, keyset-paginated task listings.
+
+The single-column project_id index from revision 0002 becomes redundant once
+every composite index starts with project_id, so it is dropped afterwards.
+"""
+revision = "0004"
+description = "Add (project_id, sort key, id) indexes on tasks"
+
+
+def upgrade(op):
+    op.create_index("ix_tasks_project_priority_due", "tasks", ["project_id", "priority DESC", "due_date", "id"])
+    op.create_index("ix_tasks_project_due", "tasks", ["project_id", "due_date", "id"])
+    op.create_index("ix_tasks_project_created", "tasks", ["project_id", "created_at", "id"])
+    op.create_index("ix_tasks_project_updated", "tasks", ["project_id", "updated_at", "id"])
+    op.create_index("ix_tasks_project_name", "tasks", ["project_id", "name", "id"])
+    op.drop_index("ix_tasks_project_id", "tasks")
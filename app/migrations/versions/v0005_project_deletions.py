@@ -0,0 +1,15 @@
+"""
+Background project deletion: soft-delete marker and job table.
+"""
+from sqlalchemy import Column, DateTime
+
+from app.database import Base
+from app.models import deletion  # noqa: F401  (registers project_deletions on Base.metadata)
+
+revision = "0005"
+description = "Add projects.deleted_at and the project_deletions job table"
+
+
+def upgrade(op):
+    op.add_column("projects", Column("deleted_at", DateTime, nullable=True))
+    op.create_table(Base.metadata.tables["project_deletions"])
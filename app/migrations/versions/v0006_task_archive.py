@@ -0,0 +1,20 @@
+"""
+Hot/cold task archiving: project archive marker and the tasks_archive table.
+
+On PostgreSQL the archive is created hash-partitioned by project. Existing
+SQLite tasks tables keep their rowid allocation, so the highest task ID can
+be reused once it is archived; databases created from the models use
+AUTOINCREMENT and never reuse IDs.
+"""
+from sqlalchemy import Column, DateTime
+
+from app.database import Base
+from app.models import task  # noqa: F401  (registers tasks_archive on Base.metadata)
+
+revision = "0006"
+description = "Add projects.archived_at and the partitioned tasks_archive table"
+
+
+def upgrade(op):
+    op.add_column("projects", Column("archived_at", DateTime, nullable=True))
+    op.create_table(Base.metadata.tables["tasks_archive"])
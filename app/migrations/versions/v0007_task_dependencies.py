@@ -0,0 +1,19 @@
+"""
+Task dependencies: the edge table and the tasks' topological rank.
+
+Existing tasks keep a NULL topo_order and rank by their ID until an edge
+forces them to move, so no backfill is needed.
+"""
+from sqlalchemy import Column, Integer
+
+from app.database import Base
+from app.models import dependency  # noqa: F401  (registers task_dependencies on Base.metadata)
+
+revision = "0007"
+description = "Add tasks.topo_order and the task_dependencies table"
+
+
+def upgrade(op):
+    op.add_column("tasks", Column("topo_order", Integer, nullable=True))
+    op.add_column("tasks_archive", Column("topo_order", Integer, nullable=True))
+    op.create_table(Base.metadata.tables["task_dependencies"])
@@ -0,0 +1,22 @@
+"""
+Subtasks: tasks.parent_id and the task_closure table.
+
+Every existing task becomes a top-level task; its closure row pairing it
+with itself is inserted in one statement per task table.
+"""
+from sqlalchemy import Column, Integer
+
+from app.database import Base
+from app.models import hierarchy  # noqa: F401  (registers task_closure on Base.metadata)
+
+revision = "0008"
+description = "Add tasks.parent_id and the task_closure table"
+
+
+def upgrade(op):
+    op.add_column("tasks", Column("parent_id", Integer, nullable=True))
+    op.add_column("tasks_archive", Column("parent_id", Integer, nullable=True))
+    op.create_table(Base.metadata.tables["task_closure"])
+    for table in ("tasks", "tasks_archive"):
+        op.execute(f"INSERT INTO task_closure (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM {table} "
+                   f"WHERE id NOT IN (SELECT descendant_id FROM task_closure)", table=table)
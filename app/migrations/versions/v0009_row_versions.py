@@ -0,0 +1,15 @@
+"""
+Optimistic concurrency: version counters on tasks and projects.
+
+The columns are added with a server default, which PostgreSQL stores as
+metadata instead of rewriting the tables; every existing row starts at 1.
+"""
+from sqlalchemy import Column, Integer
+
+revision = "0009"
+description = "Add version columns to tasks, tasks_archive and projects"
+
+
+def upgrade(op):
+    for table in ("tasks", "tasks_archive", "projects"):
+        op.add_column(table, Column("version", Integer, server_default="1", nullable=False))
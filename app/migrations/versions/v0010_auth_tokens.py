@@ -0,0 +1,16 @@
+"""
+Refresh tokens and access token revocation.
+
+Both tables are new, so nothing is backfilled. Access tokens issued before
+the upgrade carry no jti claim and cannot be revoked; they simply expire.
+"""
+from app.database import Base
+from app.models import token  # noqa: F401  (registers the token tables on Base.metadata)
+
+revision = "0010"
+description = "Add the refresh_tokens and revoked_tokens tables"
+
+
+def upgrade(op):
+    op.create_table(Base.metadata.tables["refresh_tokens"])
+    op.create_table(Base.metadata.tables["revoked_tokens"])
@@ -0,0 +1,14 @@
+"""
+Idempotency keys for POST endpoints.
+
+The table is new, so nothing is backfilled.
+"""
+from app.database import Base
+from app.models import idempotency  # noqa: F401  (registers idempotency_keys on Base.metadata)
+
+revision = "0011"
+description = "Add the idempotency_keys table"
+
+
+def upgrade(op):
+    op.create_table(Base.metadata.tables["idempotency_keys"])
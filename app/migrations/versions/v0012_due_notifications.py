@@ -0,0 +1,18 @@
+"""
+Due-soon and overdue notifications.
+
+Adds the (due_date, status) index scanned by the due scheduler, the
+notifications table and the scheduler checkpoint table. The scheduler
+starts without a checkpoint, so tasks already overdue are not notified.
+"""
+from app.database import Base
+from app.models import notification  # noqa: F401  (registers the notification tables on Base.metadata)
+
+revision = "0012"
+description = "Add ix_tasks_due_status and the task_notifications and scheduler_checkpoints tables"
+
+
+def upgrade(op):
+    op.create_index("ix_tasks_due_status", "tasks", ["due_date", "status"])
+    op.create_table(Base.metadata.tables["task_notifications"])
+    op.create_table(Base.metadata.tables["scheduler_checkpoints"])
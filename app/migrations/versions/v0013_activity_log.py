@@ -0,0 +1,14 @@
+"""
+Append-only activity log.
+
+The table is new, so nothing is backfilled; history starts with the upgrade.
+"""
+from app.database import Base
+from app.models import activity  # noqa: F401  (registers activity_log on Base.metadata)
+
+revision = "0013"
+description = "Add the activity_log table"
+
+
+def upgrade(op):
+    op.create_table(Base.metadata.tables["activity_log"])
@@ -0,0 +1,21 @@
+"""
+Team projects: the project_members table and users.memberships_version.
+
+Every existing project's owner becomes its "owner" member, inserted in one
+statement.
+"""
+from sqlalchemy import Column, Integer
+
+from app.database import Base
+from app.models import member  # noqa: F401  (registers project_members on Base.metadata)
+
+revision = "0014"
+description = "Add the project_members table and users.memberships_version"
+
+
+def upgrade(op):
+    op.add_column("users", Column("memberships_version", Integer, server_default="0", nullable=False))
+    op.create_table(Base.metadata.tables["project_members"])
+    op.execute("INSERT INTO project_members (project_id, user_id, role, created_at) "
+               "SELECT id, owner_id, 'owner', created_at FROM projects "
+               "WHERE id NOT IN (SELECT project_id FROM project_members)", table="projects")
@@ -0,0 +1,16 @@
+"""
+Saved views: the saved_views table, and an index for views filtering on the assignee.
+
+"Assigned to me" views of a project are a range scan of
+(project_id, assignee_id), already in due date order.
+"""
+from app.database import Base
+from app.models import view  # noqa: F401  (registers saved_views on Base.metadata)
+
+revision = "0015"
+description = "Add the saved_views table and the (project_id, assignee_id, due_date, id) task index"
+
+
+def upgrade(op):
+    op.create_table(Base.metadata.tables["saved_views"])
+    op.create_index("ix_tasks_project_assignee_due", "tasks", ["project_id", "assignee_id", "due_date", "id"])
@@ -0,0 +1,22 @@
+"""
+Order activity entries by change rather than by ID.
+
+IDs are assigned when a worker flushes its buffer, so they do not follow
+the order of the changes across workers. Entries now record the task's row
+version; existing task entries get version 0, which keeps them, in ID
+order, before every entry recorded from now on. The feed indexes are
+replaced by ones matching the new orders.
+"""
+from sqlalchemy import Column, Integer
+
+revision = "0016"
+description = "Add activity_log.task_version and order the feed indexes by change"
+
+
+def upgrade(op):
+    op.add_column("activity_log", Column("task_version", Integer, nullable=True))
+    op.backfill("activity_log", "task_version = 0", where="task_id IS NOT NULL AND task_version IS NULL")
+    op.create_index("ix_activity_log_project_time", "activity_log", ["project_id", "created_at", "id"])
+    op.create_index("ix_activity_log_task_version", "activity_log", ["task_id", "task_version", "id"])
+    op.drop_index("ix_activity_log_project", "activity_log")
+    op.drop_index("ix_activity_log_task", "activity_log")
@@ -0,0 +1,12 @@
+"""
+Index idempotency keys by expiry.
+
+Expired keys are now purged for every user by a background thread, which
+range-scans this index.
+"""
+revision = "0017"
+description = "Index idempotency_keys.expires_at for the expired key purge"
+
+
+def upgrade(op):
+    op.create_index("ix_idempotency_keys_expires", "idempotency_keys", ["expires_at"])
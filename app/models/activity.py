@@ -0,0 +1,58 @@
+"""
+Activity log model.
+
+This module defines the ActivityEntry SQLAlchemy model, the append-only log
+of the changes made to projects and tasks.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Index, Text
+
+from app.database import Base
+
+
+class ActivityEntry(Base):
+    """
+    One change made by a user to a project or task.
+
+    Entries are only ever inserted (see app.activity), except by retention
+    and compaction. ``changes`` holds the fields written by the change and
+    their new values as compact JSON, e.g. ``{"status":"done"}``. Like
+    dependencies, rows carry no foreign keys so they outlive deleted and
+    archived tasks.
+
+    IDs are assigned when a worker writes its buffer, so across workers ID
+    order is not change order. The order of a task's changes is given by
+    ``task_version``: a field's previous value is the one recorded by the
+    task's entry with the next lower version. Entries of different tasks are
+    ordered by ``created_at``, the time the change was made according to the
+    worker making it.
+
+    Attributes:
+        id: Unique identifier, increasing in insertion order
+        project_id: ID of the project
+        task_id: ID of the task (None for changes to the project itself)
+        actor_id: ID of the user who made the change
+        action: "created", "updated", "moved", "deleted", "archived", "unarchived",
+            "member_added", "member_updated" or "member_removed"
+        changes: JSON object of the written fields and their new values
+        created_at: Time the change was made
+        task_version: Row version of the task after the change (one more than
+            the last version for deletions; 0 for entries logged before
+            versions were recorded; None for changes to the project itself)
+    """
+    __tablename__ = "activity_log"
+    __table_args__ = (
+        # Feeds are read newest first: a backward range scan of either index
+        Index("ix_activity_log_project_time", "project_id", "created_at", "id"),
+        Index("ix_activity_log_task_version", "task_id", "task_version", "id"),
+        Index("ix_activity_log_created_at", "created_at"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=True)
+    actor_id = Column(Integer, nullable=False)
+    action = Column(String(16), nullable=False)
+    changes = Column(Text, nullable=False, default="{}")
+    created_at = Column(DateTime, nullable=False)
+    task_version = Column(Integer, nullable=True)
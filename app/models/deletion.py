@@ -0,0 +1,40 @@
+"""
+Project deletion job model.
+
+This module defines the ProjectDeletion SQLAlchemy model tracking background
+jobs that remove a project and its tasks in batches.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ProjectDeletion(Base):
+    """
+    Background job deleting a project and all of its tasks.
+
+    Attributes:
+        id: Unique identifier for the job
+        project_id: ID of the project being deleted (the row is gone once the job completes)
+        owner_id: Foreign key to the user who requested the deletion
+        status: Job state (pending, running, completed, failed)
+        tasks_deleted: Number of tasks removed so far
+        error: Error message if the job failed
+        created_at: Timestamp of the deletion request
+        heartbeat_at: Timestamp of the last completed batch, used to detect abandoned jobs
+        finished_at: Timestamp the job completed or failed
+    """
+    __tablename__ = "project_deletions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    status = Column(String, default="pending", index=True, nullable=False)
+    tasks_deleted = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __mapper_args__ = {"eager_defaults": True}
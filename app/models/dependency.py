@@ -0,0 +1,40 @@
+"""
+Task dependency model.
+
+This module defines the TaskDependency SQLAlchemy model storing "blocked by"
+edges between tasks of the same project.
+"""
+from sqlalchemy import Column, Integer, DateTime, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class TaskDependency(Base):
+    """
+    Edge stating that a task cannot start before another task is done.
+
+    The task columns carry no foreign keys because edges are kept while
+    their tasks sit in the archive table; they are removed explicitly when a
+    task or project is deleted.
+
+    Attributes:
+        id: Unique identifier for the edge
+        task_id: ID of the blocked task
+        blocked_by_id: ID of the task that must be done first
+        project_id: ID of the project both tasks belong to
+        created_at: Timestamp the dependency was added
+    """
+    __tablename__ = "task_dependencies"
+    __table_args__ = (
+        # Also serves lookups of a task's blockers
+        UniqueConstraint("task_id", "blocked_by_id", name="uq_task_dependencies_edge"),
+        Index("ix_task_dependencies_blocked_by", "blocked_by_id", "task_id"),
+        Index("ix_task_dependencies_project_id", "project_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    blocked_by_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
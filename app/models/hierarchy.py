@@ -0,0 +1,33 @@
+"""
+Task hierarchy model.
+
+This module defines the TaskClosure SQLAlchemy model, the closure table of
+the parent/child relationships between tasks.
+"""
+from sqlalchemy import Column, Integer, Index
+
+from app.database import Base
+
+
+class TaskClosure(Base):
+    """
+    Ancestor/descendant pair of the task hierarchy.
+
+    Every task has a row pairing it with itself at depth 0 and one row for
+    each of its ancestors, so a whole subtree is a single range scan of the
+    primary key. Like dependencies, rows carry no foreign keys so they
+    survive archiving; they are removed when a task or project is deleted.
+
+    Attributes:
+        ancestor_id: ID of the ancestor task
+        descendant_id: ID of the descendant task
+        depth: Number of levels between the two (0 for the task itself)
+    """
+    __tablename__ = "task_closure"
+    __table_args__ = (
+        Index("ix_task_closure_descendant", "descendant_id", "depth"),
+    )
+
+    ancestor_id = Column(Integer, primary_key=True, autoincrement=False)
+    descendant_id = Column(Integer, primary_key=True, autoincrement=False)
+    depth = Column(Integer, nullable=False)
@@ -0,0 +1,49 @@
+"""
+Idempotency key model.
+
+This module defines the IdempotencyKey SQLAlchemy model storing the outcome
+of POST requests sent with an ``Idempotency-Key`` header, so retries are
+answered from the stored response instead of being executed again.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    A user's idempotency key and the response of the request that used it.
+
+    The row is inserted when the first request claims the key and completed
+    with its response once the request has finished; until then
+    ``status_code`` is None and duplicates wait for it.
+
+    Attributes:
+        id: Unique identifier for the key
+        user_id: ID of the user who sent the request
+        key: Client-chosen key (unique per user)
+        fingerprint: Hex SHA-256 digest of the method, URL and body of the request
+        status_code: Status of the stored response (None while in flight)
+        media_type: Content type of the stored response
+        body: Body of the stored response
+        created_at: Timestamp the key was first used
+        expires_at: Time after which the key may be reused: the TTL of the
+            stored response, or the claim timeout while in flight
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        # Range scans of expired keys by the purge (see app.idempotency)
+        Index("ix_idempotency_keys_expires", "expires_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    media_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
@@ -0,0 +1,42 @@
+"""
+Project membership model.
+
+This module defines the ProjectMember SQLAlchemy model granting users a role
+in a project.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ProjectMember(Base):
+    """
+    A user's role in a project.
+
+    The project's owner has a member row with the "owner" role, created with
+    the project, so this table alone answers which projects a user can
+    access. Requests read it through the cached membership map of
+    app.permissions; every change must call ``membership_changed``.
+
+    Attributes:
+        id: Unique identifier for the membership
+        project_id: Foreign key to the project
+        user_id: Foreign key to the member
+        role: "owner", "editor" or "viewer"
+        created_at: Timestamp the user joined the project
+    """
+    __tablename__ = "project_members"
+    __table_args__ = (
+        UniqueConstraint("project_id", "user_id", name="uq_project_members_project_user"),
+        # Loading a user's membership map is a range scan of this index
+        Index("ix_project_members_user", "user_id", "project_id", "role"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    role = Column(String(16), nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __mapper_args__ = {"eager_defaults": True}
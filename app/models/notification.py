@@ -0,0 +1,62 @@
+"""
+Notification models.
+
+This module defines the TaskNotification SQLAlchemy model for the due-soon
+and overdue notifications emitted by the scheduler (see app.scheduler), and
+the SchedulerCheckpoint model recording how far the scheduler has got.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class TaskNotification(Base):
+    """
+    Notification that a task is due soon or overdue.
+
+    A task gets at most one notification of each kind per due date, which
+    makes emitting them idempotent: several workers, or a worker catching up
+    after a restart, can race to emit the same one. Moving the due date
+    allows the task to be notified again. Like dependencies, rows carry no
+    task foreign key so they survive archiving.
+
+    Attributes:
+        id: Unique identifier for the notification
+        user_id: ID of the recipient (the assignee, or the project owner)
+        task_id: ID of the task
+        project_id: ID of the task's project
+        kind: "due_soon" or "overdue"
+        due_date: Due date of the task when the notification was emitted
+        created_at: Timestamp the notification was emitted
+        read_at: Time the recipient marked it as read (None while unread)
+    """
+    __tablename__ = "task_notifications"
+    __table_args__ = (
+        UniqueConstraint("task_id", "kind", "due_date", name="uq_task_notifications_task_kind_due"),
+        Index("ix_task_notifications_user", "user_id", "id"),
+        Index("ix_task_notifications_project_id", "project_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    task_id = Column(Integer, nullable=False)
+    project_id = Column(Integer, nullable=False)
+    kind = Column(String(16), nullable=False)
+    due_date = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    read_at = Column(DateTime, nullable=True)
+
+
+class SchedulerCheckpoint(Base):
+    """
+    Point in time up to which a background scheduler has processed its events.
+
+    Attributes:
+        name: Name of the scheduler
+        processed_until: Every event due before this time has been handled
+    """
+    __tablename__ = "scheduler_checkpoints"
+
+    name = Column(String(64), primary_key=True)
+    processed_until = Column(DateTime, nullable=False)
@@ -21,6 +21,11 @@ class Project(Base):
         description: Project description
         owner_id: Foreign key to the user who owns this project
         created_at: Timestamp of project creation
+        deleted_at: Set when deletion was requested; the project is hidden from then on
+            and removed by a background job
+        archived_at: Set while the project is archived and its tasks live in tasks_archive
+        version: Incremented on every update; used for optimistic concurrency
+            (see app.concurrency)
         owner: Relationship to the owning user
         tasks: Relationship to project's tasks (cascade delete)
     """
@@ -29,8 +34,13 @@ class Project(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    deleted_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=True)
+    version = Column(Integer, server_default="1", nullable=False)
 
     owner = relationship("User", back_populates="projects")
     tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
@@ -2,13 +2,22 @@
 Task database model.
 
 This module defines the Task SQLAlchemy model representing
-individual tasks within projects with status tracking and assignment.
+individual tasks within projects with status tracking and assignment, and
+the ArchivedTask model holding tasks moved out of the hot table.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, CheckConstraint, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.models.types import IntEnum
+from app.schemas.task import TaskStatus, TaskPriority
+
+STATUS_CODES = {TaskStatus.TODO: 0, TaskStatus.IN_PROGRESS: 1, TaskStatus.DONE: 2}
+PRIORITY_CODES = {TaskPriority.LOW: 1, TaskPriority.MEDIUM: 2, TaskPriority.HIGH: 3}
+
+status_type = IntEnum(TaskStatus, STATUS_CODES)
+priority_type = IntEnum(TaskPriority, PRIORITY_CODES)
 
 
 class Task(Base):
@@ -19,28 +28,111 @@ class Task(Base):
         id: Unique identifier for the task
         name: Task name
         description: Task description
-        status: Current status (todo, in_progress, done)
-        priority: Task priority level (low, medium, high)
+        status: Current status (todo, in_progress, done), stored as a small integer
+        priority: Task priority level (low, medium, high), stored as a small integer
+            whose numeric order matches the priority order
         due_date: Optional deadline for task completion
         project_id: Foreign key to the parent project
         assignee_id: Foreign key to assigned user (optional)
         created_at: Timestamp of task creation
         updated_at: Timestamp of last update
+        topo_order: Position in the project's dependency order, maintained
+            incrementally as dependencies are added; NULL means the task's ID
+            (see ``topo_rank``)
+        parent_id: ID of the parent task (None for top-level tasks); the
+            full hierarchy is kept in ``task_closure``
+        version: Incremented on every update; used for optimistic concurrency
+            (see app.concurrency)
         project: Relationship to the parent project
         assignee: Relationship to the assigned user
     """
     __tablename__ = "tasks"
+    __table_args__ = (
+        CheckConstraint(status_type.check_clause("status"), name="ck_tasks_status"),
+        CheckConstraint(priority_type.check_clause("priority"), name="ck_tasks_priority"),
+        Index("ix_tasks_project_id_status", "project_id", "status"),
+        # Never reuse IDs on SQLite: archived tasks keep their ID in tasks_archive
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
-    status = Column(String, default="todo", nullable=False)
-    priority = Column(String, default="medium", nullable=False)
+    status = Column(status_type, default=TaskStatus.TODO, nullable=False)
+    priority = Column(priority_type, default=TaskPriority.MEDIUM, nullable=False)
     due_date = Column(DateTime, nullable=True)
     project_id = Column(Integer, ForeignKey('projects.id'), nullable=False)
-    assignee_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    assignee_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    topo_order = Column(Integer, nullable=True)
+    parent_id = Column(Integer, nullable=True)
+    version = Column(Integer, server_default="1", nullable=False)
 
     project = relationship("Project", back_populates="tasks")
     assignee = relationship("User")
+
+    # Server-generated values (id, created_at, updated_at) come back from the
+    # INSERT/UPDATE itself via RETURNING instead of a refresh SELECT
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
+
+
+# Every blocker sorts before the tasks it blocks. New tasks need no value:
+# their ID is larger than any order assigned so far.
+topo_rank = func.coalesce(Task.topo_order, Task.id)
+
+# Composite indexes backing the sort options of task listings. Each ends with
+# the primary key tie-breaker so a sorted, keyset-paginated page is a single
+# index range scan; together they also cover lookups by project_id alone.
+Index("ix_tasks_project_priority_due", Task.project_id, Task.priority.desc(), Task.due_date, Task.id)
+Index("ix_tasks_project_due", Task.project_id, Task.due_date, Task.id)
+Index("ix_tasks_project_created", Task.project_id, Task.created_at, Task.id)
+Index("ix_tasks_project_updated", Task.project_id, Task.updated_at, Task.id)
+Index("ix_tasks_project_name", Task.project_id, Task.name, Task.id)
+# "Assigned to me" saved views (see app.saved_views)
+Index("ix_tasks_project_assignee_due", Task.project_id, Task.assignee_id, Task.due_date, Task.id)
+
+# Range scans of upcoming due dates by the due scheduler (see app.scheduler)
+Index("ix_tasks_due_status", Task.due_date, Task.status)
+
+
+ARCHIVE_PARTITIONS = 8
+
+
+class ArchivedTask(Base):
+    """
+    Archived (cold) task moved out of the hot tasks table.
+
+    Has the same columns as Task plus the time it was archived. On PostgreSQL
+    the table is hash-partitioned by project so reading one archived project
+    touches a single partition.
+
+    Attributes:
+        archived_at: Timestamp the task was moved to the archive
+    """
+    __tablename__ = "tasks_archive"
+    __table_args__ = (
+        Index("ix_tasks_archive_project", "project_id", "id"),
+        {"postgresql_partition_by": "HASH (project_id)"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    description = Column(String, nullable=True)
+    status = Column(status_type, nullable=False)
+    priority = Column(priority_type, nullable=False)
+    due_date = Column(DateTime, nullable=True)
+    project_id = Column(Integer, primary_key=True, autoincrement=False)
+    assignee_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    topo_order = Column(Integer, nullable=True)
+    parent_id = Column(Integer, nullable=True)
+    version = Column(Integer, server_default="1", nullable=False)
+    archived_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+
+for _remainder in range(ARCHIVE_PARTITIONS):
+    event.listen(ArchivedTask.__table__, "after_create", DDL(
+        f"CREATE TABLE IF NOT EXISTS tasks_archive_p{_remainder} PARTITION OF tasks_archive "
+        f"FOR VALUES WITH (MODULUS {ARCHIVE_PARTITIONS}, REMAINDER {_remainder})").execute_if(dialect="postgresql"))
@@ -0,0 +1,59 @@
+"""
+Authentication token models.
+
+This module defines the RefreshToken SQLAlchemy model for the long-lived
+tokens exchanged for new access tokens, and the RevokedToken model listing
+access tokens revoked before their expiry.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """
+    Refresh token issued at login and rotated on every use.
+
+    Only a SHA-256 digest of the token is stored. Tokens are random, so a fast
+    hash is enough and rotating one costs no bcrypt round.
+
+    Attributes:
+        id: Unique identifier for the token
+        user_id: ID of the user the token was issued to
+        token_hash: Hex SHA-256 digest of the token (unique)
+        expires_at: Time after which the token is no longer accepted
+        created_at: Timestamp the token was issued
+        revoked_at: Time the token was rotated or revoked (None while usable)
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    token_hash = Column(String(64), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+
+
+class RevokedToken(Base):
+    """
+    Access token revoked before its expiry.
+
+    Workers mirror this table in memory (see app.revocation) and pick up new
+    rows by ID, so IDs must never be reused: SQLite is told to use
+    AUTOINCREMENT rather than recycling the highest rowid once it is purged.
+
+    Attributes:
+        id: Unique identifier, increasing in insertion order
+        jti: ID claim of the revoked access token (unique)
+        expires_at: Expiry of the access token; the row is useless afterwards
+        created_at: Timestamp the token was revoked
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String(32), unique=True, nullable=False)
+    expires_at = Column(DateTime, index=True, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
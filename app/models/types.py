@@ -0,0 +1,60 @@
+"""
+Custom column types shared by the database models.
+
+This module defines compact storage types used to keep hot, heavily indexed
+columns small.
+"""
+from enum import Enum
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class IntEnum(TypeDecorator):
+    """
+    Store a string enum as a small integer code.
+
+    Codes are chosen by the model so that their numeric order is the order
+    the application wants to sort by, which lets ORDER BY and range filters
+    be served directly from an index on the column. Values are accepted as
+    enum members or their string values and are always returned as members.
+
+    Attributes:
+        enum_class: The Enum class being stored
+        codes: Pairs of (enum value, integer code)
+    """
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class: type[Enum], codes: dict[Enum, int]):
+        super().__init__()
+        self.enum_class = enum_class
+        self.codes = tuple((member.value, code) for member, code in codes.items())
+        self._to_code = dict(self.codes)
+        self._to_member = {code: enum_class(value) for value, code in self.codes}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        key = value.value if isinstance(value, Enum) else value
+        try:
+            return self._to_code[key]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {self.enum_class.__name__}") from None
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._to_member[value]
+
+    def check_clause(self, column: str) -> str:
+        """
+        Build a CHECK constraint expression restricting a column to known codes.
+
+        Args:
+            column: Column name
+
+        Returns:
+            str: SQL expression for the constraint
+        """
+        return f"{column} IN ({', '.join(str(code) for _, code in self.codes)})"
@@ -20,6 +20,8 @@ class User(Base):
         email: User's email address (unique)
         hashed_password: Bcrypt-hashed password
         created_at: Timestamp of user registration
+        memberships_version: Incremented whenever the user's project memberships change;
+            invalidates the cached membership map (see app.permissions)
         projects: Relationship to user's owned projects
     """
     __tablename__ = "users"
@@ -28,5 +30,8 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    memberships_version = Column(Integer, server_default="0", nullable=False)
 
     projects = relationship("Project", back_populates="owner")
+
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,51 @@
+"""
+Saved view model.
+
+This module defines the SavedView SQLAlchemy model, a user's named task
+filter over one project.
+"""
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class SavedView(Base):
+    """
+    A named filter over a project's tasks, saved by one user.
+
+    ``filters`` holds the view's predicate (see ViewFilters) as compact JSON,
+    e.g. ``{"status":["todo","in_progress"],"priority":["high"]}``. Views
+    are private to the user who saved them; opening one still requires
+    access to the project. Results of cached views are kept and maintained by
+    app.saved_views.
+
+    Attributes:
+        id: Unique identifier for the view
+        user_id: Foreign key to the user who saved the view
+        project_id: Foreign key to the project whose tasks are filtered
+        name: Name of the view, unique per user and project
+        filters: JSON object of the view's predicate
+        sort: Sort specification, as accepted by the task listing (None for ID order)
+        cached: Whether each worker keeps the view's result in memory
+        created_at: Timestamp of view creation
+        version: Incremented on every update; tells workers their cached result
+            was built for an older definition
+    """
+    __tablename__ = "saved_views"
+    __table_args__ = (
+        UniqueConstraint("user_id", "project_id", "name", name="uq_saved_views_user_project_name"),
+        Index("ix_saved_views_project_id", "project_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    name = Column(String, nullable=False)
+    filters = Column(Text, nullable=False, default="{}")
+    sort = Column(String, nullable=True)
+    cached = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    version = Column(Integer, server_default="1", nullable=False)
+
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
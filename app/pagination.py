@@ -0,0 +1,197 @@
+"""
+Sorting and keyset pagination helpers.
+
+This module parses ``sort`` query parameters, builds ORDER BY clauses that
+match the composite indexes on the listed tables, and implements keyset
+(seek) pagination with opaque cursors. Pages are fetched with a range
+condition on the sort keys instead of OFFSET, so page N costs the same as
+page 1.
+
+NULL values sort as "greater than everything": last in ascending order and
+first in descending order. This is PostgreSQL's default B-tree ordering, so
+a plain index on a nullable column serves both directions.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Integer, String, and_, false, or_
+from sqlalchemy.orm import Query
+
+from app.models.types import IntEnum
+
+SortKey = tuple[str, bool]
+
+
+def parse_sort(sort: Optional[str], allowed: set[str], max_keys: int = 3) -> list[SortKey]:
+    """
+    Parse a comma-separated sort specification such as "-priority,due_date".
+
+    A leading "-" sorts that field in descending order.
+
+    Args:
+        sort: Raw sort parameter (None for the default order)
+        allowed: Field names that may be sorted on
+        max_keys: Maximum number of sort fields
+
+    Returns:
+        list[SortKey]: (field, descending) pairs
+
+    Raises:
+        HTTPException: If a field is unknown, repeated, or too many are given
+    """
+    if not sort:
+        return []
+    keys: list[SortKey] = []
+    for part in sort.split(","):
+        part = part.strip()
+        name, descending = (part[1:], True) if part.startswith("-") else (part, False)
+        if name not in allowed or any(name == existing for existing, _ in keys):
+            raise HTTPException(status_code=422, detail=f"Invalid sort field: {part or sort!r}")
+        keys.append((name, descending))
+    if len(keys) > max_keys:
+        raise HTTPException(status_code=422, detail=f"At most {max_keys} sort fields are allowed")
+    return keys
+
+
+def with_tiebreaker(keys: list[SortKey]) -> list[SortKey]:
+    """
+    Complete sort keys with the primary key, making the order total.
+
+    The primary key follows the direction of the last key, so single-key
+    sorts are a pure forward or backward index scan.
+
+    Args:
+        keys: Parsed sort keys
+
+    Returns:
+        list[SortKey]: The keys, ending with ("id", descending)
+    """
+    if keys and keys[-1][0] == "id":
+        return keys
+    return keys + [("id", keys[-1][1] if keys else False)]
+
+
+def _order_clause(column, descending: bool):
+    if descending:
+        return column.desc().nulls_first() if column.nullable else column.desc()
+    return column.asc().nulls_last() if column.nullable else column.asc()
+
+
+def _after(column, value, descending: bool):
+    if value is None:
+        return column.is_not(None) if descending else false()
+    if descending:
+        return column < value
+    return or_(column > value, column.is_(None)) if column.nullable else column > value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+def _decode_value(column, value: Any) -> Any:
+    # Cursors come from clients: every value must be valid for its column
+    if value is None:
+        if not column.nullable:
+            raise ValueError(f"{column.name} cannot be null")
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, IntEnum):
+        return column.type.enum_class(value)
+    if isinstance(column.type, Integer) and (not isinstance(value, int) or isinstance(value, bool)):
+        raise TypeError(f"{column.name} must be an integer")
+    if isinstance(column.type, String) and not isinstance(value, str):
+        raise TypeError(f"{column.name} must be a string")
+    return value
+
+
+def encode_cursor(keys: list[SortKey], row) -> str:
+    """
+    Build an opaque cursor pointing just after ``row``.
+
+    Args:
+        keys: Sort keys used for the page
+        row: Last row of the page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    payload = {"s": [[name, descending] for name, descending in keys],
+               "v": [_encode_value(getattr(row, name)) for name, _ in with_tiebreaker(keys)]}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(model, keys: list[SortKey], cursor: str) -> list[Any]:
+    """
+    Decode a cursor produced by ``encode_cursor`` for the same sort keys.
+
+    Args:
+        model: Mapped class being paginated
+        keys: Sort keys of the current request
+        cursor: Cursor string from the previous page
+
+    Returns:
+        list[Any]: Values of the sort keys (plus id) of the last row seen
+
+    Raises:
+        HTTPException: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = payload["v"]
+        matches = [tuple(key) for key in payload["s"]] == keys
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    full_keys = with_tiebreaker(keys)
+    if not matches or len(values) != len(full_keys):
+        raise HTTPException(status_code=422, detail="Cursor does not match the requested sort")
+    try:
+        return [_decode_value(model.__table__.c[name], value) for (name, _), value in zip(full_keys, values)]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+
+def paginate(query: Query, model, keys: list[SortKey], cursor: Optional[str] = None,
+             limit: Optional[int] = None) -> tuple[list, Optional[str]]:
+    """
+    Apply ordering and keyset pagination to a query and fetch one page.
+
+    Args:
+        query: Filtered query over ``model``
+        model: Mapped class with an ``id`` primary key
+        keys: Parsed sort keys
+        cursor: Optional cursor from the previous page
+        limit: Optional page size; without it all remaining rows are returned
+
+    Returns:
+        tuple[list, Optional[str]]: Rows of the page and the cursor for the next
+        page (None when this is the last page)
+    """
+    full_keys = with_tiebreaker(keys)
+    columns = [(model.__table__.c[name], descending) for name, descending in full_keys]
+    if cursor is not None:
+        values = decode_cursor(model, keys, cursor)
+        query = query.filter(or_(*[
+            and_(*[_equal(column, value) for (column, _), value in zip(columns[:i], values[:i])],
+                 _after(columns[i][0], values[i], columns[i][1]))
+            for i in range(len(columns))
+        ]))
+    query = query.order_by(*[_order_clause(column, descending) for column, descending in columns])
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(keys, rows[-1])
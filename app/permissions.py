@@ -0,0 +1,149 @@
+"""
+Cached project permission checks.
+
+Every project and task endpoint checks the current user's role in a
+project. Instead of joining ``project_members`` into each query, the checks
+read a per-user membership map, ``{project_id: role}``, that each worker
+keeps in memory. Resolving a permission is then a dictionary lookup
+however many projects the user belongs to or however many members the
+project has.
+
+The map is loaded with one range scan of the ``(user_id, project_id, role)``
+index the first time a user is seen, and is tagged with the user's
+``memberships_version``. Code changing memberships calls
+``membership_changed`` in the same transaction, which increments the
+version of the affected users. The user row is already loaded by every
+authenticated request, so a worker notices a stale map without an extra
+query, including maps cached by other workers, and reloads it. Only the
+most recently used ``settings.membership_cache_users`` maps are kept.
+"""
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.member import ProjectMember
+from app.models.user import User
+from app.schemas.member import ProjectRole
+
+# Higher ranks include the permissions of lower ones
+ROLE_RANK = {ProjectRole.VIEWER: 0, ProjectRole.EDITOR: 1, ProjectRole.OWNER: 2}
+
+
+class MembershipCache:
+    """
+    Least recently used cache of users' membership maps.
+
+    Attributes:
+        max_users: Number of users whose maps are kept
+        loads: Maps loaded from the database since the cache was created
+    """
+
+    def __init__(self, max_users: int = 10_000):
+        self.max_users = max_users
+        self.loads = 0
+        self._maps: OrderedDict[int, tuple[int, dict[int, ProjectRole]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+    def roles(self, db: Session, user: User) -> dict[int, ProjectRole]:
+        """
+        Return the user's role in each of their projects.
+
+        Args:
+            db: Database session, used when the cached map is missing or stale
+            user: The authenticated user
+
+        Returns:
+            dict[int, ProjectRole]: Role by project ID (not to be modified)
+        """
+        user_id, version = user.id, user.memberships_version
+        with self._lock:
+            cached = self._maps.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._maps.move_to_end(user_id)
+                return cached[1]
+        rows = db.execute(select(ProjectMember.project_id, ProjectMember.role)
+                          .where(ProjectMember.user_id == user_id)).all()
+        roles = {row.project_id: ProjectRole(row.role) for row in rows}
+        with self._lock:
+            self.loads += 1
+            self._maps[user_id] = (version, roles)
+            self._maps.move_to_end(user_id)
+            while len(self._maps) > self.max_users:
+                self._maps.popitem(last=False)
+        return roles
+
+    def role(self, db: Session, user: User, project_id: int) -> Optional[ProjectRole]:
+        """
+        Return the user's role in a project.
+
+        Args:
+            db: Database session
+            user: The authenticated user
+            project_id: ID of the project
+
+        Returns:
+            Optional[ProjectRole]: The role, or None if the user is not a member
+        """
+        return self.roles(db, user).get(project_id)
+
+    def allows(self, db: Session, user: User, project_id: int, role: ProjectRole) -> bool:
+        """
+        Check that the user has at least ``role`` in a project.
+
+        Args:
+            db: Database session
+            user: The authenticated user
+            project_id: ID of the project
+            role: Least role required
+
+        Returns:
+            bool: True if the user's role is ``role`` or a higher one
+        """
+        granted = self.role(db, user, project_id)
+        return granted is not None and ROLE_RANK[granted] >= ROLE_RANK[role]
+
+    def project_ids(self, db: Session, user: User, role: ProjectRole) -> list[int]:
+        """
+        List the projects in which the user has at least ``role``.
+
+        Args:
+            db: Database session
+            user: The authenticated user
+            role: Least role required
+
+        Returns:
+            list[int]: Project IDs
+        """
+        return [project_id for project_id, granted in self.roles(db, user).items()
+                if ROLE_RANK[granted] >= ROLE_RANK[role]]
+
+    def clear(self) -> None:
+        """Forget every cached map."""
+        with self._lock:
+            self._maps.clear()
+
+
+def membership_changed(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Invalidate the cached membership maps of users, in every worker.
+
+    Must run in the transaction changing the memberships, so the new version
+    becomes visible together with them.
+
+    Args:
+        db: Session changing the memberships
+        user_ids: IDs of the users whose memberships changed
+    """
+    db.execute(update(User).where(User.id.in_(set(user_ids)))
+               .values(memberships_version=User.memberships_version + 1),
+               execution_options={"synchronize_session": False})
+
+
+memberships = MembershipCache(max_users=settings.membership_cache_users)
@@ -0,0 +1,59 @@
+"""
+Background polling threads.
+
+Each worker keeps some state in step with the database from a daemon thread
+doing one unit of work at a fixed interval: the revocation list, the due
+scheduler, the activity log writer, the saved view sync and the idempotency
+key purge. ``PollingThread`` holds their shared loop; subclasses implement
+``poll``. A poll that fails (the database may be briefly unreachable) is
+logged to the subclass module's logger and retried on the next interval
+rather than ending the thread.
+"""
+import logging
+import threading
+
+
+class PollingThread(threading.Thread):
+    """
+    Daemon thread calling ``poll`` every ``interval`` seconds until stopped.
+
+    Attributes:
+        interval: Seconds between polls
+        poll_at_start: Poll as soon as the thread starts instead of after the first interval
+        failure_message: Logged with the traceback when a poll raises
+    """
+    poll_at_start = False
+    failure_message = "Background poll failed"
+
+    def __init__(self, name: str, interval: float):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def poll(self) -> None:
+        """Do one unit of work."""
+        raise NotImplementedError
+
+    def wait(self) -> bool:
+        """
+        Wait for the next poll.
+
+        Returns:
+            bool: True if the thread was stopped meanwhile
+        """
+        return self._stopped.wait(self.interval)
+
+    def run(self) -> None:
+        if not self.poll_at_start and self.wait():
+            return
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logging.getLogger(type(self).__module__).exception(self.failure_message)
+            if self.wait():
+                return
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stopped.set()
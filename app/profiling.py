@@ -0,0 +1,244 @@
+"""
+Per-request SQL profiling and N+1 detection.
+
+Engine events record every statement executed while a ``QueryProfile`` is
+active: its SQL, duration and origin (the innermost frame in the ``app``
+package that issued it). Statements are grouped by shape, i.e. with bound
+values and IN lists collapsed, so a lazy relationship loaded once per row
+shows up as one shape repeated many times.
+
+Profiling is opt-in (``settings.sql_profiling``). When enabled,
+``SQLProfilingMiddleware`` adds ``X-SQL-Queries``, ``X-SQL-Time-Ms`` and
+``X-SQL-Repeated`` headers to every response and logs a summary of requests
+with repeated shapes. Tests can use ``query_budget`` to fail when a route
+issues more statements than expected, whether or not the setting is on.
+"""
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(APP_DIR)
+
+_PLACEHOLDER = r"(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)"
+_VALUE_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a statement so executions differing only in values compare equal.
+
+    Args:
+        statement: SQL as sent to the driver
+
+    Returns:
+        str: The statement with whitespace, literals and value lists collapsed
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _NUMBER.sub("?", shape)
+    return _VALUE_LIST.sub("(?)", shape)
+
+
+@dataclass
+class QueryRecord:
+    """
+    One executed statement.
+
+    Attributes:
+        statement: SQL as sent to the driver
+        duration: Execution time in seconds
+        origin: "path:line in function" of the app code that issued it
+    """
+    statement: str
+    duration: float
+    origin: str
+
+    @property
+    def shape(self) -> str:
+        return statement_shape(self.statement)
+
+
+@dataclass
+class QueryProfile:
+    """
+    Statements recorded during one request (or one ``query_budget`` block).
+
+    Attributes:
+        records: Executed statements in order
+    """
+    records: list[QueryRecord] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def total_time(self) -> float:
+        """Total execution time in seconds."""
+        return sum(record.duration for record in self.records)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int, list[str]]]:
+        """
+        Find statement shapes executed at least ``threshold`` times.
+
+        Args:
+            threshold: Minimum number of executions
+
+        Returns:
+            list: (shape, count, distinct origins) tuples, most frequent first
+        """
+        counts = Counter(record.shape for record in self.records)
+        return [(shape, count, sorted({record.origin for record in self.records if record.shape == shape}))
+                for shape, count in counts.most_common() if count >= threshold]
+
+    def report(self, threshold: int = 2) -> str:
+        """Render a readable summary listing every statement and the repeated shapes."""
+        lines = [f"{len(self)} statements in {self.total_time * 1000:.1f} ms"]
+        lines += [f"  {record.duration * 1000:7.2f} ms  {record.origin}  {record.shape}" for record in self.records]
+        for shape, count, origins in self.repeated(threshold):
+            lines.append(f"repeated {count}x from {', '.join(origins)}: {shape}")
+        return "\n".join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised by ``query_budget`` when a block executes too many statements."""
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+_watchers: list[QueryProfile] = []
+_watchers_lock = threading.Lock()
+
+
+def _origin() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename, ROOT_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["profiling_started"].pop()
+    profile = _current.get()
+    if profile is None and not _watchers:
+        return
+    record = QueryRecord(statement, duration, _origin())
+    if profile is not None:
+        profile.records.append(record)
+    with _watchers_lock:
+        for watcher in _watchers:
+            if watcher is not profile:
+                watcher.records.append(record)
+
+
+def _handle_error(exception_context):
+    started = exception_context.connection.info.get("profiling_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument(engine: Engine) -> None:
+    """
+    Attach the profiling listeners to an engine (idempotent).
+
+    Args:
+        engine: Engine whose statements should be recorded
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def query_budget(limit: int, engine: Engine) -> Iterator[QueryProfile]:
+    """
+    Fail if the enclosed block executes more than ``limit`` statements.
+
+    Statements are counted from every thread, so requests made through the
+    test client are included.
+
+    Args:
+        limit: Maximum number of statements allowed
+        engine: Engine to watch (instrumented if needed)
+
+    Yields:
+        QueryProfile: The statements recorded so far
+
+    Raises:
+        QueryBudgetExceeded: If the block executed more than ``limit`` statements
+    """
+    instrument(engine)
+    profile = QueryProfile()
+    with _watchers_lock:
+        _watchers.append(profile)
+    try:
+        yield profile
+    finally:
+        with _watchers_lock:
+            _watchers.remove(profile)
+    if len(profile) > limit:
+        raise QueryBudgetExceeded(f"Query budget of {limit} exceeded: {profile.report()}")
+
+
+class SQLProfilingMiddleware:
+    """
+    ASGI middleware profiling the SQL issued by each request.
+
+    Headers describe the statements executed before the response started;
+    statements issued while streaming a body are included in the log summary.
+
+    Attributes:
+        app: Wrapped ASGI application
+        repeat_threshold: A shape executed this many times is flagged as a likely N+1
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 5):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = QueryProfile()
+        token = _current.set(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-SQL-Queries"] = str(len(profile))
+                headers["X-SQL-Time-Ms"] = f"{profile.total_time * 1000:.1f}"
+                headers["X-SQL-Repeated"] = str(len(profile.repeated(self.repeat_threshold)))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            repeated = profile.repeated(self.repeat_threshold)
+            level = logging.WARNING if repeated else logging.DEBUG
+            if logger.isEnabledFor(level):
+                logger.log(level, "%s %s: %s", scope["method"], scope["path"], profile.report(self.repeat_threshold))
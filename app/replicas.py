@@ -0,0 +1,132 @@
+"""
+Read-replica routing.
+
+Read-only endpoints take their session from ``get_read_db`` instead of
+``get_db``. It returns a replica session when a replica is configured and
+healthy, and a primary session otherwise:
+
+- Read-your-writes: after a successful POST/PUT/PATCH/DELETE, the
+  ``ReplicaStickinessMiddleware`` sets a short-lived cookie, and requests
+  carrying it read from the primary until replication has had time to catch
+  up (``settings.replica_sticky_seconds``).
+- Health fallback: the replica connection is checked out before the handler
+  runs. If that fails, the replica is skipped for
+  ``settings.replica_retry_seconds`` and reads go to the primary.
+
+Without ``settings.replica_url`` every session comes from the primary.
+"""
+import threading
+import time
+
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+import app.database as database
+from app.config import settings
+
+STICKY_COOKIE = "taskforge_primary"
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReplicaHealth:
+    """
+    Tracks whether the replica may be used, skipping it for a while after a failure.
+
+    Attributes:
+        retry_seconds: How long a failed replica is skipped
+    """
+
+    def __init__(self, retry_seconds: float):
+        self.retry_seconds = retry_seconds
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Return whether reads may be sent to the replica."""
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self) -> None:
+        """Skip the replica until the retry interval has passed."""
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_seconds
+
+    def reset(self) -> None:
+        """Consider the replica available again."""
+        with self._lock:
+            self._down_until = 0.0
+
+
+replica_health = ReplicaHealth(settings.replica_retry_seconds)
+
+
+def read_session(request: Request) -> Session:
+    """
+    Open the session a read-only request should use.
+
+    Args:
+        request: The incoming request (checked for the stickiness cookie)
+
+    Returns:
+        Session: A replica session, or a primary session when no replica is
+        configured, the client wrote recently, or the replica is unavailable
+    """
+    if database.ReadSessionLocal is None or STICKY_COOKIE in request.cookies or not replica_health.available():
+        return database.SessionLocal()
+    session = database.ReadSessionLocal()
+    try:
+        session.connection()
+    except DBAPIError:
+        session.close()
+        replica_health.mark_down()
+        return database.SessionLocal()
+    return session
+
+
+def get_read_db(request: Request):
+    """
+    Dependency function that provides a session for read-only endpoints.
+
+    Args:
+        request: The incoming request
+
+    Yields:
+        Session: SQLAlchemy session on the replica or the primary
+
+    Note:
+        Automatically closes the session after use
+    """
+    db = read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class ReplicaStickinessMiddleware:
+    """
+    ASGI middleware pinning a client's reads to the primary right after it writes.
+
+    Attributes:
+        app: Wrapped ASGI application
+        sticky_seconds: Lifetime of the stickiness cookie
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: int = 10):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS or database.ReadSessionLocal is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append(
+                    "set-cookie", f"{STICKY_COOKIE}=1; Max-Age={self.sticky_seconds}; Path=/; HttpOnly; SameSite=Lax")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,142 @@
+"""
+Revocation of access tokens.
+
+Access tokens carry a ``jti`` claim. Revoking one inserts a RevokedToken row
+and adds the ID to the process-wide ``revocations`` list, an in-memory set
+that ``verify_access_token`` consults on every request: the check is a
+dictionary lookup and never a database round trip.
+
+Every worker keeps its own copy. ``RevocationSync`` polls the table in the
+background and loads the rows added since the last poll (a primary key
+range scan), so a token revoked through one worker is rejected by all of
+them within ``settings.revocation_sync_seconds``; the revoking worker
+rejects it immediately. An exact set is used rather than a Bloom filter:
+entries are dropped as soon as their token expires, so the list only ever
+holds tokens revoked within the last ``access_token_expiration_minutes``
+and stays small, and there are no false positives to fall back on the
+database for.
+"""
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models.token import RefreshToken, RevokedToken
+from app.polling import PollingThread
+
+# Rows below the newest ID seen that are re-read on each poll, so revocations
+# committed out of ID order by concurrent transactions are not missed
+SYNC_OVERLAP_ROWS = 100
+
+# Seconds between purges of expired revocations and refresh tokens
+PURGE_SECONDS = 3600
+
+
+class RevocationList:
+    """
+    In-memory set of the IDs of revoked, unexpired access tokens.
+
+    Attributes:
+        last_id: Highest RevokedToken ID loaded so far
+    """
+
+    def __init__(self):
+        self._expiry: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self.last_id = 0
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        """
+        Reject a token in this process without waiting for the next sync.
+
+        Args:
+            jti: ID claim of the token
+            expires_at: Expiry of the token
+        """
+        with self._lock:
+            self._expiry[jti] = expires_at
+
+    def sync(self, bind: Engine) -> int:
+        """
+        Load the revocations added since the last sync and forget expired ones.
+
+        Args:
+            bind: Engine (or connection) holding the revoked_tokens table
+
+        Returns:
+            int: Number of revoked tokens currently held
+        """
+        now = datetime.utcnow()
+        with Session(bind=bind) as session:
+            rows = session.execute(select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+                                   .where(RevokedToken.id > self.last_id - SYNC_OVERLAP_ROWS,
+                                          RevokedToken.expires_at > now)).all()
+        with self._lock:
+            for row in rows:
+                self._expiry[row.jti] = row.expires_at
+                self.last_id = max(self.last_id, row.id)
+            self._expiry = {jti: expires_at for jti, expires_at in self._expiry.items() if expires_at > now}
+            return len(self._expiry)
+
+
+def revoke(db: Session, jti: str, expires_at: datetime) -> None:
+    """
+    Revoke an access token in every worker. The caller commits.
+
+    Args:
+        db: Database session
+        jti: ID claim of the token
+        expires_at: Expiry of the token
+    """
+    if db.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti)) is None:
+        db.add(RevokedToken(jti=jti, expires_at=expires_at))
+    revocations.add(jti, expires_at)
+
+
+def purge_expired(bind: Engine) -> None:
+    """
+    Delete revocations and refresh tokens that have expired.
+
+    Args:
+        bind: Engine (or connection) to run the purge on
+    """
+    now = datetime.utcnow()
+    with Session(bind=bind) as session:
+        session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        session.execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        session.commit()
+
+
+class RevocationSync(PollingThread):
+    """
+    Background thread in each worker keeping ``revocations`` up to date.
+
+    Attributes:
+        bind: Engine holding the token tables
+        revocation_list: List to keep in sync
+    """
+    failure_message = "Revocation sync failed"
+
+    def __init__(self, bind: Engine, revocation_list: RevocationList, poll_seconds: float = 5.0):
+        super().__init__("revocation-sync", poll_seconds)
+        self.bind = bind
+        self.revocation_list = revocation_list
+        self._purged_at = 0.0
+
+    def poll(self) -> None:
+        self.revocation_list.sync(self.bind)
+        if time.monotonic() - self._purged_at > PURGE_SECONDS:
+            purge_expired(self.bind)
+            self._purged_at = time.monotonic()
+
+
+revocations = RevocationList()
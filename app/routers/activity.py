@@ -0,0 +1,113 @@
+"""
+Activity feed router.
+
+This module provides the newest-first activity feeds of a project and of a
+single task, read from the append-only activity log (see app.activity).
+"""
+import json
+from typing import Optional
+
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Query as SQLQuery, Session
+
+from app.config import settings
+from app.dependencies import get_current_reader, member_project
+from app.models.activity import ActivityEntry
+from app.models.project import Project
+from app.models.user import User
+from app.pagination import paginate
+from app.replicas import get_read_db
+from app.schemas.activity import ActivityResponse
+
+project_activity_router = APIRouter(
+    prefix="/projects/{project_id}/activity",
+    tags=["Activity"],
+)
+
+task_activity_router = APIRouter(
+    prefix="/tasks/{task_id}/activity",
+    tags=["Activity"],
+)
+
+# Newest first, by the time changes were made across tasks and by version
+# within a task (IDs follow flush order, see ActivityEntry); the ID breaks
+# ties, so pages are index range scans
+PROJECT_FEED_ORDER = [("created_at", True)]
+TASK_FEED_ORDER = [("task_version", True)]
+
+
+def _feed(query: SQLQuery, order: list[tuple[str, bool]], response: Response, cursor: Optional[str],
+          limit: Optional[int]) -> list[ActivityResponse]:
+    entries, next_cursor = paginate(query, ActivityEntry, order, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [ActivityResponse(id=entry.id, project_id=entry.project_id, task_id=entry.task_id,
+                             actor_id=entry.actor_id, action=entry.action, changes=json.loads(entry.changes),
+                             created_at=entry.created_at, task_version=entry.task_version) for entry in entries]
+
+
+@project_activity_router.get("/", response_model=list[ActivityResponse])
+def project_activity(project_id: int, response: Response,
+                     limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+                     cursor: Optional[str] = None, db: Session = Depends(get_read_db),
+                     current_user: User = Depends(get_current_reader)) -> list[ActivityResponse]:
+    """
+    List the changes made to a project and its tasks, newest first by the time they were made.
+
+    Changes appear within ``settings.activity_flush_seconds``, once the
+    activity log has been written. When ``limit`` is given and more entries
+    remain, the cursor for the next page is returned in the ``X-Next-Cursor``
+    header.
+
+    Args:
+        project_id: The ID of the project
+        response: Response used to attach the next-page cursor header
+        limit: Optional maximum number of entries to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[ActivityResponse]: Activity entries of the project
+
+    Raises:
+        HTTPException: If project not found or user doesn't have access, or the cursor is invalid
+    """
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    return _feed(db.query(ActivityEntry).filter(ActivityEntry.project_id == project_id), PROJECT_FEED_ORDER,
+                 response, cursor, limit)
+
+
+@task_activity_router.get("/", response_model=list[ActivityResponse])
+def task_activity(task_id: int, response: Response, limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+                  cursor: Optional[str] = None, db: Session = Depends(get_read_db),
+                  current_user: User = Depends(get_current_reader)) -> list[ActivityResponse]:
+    """
+    List the changes made to a task, newest first in task version order.
+
+    Works for live, archived and deleted tasks: access is checked against the
+    project recorded in the task's log.
+
+    Args:
+        task_id: The ID of the task
+        response: Response used to attach the next-page cursor header
+        limit: Optional maximum number of entries to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[ActivityResponse]: Activity entries of the task
+
+    Raises:
+        HTTPException: If the task has no activity, user doesn't have access, or the cursor is invalid
+    """
+    project_id = db.scalar(select(ActivityEntry.project_id).where(ActivityEntry.task_id == task_id).limit(1))
+    if project_id is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return _feed(db.query(ActivityEntry).filter(ActivityEntry.task_id == task_id), TASK_FEED_ORDER,
+                 response, cursor, limit)
@@ -0,0 +1,79 @@
+"""
+Admin router for operational tooling.
+
+This module provides the CPU profiler endpoints. They are restricted to the
+users listed in ``settings.admin_emails``.
+"""
+from datetime import datetime
+from typing import Literal
+
+from fastapi import Depends, APIRouter, HTTPException, Path, Query, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app import cpu_profiler
+from app.config import settings
+from app.cpu_profiler import format_collapsed, render_svg
+from app.dependencies import get_admin_user
+from app.models.user import User
+from app.schemas.admin import ProfileResponse
+
+admin_router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+
+@admin_router.post("/profiles", status_code=202, response_model=ProfileResponse)
+def start_profile(response: Response, seconds: int = Query(10, ge=1, le=settings.profile_max_seconds),
+                  interval_ms: int = Query(settings.profile_interval_ms, ge=1, le=1000),
+                  admin: User = Depends(get_admin_user)) -> ProfileResponse:
+    """
+    Start a sampling CPU profile in every worker process.
+
+    Each worker samples its threads until the deadline; the merged result is
+    available at the URL in the ``Location`` header once all have finished.
+
+    Args:
+        response: Response used to attach the ``Location`` header
+        seconds: How long to sample
+        interval_ms: Milliseconds between samples (stretched if sampling gets too expensive)
+        admin: Authenticated administrator dependency
+
+    Returns:
+        ProfileResponse: The started profile
+
+    Raises:
+        HTTPException: If the user is not an administrator
+    """
+    trigger = cpu_profiler.profile_sessions.start(seconds, interval_ms / 1000)
+    response.headers["Location"] = f"/admin/profiles/{trigger['id']}"
+    return ProfileResponse(id=trigger["id"], until=datetime.fromtimestamp(trigger["until"]), interval_ms=interval_ms)
+
+
+@admin_router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str = Path(pattern="^[0-9a-f]{32}$"),
+                output: Literal["collapsed", "svg"] = Query("collapsed", alias="format"),
+                admin: User = Depends(get_admin_user)) -> Response:
+    """
+    Download a CPU profile as collapsed stacks or an SVG flamegraph.
+
+    Args:
+        profile_id: Profile ID from ``POST /admin/profiles`` or an ``X-Profile-Id`` header
+        output: "collapsed" (default, for flamegraph.pl or speedscope) or "svg"
+        admin: Authenticated administrator dependency
+
+    Returns:
+        Response: The profile, or 202 while workers are still sampling
+
+    Raises:
+        HTTPException: If the profile does not exist or the user is not an administrator
+    """
+    try:
+        finished, stacks = cpu_profiler.profile_sessions.collect(profile_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not finished:
+        return JSONResponse({"detail": "Profile is still running"}, status_code=202)
+    if output == "svg":
+        return Response(render_svg(stacks), media_type="image/svg+xml")
+    return PlainTextResponse(format_collapsed(stacks))
@@ -1,17 +1,27 @@
 """
-Authentication router for user registration and login.
+Authentication router for user registration, login and token management.
 
-This module handles user authentication endpoints including
-user registration and login with JWT token generation.
+This module handles user authentication endpoints including user
+registration, login with JWT token generation, refresh token rotation and
+logout.
 """
-from fastapi import Depends, HTTPException, APIRouter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Body, Depends, HTTPException, APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from app.auth import get_password_hash, verify_password, create_access_token
+from app.auth import (get_password_hash, verify_password, create_access_token, create_refresh_token,
+                      decode_access_token, hash_refresh_token)
+from app.config import settings
 from app.database import get_db
+from app.dependencies import get_current_user, oauth2_scheme
+from app.models.token import RefreshToken
 from app.models.user import User
-from app.schemas.user import UserResponse, UserCreate, Token
+from app.revocation import revoke
+from app.schemas.user import UserResponse, UserCreate, Token, RefreshRequest, LogoutRequest
 
 auth_router = APIRouter(
     prefix="/auth",
@@ -41,22 +51,23 @@ def register_user(user_create: UserCreate, db: Session = Depends(get_db)) -> Use
     hashed_password = get_password_hash(user_create.password)
     new_user = User(email=user_create.email, hashed_password=hashed_password)
     db.add(new_user)
+    db.flush()
+    user_response = UserResponse(id=new_user.id, email=new_user.email, created_at=new_user.created_at)
     db.commit()
-    db.refresh(new_user)
-    return UserResponse(id=new_user.id, email=new_user.email, created_at=new_user.created_at)
+    return user_response
 
 
 @auth_router.post("/login")
 def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)) -> Token:
     """
-    Authenticate a user and generate a JWT access token.
+    Authenticate a user and generate a JWT access token and a refresh token.
 
     Args:
         form_data: OAuth2 form containing username (email) and password
         db: Database session dependency
 
     Returns:
-        Token: JWT access token and token type
+        Token: JWT access token, token type and refresh token
 
     Raises:
         HTTPException: If credentials are invalid
@@ -65,5 +76,85 @@ def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    token = _issue_tokens(db, user)
+    db.commit()
+    return token
+
+
+def _issue_tokens(db: Session, user: User) -> Token:
+    refresh_token, token_hash = create_refresh_token()
+    expires_at = datetime.utcnow() + timedelta(days=settings.refresh_token_expiration_days)
+    db.add(RefreshToken(user_id=user.id, token_hash=token_hash, expires_at=expires_at))
     access_token = create_access_token(data={"sub": user.email})
-    return Token(access_token=access_token, token_type="bearer")
+    return Token(access_token=access_token, token_type="bearer", refresh_token=refresh_token)
+
+
+@auth_router.post("/refresh")
+def refresh_tokens(refresh_request: RefreshRequest, db: Session = Depends(get_db)) -> Token:
+    """
+    Exchange a refresh token for a new access token and refresh token.
+
+    The presented refresh token is consumed by a single conditional UPDATE,
+    so two concurrent requests with the same token cannot both succeed. A
+    token that was already used is treated as stolen: every refresh token of
+    its user is revoked, forcing a new login.
+
+    Args:
+        refresh_request: The refresh token to exchange
+        db: Database session dependency
+
+    Returns:
+        Token: New JWT access token, token type and refresh token
+
+    Raises:
+        HTTPException: If the refresh token is unknown, expired or already used
+    """
+    now = datetime.utcnow()
+    token_hash = hash_refresh_token(refresh_request.refresh_token)
+    user_id = db.scalar(update(RefreshToken)
+                        .where(RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_(None),
+                               RefreshToken.expires_at > now)
+                        .values(revoked_at=now).returning(RefreshToken.user_id),
+                        execution_options={"synchronize_session": False})
+    if user_id is None:
+        used = db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash,
+                                             RefreshToken.revoked_at.is_not(None)).first()
+        if used is not None:
+            db.execute(update(RefreshToken).where(RefreshToken.user_id == used.user_id,
+                                                  RefreshToken.revoked_at.is_(None)).values(revoked_at=now))
+            db.commit()
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    token = _issue_tokens(db, db.get(User, user_id))
+    db.commit()
+    return token
+
+
+@auth_router.post("/logout")
+def logout_user(logout_request: Optional[LogoutRequest] = Body(default=None), token: str = Depends(oauth2_scheme),
+                current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> dict:
+    """
+    Revoke the access token of the request and optionally a refresh token.
+
+    The access token is rejected by this worker at once and by the others
+    after their next revocation sync.
+
+    Args:
+        logout_request: Optional refresh token to revoke as well
+        token: JWT access token from the Authorization header
+        current_user: Authenticated user dependency
+        db: Database session dependency
+
+    Returns:
+        dict: Confirmation message
+    """
+    claims = decode_access_token(token)
+    if claims.get("jti") is not None:
+        revoke(db, claims["jti"], datetime.utcfromtimestamp(claims["exp"]))
+    if logout_request is not None and logout_request.refresh_token is not None:
+        db.execute(update(RefreshToken)
+                   .where(RefreshToken.token_hash == hash_refresh_token(logout_request.refresh_token),
+                          RefreshToken.user_id == current_user.id, RefreshToken.revoked_at.is_(None))
+                   .values(revoked_at=datetime.utcnow()))
+    db.commit()
+    return {"detail": "Logged out successfully"}
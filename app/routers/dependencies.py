@@ -0,0 +1,204 @@
+"""
+Task dependency router.
+
+This module provides endpoints for adding and removing "blocked by"
+dependencies between tasks of a project, and for the planning views built
+on them: the ready set and the critical path. Reading requires any
+role in the associated project, changing dependencies the editor role.
+"""
+from typing import Optional
+
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_current_user, get_current_reader, member_project
+from app.graph import CycleError, add_dependency, critical_path, ready_tasks
+from app.models.dependency import TaskDependency
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.pagination import parse_sort, paginate
+from app.replicas import get_read_db
+from app.routers.tasks import TASK_SORT_FIELDS
+from app.schemas.member import ProjectRole
+from app.schemas.task import TaskResponse, DependencyCreate, DependencyResponse, CriticalPathResponse
+
+dependency_router = APIRouter(
+    prefix="/tasks/{task_id}/dependencies",
+    tags=["Dependencies"],
+)
+
+planning_router = APIRouter(
+    prefix="/projects/{project_id}/tasks",
+    tags=["Dependencies"],
+)
+
+
+def _task_response(task: Task) -> TaskResponse:
+    return TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                        priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                        assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                        updated_at=task.updated_at)
+
+
+def _member_task(db: Session, user: User, task_id: int, role: ProjectRole = ProjectRole.VIEWER) -> Task:
+    task = db.query(Task).filter(Task.id == task_id).first()
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if member_project(db, user, task.project_id, role).first() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return task
+
+
+@dependency_router.post("/", response_model=DependencyResponse)
+def create_dependency(task_id: int, dependency_create: DependencyCreate, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)) -> DependencyResponse:
+    """
+    Mark a task as blocked by another task of the same project.
+
+    Adding an existing dependency again returns it unchanged.
+
+    Args:
+        task_id: The ID of the blocked task
+        dependency_create: The blocking task
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        DependencyResponse: The dependency
+
+    Raises:
+        HTTPException: If either task is not found, user doesn't have access,
+        the tasks belong to different projects, or the dependency would create a cycle
+    """
+    task = _member_task(db, current_user, task_id, ProjectRole.EDITOR)
+    blocker = db.query(Task).filter(Task.id == dependency_create.blocked_by_id).first()
+    if blocker is None or blocker.project_id != task.project_id:
+        raise HTTPException(status_code=422, detail="Blocking task must be a task of the same project")
+
+    # Serialize graph changes per project so concurrent inserts cannot form a cycle together
+    db.query(Project).filter(Project.id == task.project_id).with_for_update().one()
+    try:
+        edge = add_dependency(db, task, blocker)
+    except CycleError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    db.commit()
+    return DependencyResponse(task_id=edge.task_id, blocked_by_id=edge.blocked_by_id, created_at=edge.created_at)
+
+
+@dependency_router.get("/", response_model=list[TaskResponse])
+def list_dependencies(task_id: int, db: Session = Depends(get_read_db),
+                      current_user: User = Depends(get_current_reader)) -> list[TaskResponse]:
+    """
+    List the tasks blocking a task.
+
+    Args:
+        task_id: The ID of the blocked task
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[TaskResponse]: The blocking tasks
+
+    Raises:
+        HTTPException: If task not found or user doesn't have access
+    """
+    _member_task(db, current_user, task_id)
+    blockers = db.query(Task).join(TaskDependency, TaskDependency.blocked_by_id == Task.id).filter(
+        TaskDependency.task_id == task_id).order_by(Task.id)
+    return [_task_response(task) for task in blockers]
+
+
+@dependency_router.delete("/{blocked_by_id}")
+def delete_dependency(task_id: int, blocked_by_id: int, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)) -> dict:
+    """
+    Remove a dependency.
+
+    Args:
+        task_id: The ID of the blocked task
+        blocked_by_id: The ID of the blocking task
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        dict: Success message
+
+    Raises:
+        HTTPException: If the task or dependency is not found or user doesn't have access
+    """
+    _member_task(db, current_user, task_id, ProjectRole.EDITOR)
+    deleted = db.query(TaskDependency).filter(TaskDependency.task_id == task_id,
+                                              TaskDependency.blocked_by_id == blocked_by_id).delete()
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Dependency not found")
+    db.commit()
+    return {"detail": "Dependency deleted successfully"}
+
+
+@planning_router.get("/ready", response_model=list[TaskResponse])
+def list_ready_tasks(project_id: int, response: Response, sort: Optional[str] = None,
+                     limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+                     cursor: Optional[str] = None, db: Session = Depends(get_read_db),
+                     current_user: User = Depends(get_current_reader)) -> list[TaskResponse]:
+    """
+    List the todo tasks of a project whose blockers are all done.
+
+    Sorting and pagination work as in the task listing.
+
+    Args:
+        project_id: The ID of the project
+        response: Response used to attach the next-page cursor header
+        sort: Optional sort specification
+        limit: Optional maximum number of tasks to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[TaskResponse]: Tasks that can be started now
+
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or the sort or cursor are invalid
+    """
+    keys = parse_sort(sort, TASK_SORT_FIELDS)
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+
+    tasks, next_cursor = paginate(ready_tasks(db, project_id), Task, keys, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_task_response(task) for task in tasks]
+
+
+@planning_router.get("/critical-path", response_model=CriticalPathResponse)
+def get_critical_path(project_id: int, task_id: Optional[int] = None, db: Session = Depends(get_read_db),
+                      current_user: User = Depends(get_current_reader)) -> CriticalPathResponse:
+    """
+    Get the longest chain of unfinished blockers leading to a task.
+
+    Without ``task_id`` the chain leads to the unfinished task with the
+    earliest due date, i.e. the deadline most at risk.
+
+    Args:
+        project_id: The ID of the project
+        task_id: Optional task the path should lead to
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        CriticalPathResponse: The tasks on the path, in the order they must be done
+
+    Raises:
+        HTTPException: If project or task not found or user doesn't have access
+    """
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    if task_id is not None and db.query(Task).filter(Task.id == task_id, Task.project_id == project_id).first() is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    path = critical_path(db, project_id, task_id)
+    return CriticalPathResponse(target_id=path[-1].id if path else None, tasks=[_task_response(task) for task in path])
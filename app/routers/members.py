@@ -0,0 +1,185 @@
+"""
+Project membership router.
+
+This module provides endpoints for sharing a project: listing its members,
+adding users with a role, changing their role and removing them. Any member
+can list the members; only the owner can change them, except that members
+can remove themselves. Every change invalidates the cached membership map
+of the affected user (see app.permissions).
+"""
+from fastapi import Depends, APIRouter, HTTPException
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.activity import activity_log
+from app.database import get_db
+from app.dependencies import get_current_user, get_current_reader, member_project
+from app.idempotency import IdempotentRoute
+from app.models.member import ProjectMember
+from app.models.user import User
+from app.permissions import membership_changed
+from app.replicas import get_read_db
+from app.schemas.member import MemberCreate, MemberResponse, MemberUpdate, ProjectRole
+
+member_router = APIRouter(
+    prefix="/projects/{project_id}/members",
+    tags=["Members"],
+    route_class=IdempotentRoute,
+)
+
+
+def _member_response(member: ProjectMember, email: str) -> MemberResponse:
+    return MemberResponse(user_id=member.user_id, email=email, role=member.role, created_at=member.created_at)
+
+
+def _require_owner(db: Session, user: User, project_id: int) -> None:
+    if member_project(db, user, project_id, ProjectRole.OWNER).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+
+
+def _grantable(role: ProjectRole) -> None:
+    if role == ProjectRole.OWNER:
+        raise HTTPException(status_code=422, detail="A project has a single owner")
+
+
+@member_router.get("/", response_model=list[MemberResponse])
+def list_members(project_id: int, db: Session = Depends(get_read_db),
+                 current_user: User = Depends(get_current_reader)) -> list[MemberResponse]:
+    """
+    List the members of a project and their roles.
+
+    Args:
+        project_id: The ID of the project
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[MemberResponse]: Members in the order they joined
+
+    Raises:
+        HTTPException: If project not found or user doesn't have access
+    """
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    rows = db.query(ProjectMember, User.email).join(User, User.id == ProjectMember.user_id).filter(
+        ProjectMember.project_id == project_id).order_by(ProjectMember.id)
+    return [_member_response(member, email) for member, email in rows]
+
+
+@member_router.post("/", response_model=MemberResponse)
+def add_member(project_id: int, member_create: MemberCreate, db: Session = Depends(get_db),
+               current_user: User = Depends(get_current_user)) -> MemberResponse:
+    """
+    Share a project with another user.
+
+    Args:
+        project_id: The ID of the project
+        member_create: Email of the user to add and their role
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        MemberResponse: The new membership
+
+    Raises:
+        HTTPException: If project not found or user is not its owner, the role is
+        "owner", the user does not exist, or is already a member
+    """
+    _require_owner(db, current_user, project_id)
+    _grantable(member_create.role)
+    user = db.query(User).filter(User.email == member_create.email).first()
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if db.query(ProjectMember).filter(ProjectMember.project_id == project_id,
+                                      ProjectMember.user_id == user.id).first() is not None:
+        raise HTTPException(status_code=409, detail="User is already a member of the project")
+
+    member = ProjectMember(project_id=project_id, user_id=user.id, role=member_create.role.value)
+    db.add(member)
+    membership_changed(db, [user.id])
+    db.flush()
+    member_response = _member_response(member, user.email)
+    activity_log.record(db, project_id, None, current_user.id, "member_added",
+                        {"user_id": member_response.user_id, "role": member_response.role})
+    db.commit()
+    return member_response
+
+
+@member_router.put("/{user_id}", response_model=MemberResponse)
+def update_member(project_id: int, user_id: int, member_update: MemberUpdate, db: Session = Depends(get_db),
+                  current_user: User = Depends(get_current_user)) -> MemberResponse:
+    """
+    Change a member's role.
+
+    Args:
+        project_id: The ID of the project
+        user_id: The ID of the member
+        member_update: The new role
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        MemberResponse: The updated membership
+
+    Raises:
+        HTTPException: If project not found or user is not its owner, the role is
+        "owner", the member is not found, or is the owner
+    """
+    _require_owner(db, current_user, project_id)
+    _grantable(member_update.role)
+    row = db.query(ProjectMember, User.email).join(User, User.id == ProjectMember.user_id).filter(
+        ProjectMember.project_id == project_id, ProjectMember.user_id == user_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    member, email = row
+    if member.role == ProjectRole.OWNER:
+        raise HTTPException(status_code=409, detail="The owner's role cannot be changed")
+
+    member.role = member_update.role.value
+    membership_changed(db, [user_id])
+    db.flush()
+    member_response = _member_response(member, email)
+    activity_log.record(db, project_id, None, current_user.id, "member_updated",
+                        {"user_id": user_id, "role": member_response.role})
+    db.commit()
+    return member_response
+
+
+@member_router.delete("/{user_id}")
+def remove_member(project_id: int, user_id: int, db: Session = Depends(get_db),
+                  current_user: User = Depends(get_current_user)) -> dict:
+    """
+    Remove a member from a project.
+
+    The owner can remove any other member; members can remove themselves.
+
+    Args:
+        project_id: The ID of the project
+        user_id: The ID of the member
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        dict: Success message
+
+    Raises:
+        HTTPException: If project not found or user is neither its owner nor the
+        member, the member is not found, or is the owner
+    """
+    actor_id = current_user.id
+    if user_id != actor_id:
+        _require_owner(db, current_user, project_id)
+    elif member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    member = db.query(ProjectMember).filter(ProjectMember.project_id == project_id,
+                                            ProjectMember.user_id == user_id).first()
+    if member is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+    if member.role == ProjectRole.OWNER:
+        raise HTTPException(status_code=409, detail="The owner cannot be removed from the project")
+
+    db.execute(delete(ProjectMember).where(ProjectMember.id == member.id))
+    membership_changed(db, [user_id])
+    activity_log.record(db, project_id, None, actor_id, "member_removed", {"user_id": user_id})
+    db.commit()
+    return {"detail": "Member removed successfully"}
@@ -0,0 +1,95 @@
+"""
+Notification router.
+
+This module provides the endpoints listing the due-soon and overdue
+notifications of the authenticated user (emitted by app.scheduler) and
+marking them as read.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_current_user, get_current_reader
+from app.models.notification import TaskNotification
+from app.models.user import User
+from app.pagination import paginate
+from app.replicas import get_read_db
+from app.schemas.notification import NotificationResponse
+
+notification_router = APIRouter(
+    prefix="/notifications",
+    tags=["Notifications"],
+)
+
+
+def _notification_response(notification: TaskNotification) -> NotificationResponse:
+    return NotificationResponse(id=notification.id, kind=notification.kind, task_id=notification.task_id,
+                                project_id=notification.project_id, due_date=notification.due_date,
+                                created_at=notification.created_at, read_at=notification.read_at)
+
+
+@notification_router.get("/", response_model=list[NotificationResponse])
+def list_notifications(response: Response, unread: bool = False,
+                       limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+                       cursor: Optional[str] = None, db: Session = Depends(get_read_db),
+                       current_user: User = Depends(get_current_reader)) -> list[NotificationResponse]:
+    """
+    List the authenticated user's notifications, oldest first.
+
+    When ``limit`` is given and more notifications remain, the cursor for the
+    next page is returned in the ``X-Next-Cursor`` header.
+
+    Args:
+        response: Response used to attach the next-page cursor header
+        unread: Only list notifications not yet marked as read
+        limit: Optional maximum number of notifications to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[NotificationResponse]: The user's notifications
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    query = db.query(TaskNotification).filter(TaskNotification.user_id == current_user.id)
+    if unread:
+        query = query.filter(TaskNotification.read_at.is_(None))
+    notifications, next_cursor = paginate(query, TaskNotification, [], cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_notification_response(notification) for notification in notifications]
+
+
+@notification_router.post("/{notification_id}/read", response_model=NotificationResponse)
+def mark_notification_read(notification_id: int, db: Session = Depends(get_db),
+                           current_user: User = Depends(get_current_user)) -> NotificationResponse:
+    """
+    Mark one of the authenticated user's notifications as read.
+
+    Args:
+        notification_id: The ID of the notification
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        NotificationResponse: The updated notification
+
+    Raises:
+        HTTPException: If the notification does not exist or belongs to another user
+    """
+    statement = update(TaskNotification).where(
+        TaskNotification.id == notification_id, TaskNotification.user_id == current_user.id).values(
+        read_at=datetime.utcnow()).returning(TaskNotification)
+    notification = db.scalars(statement, execution_options={"synchronize_session": False}).first()
+    if notification is None:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    notification_response = _notification_response(notification)
+    db.commit()
+    return notification_response
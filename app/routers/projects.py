@@ -2,20 +2,44 @@
 Project management router for CRUD operations.
 
 This module provides endpoints for creating, reading, updating, and deleting
-projects. All operations are scoped to the authenticated user.
+projects. All operations are scoped to the projects the authenticated user is
+a member of: any role can read a project, editors can update it, and only
+owners can archive or delete it.
 """
-from fastapi import Depends, APIRouter, HTTPException
+from typing import Optional
+
+from datetime import datetime
+
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, BackgroundTasks, Response
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.activity import activity_log
+from app.archive import archive_tasks, restore_tasks
+from app.batch import parse_ids
+from app.concurrency import etag, parse_if_match
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.deletion import run_project_deletion
+from app.dependencies import get_current_user, get_current_reader, member_project, member_projects
+from app.fieldsets import ListFormat, parse_fields, load_fields, render_item, render_list, all_fields
+from app.idempotency import IdempotentRoute
+from app.models.deletion import ProjectDeletion
+from app.models.member import ProjectMember
 from app.models.project import Project
+from app.models.task import ArchivedTask, Task
 from app.models.user import User
-from app.schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate
+from app.permissions import membership_changed, memberships
+from app.replicas import get_read_db
+from app.saved_views import view_cache
+from app.schemas.batch import BatchError
+from app.schemas.member import ProjectRole
+from app.schemas.project import ProjectResponse, ProjectCreate, ProjectUpdate, ProjectDeletionResponse, \
+    ArchiveResponse, ProjectBatchResponse
 
 project_router = APIRouter(
     prefix="/projects",
     tags=["Projects"],
+    route_class=IdempotentRoute,
 )
 
 
@@ -25,6 +49,8 @@ def create_project(project_create: ProjectCreate, db: Session = Depends(get_db),
     """
     Create a new project for the authenticated user.
 
+    The user becomes the project's owner member.
+
     Args:
         project_create: Project creation data with title and description
         db: Database session dependency
@@ -35,64 +61,124 @@ def create_project(project_create: ProjectCreate, db: Session = Depends(get_db),
     """
     new_project = Project(title=project_create.title, description=project_create.description, owner_id=current_user.id)
     db.add(new_project)
+    db.flush()
+    db.add(ProjectMember(project_id=new_project.id, user_id=current_user.id, role=ProjectRole.OWNER.value))
+    membership_changed(db, [current_user.id])
+    project_response = ProjectResponse(id=new_project.id, title=new_project.title,
+                                       description=new_project.description, owner_id=new_project.owner_id,
+                                       created_at=new_project.created_at)
+    activity_log.record(db, project_response.id, None, current_user.id, "created",
+                        project_create.model_dump(exclude_none=True))
     db.commit()
-    db.refresh(new_project)
-    return ProjectResponse(id=new_project.id, title=new_project.title, description=new_project.description,
-                           owner_id=new_project.owner_id, created_at=new_project.created_at)
+    return project_response
 
 
-@project_router.get("/", response_model=list[ProjectResponse])
-def list_projects(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> list[
-    ProjectResponse]:
+@project_router.get("/", response_model=list[ProjectResponse] | ProjectBatchResponse)
+def list_projects(ids: Optional[str] = None, fields: Optional[str] = None,
+                  list_format: ListFormat = Query("objects", alias="format"), db: Session = Depends(get_read_db),
+                  current_user: User = Depends(get_current_reader)) -> list[ProjectResponse] | ProjectBatchResponse:
     """
-    List all projects owned by the authenticated user.
+    List all projects the authenticated user is a member of, or look up several by ID.
+
+    With ``ids`` the projects are resolved with a single query and returned
+    in request order; IDs that are missing or not accessible to the user are
+    reported in ``errors`` exactly like ``GET /projects/{id}`` would.
 
     Args:
-        db: Database session dependency
+        ids: Optional comma-separated list of project IDs to look up
+        fields: Optional comma-separated list of fields to return (listing only)
+        list_format: "objects" (default) or "columnar" (one array per field; listing only)
+        db: Read session dependency (replica when available)
         current_user: Authenticated user dependency
 
     Returns:
-        list[ProjectResponse]: List of projects owned by the user
+        list[ProjectResponse] | ProjectBatchResponse: List of the user's projects,
+        or the batch lookup result
+
+    Raises:
+        HTTPException: If fields or IDs are invalid, or fields are combined with IDs
     """
-    projects = db.query(Project).filter(Project.owner_id == current_user.id).all()
+    if ids is not None:
+        if fields is not None or list_format != "objects":
+            raise HTTPException(status_code=422, detail="fields and format cannot be combined with ids")
+        project_ids = parse_ids(ids)
+        allowed = [project_id for project_id in project_ids
+                   if memberships.allows(db, current_user, project_id, ProjectRole.VIEWER)]
+        found = {project.id: project for project in db.query(Project).filter(
+            Project.id.in_(allowed), Project.deleted_at.is_(None))}
+        items, errors = [], []
+        for project_id in project_ids:
+            project = found.get(project_id)
+            if project is None:
+                errors.append(BatchError(id=project_id, status=403, detail="Project not found or access denied"))
+            else:
+                items.append(ProjectResponse(id=project.id, title=project.title, description=project.description,
+                                             owner_id=project.owner_id, created_at=project.created_at,
+                                             archived_at=project.archived_at))
+        return ProjectBatchResponse(items=items, errors=errors)
+
+    selected = parse_fields(fields, ProjectResponse)
+    query = member_projects(db, current_user)
+    if selected is not None:
+        query = query.options(load_fields(Project, selected))
+    projects = query.all()
+    if selected is not None or list_format == "columnar":
+        return render_list(projects, selected or all_fields(ProjectResponse), list_format)
     return [
         ProjectResponse(id=project.id, title=project.title, description=project.description, owner_id=project.owner_id,
-                        created_at=project.created_at) for project in projects]
+                        created_at=project.created_at, archived_at=project.archived_at) for project in projects]
 
 
 @project_router.get("/{project_id}", response_model=ProjectResponse)
-def get_project(project_id: int, db: Session = Depends(get_db),
-                current_user: User = Depends(get_current_user)) -> ProjectResponse:
+def get_project(project_id: int, response: Response, fields: Optional[str] = None,
+                db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)) -> ProjectResponse:
     """
-    Get a specific project by ID if owned by the authenticated user.
+    Get a specific project by ID if the authenticated user is a member of it.
+
+    The ``ETag`` header carries the project's version for ``If-Match`` updates.
 
     Args:
         project_id: The ID of the project to retrieve
-        db: Database session dependency
+        response: Response used to attach the ETag header
+        fields: Optional comma-separated list of fields to return
+        db: Read session dependency (replica when available)
         current_user: Authenticated user dependency
 
     Returns:
         ProjectResponse: The requested project information
 
     Raises:
-        HTTPException: If project not found or user doesn't have access
+        HTTPException: If project not found, user doesn't have access, or fields are invalid
     """
-    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == current_user.id).first()
+    selected = parse_fields(fields, ProjectResponse)
+    query = member_project(db, current_user, project_id)
+    if selected is not None:
+        query = query.options(load_fields(Project, selected, extra=["version"]))
+    project = query.first()
     if project is None:
         raise HTTPException(status_code=403, detail="Project not found or access denied")
+    if selected is not None:
+        return render_item(project, selected, {"ETag": etag(project.version)})
+    response.headers["ETag"] = etag(project.version)
     return ProjectResponse(id=project.id, title=project.title, description=project.description,
-                           owner_id=project.owner_id, created_at=project.created_at)
+                           owner_id=project.owner_id, created_at=project.created_at, archived_at=project.archived_at)
 
 
 @project_router.put("/{project_id}", response_model=ProjectResponse)
-def update_project(project_id: int, project_update: ProjectUpdate, db: Session = Depends(get_db),
+def update_project(project_id: int, project_update: ProjectUpdate, response: Response,
+                   if_match: Optional[str] = Header(None), db: Session = Depends(get_db),
                    current_user: User = Depends(get_current_user)) -> ProjectResponse:
     """
     Update a project's title or description.
 
+    Applied with a single ``UPDATE`` checking the editor role and, when ``If-Match``
+    is given, the project's version; a stale version fails with 412.
+
     Args:
         project_id: The ID of the project to update
         project_update: Updated project data
+        response: Response used to attach the new ETag header
+        if_match: Optional ETag(s) of the version the update is based on
         db: Database session dependency
         current_user: Authenticated user dependency
 
@@ -100,44 +186,164 @@ def update_project(project_id: int, project_update: ProjectUpdate, db: Session =
         ProjectResponse: The updated project information
 
     Raises:
-        HTTPException: If project not found or user doesn't have access
+        HTTPException: If project not found, user doesn't have access, or the project
+        no longer has the version given in If-Match
+    """
+    versions = parse_if_match(if_match)
+    allowed = member_project(db, current_user, project_id, ProjectRole.EDITOR).with_entities(Project.id)
+    statement = update(Project).where(Project.id == project_id, Project.id.in_(allowed)).values(
+        **project_update.model_dump(exclude_none=True), version=Project.version + 1)
+    if versions is not None:
+        statement = statement.where(Project.version.in_(versions))
+    project = db.scalars(statement.returning(Project), execution_options={"synchronize_session": False}).first()
+    if project is None:
+        project = member_project(db, current_user, project_id, ProjectRole.EDITOR).first()
+        if project is None:
+            raise HTTPException(status_code=403, detail="Project not found or access denied")
+        raise HTTPException(status_code=412, detail="Project was modified by another request",
+                            headers={"ETag": etag(project.version)})
+
+    response.headers["ETag"] = etag(project.version)
+    project_response = ProjectResponse(id=project.id, title=project.title, description=project.description,
+                                       owner_id=project.owner_id, created_at=project.created_at,
+                                       archived_at=project.archived_at)
+    activity_log.record(db, project_id, None, current_user.id, "updated", project_update.model_dump(exclude_none=True))
+    db.commit()
+    return project_response
+
+
+@project_router.post("/{project_id}/archive", response_model=ArchiveResponse)
+def archive_project(project_id: int, db: Session = Depends(get_db),
+                    current_user: User = Depends(get_current_user)) -> ArchiveResponse:
     """
-    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == current_user.id).first()
+    Archive a project, moving all of its tasks into the archive table.
+
+    The project and its tasks remain readable through the usual endpoints but
+    no longer take space in the hot task indexes. Tasks cannot be created or
+    modified until the project is unarchived.
+
+    Args:
+        project_id: The ID of the project to archive
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ArchiveResponse: Number of tasks moved
+
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or it is already archived
+    """
+    project = member_project(db, current_user, project_id, ProjectRole.OWNER).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Project not found or access denied")
+    if project.archived_at is not None:
+        raise HTTPException(status_code=409, detail="Project is already archived")
 
-    if project_update.title is not None:
-        project.title = project_update.title
-    if project_update.description is not None:
-        project.description = project_update.description
+    # Mark first so no new tasks are created in the hot table while moving
+    project.archived_at = datetime.utcnow()
+    activity_log.record(db, project_id, None, current_user.id, "archived", {"archived_at": project.archived_at})
+    db.commit()
+    moved = archive_tasks(db, Task.project_id == project_id)
+    view_cache.project_changed(project_id)
+    return ArchiveResponse(project_id=project_id, tasks_moved=moved)
 
+
+@project_router.post("/{project_id}/unarchive", response_model=ArchiveResponse)
+def unarchive_project(project_id: int, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)) -> ArchiveResponse:
+    """
+    Unarchive a project, moving its tasks back into the hot table.
+
+    Args:
+        project_id: The ID of the project to unarchive
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ArchiveResponse: Number of tasks moved
+
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or it is not archived
+    """
+    project = member_project(db, current_user, project_id, ProjectRole.OWNER).first()
+    if project is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    if project.archived_at is None:
+        raise HTTPException(status_code=409, detail="Project is not archived")
+
+    moved = restore_tasks(db, ArchivedTask.project_id == project_id)
+    project.archived_at = None
+    activity_log.record(db, project_id, None, current_user.id, "unarchived", {"tasks_moved": moved})
     db.commit()
-    db.refresh(project)
-    return ProjectResponse(id=project.id, title=project.title, description=project.description,
-                           owner_id=project.owner_id, created_at=project.created_at)
+    view_cache.project_changed(project_id)
+    return ArchiveResponse(project_id=project_id, tasks_moved=moved)
 
 
-@project_router.delete("/{project_id}")
-def delete_project(project_id: int, db: Session = Depends(get_db),
-                   current_user: User = Depends(get_current_user)) -> dict:
+@project_router.delete("/{project_id}", status_code=202, response_model=ProjectDeletionResponse)
+def delete_project(project_id: int, background_tasks: BackgroundTasks, response: Response,
+                   db: Session = Depends(get_db),
+                   current_user: User = Depends(get_current_user)) -> ProjectDeletionResponse:
     """
-    Delete a project and all its associated tasks.
+    Request deletion of a project and all its associated tasks.
+
+    The project is hidden immediately and removed by a background job that
+    deletes its tasks in batches. The job's progress is available at the URL
+    in the ``Location`` header.
 
     Args:
         project_id: The ID of the project to delete
+        background_tasks: Background task queue running the deletion job
+        response: Response used to attach the ``Location`` header
         db: Database session dependency
         current_user: Authenticated user dependency
 
     Returns:
-        dict: Success message
+        ProjectDeletionResponse: The newly created deletion job
 
     Raises:
         HTTPException: If project not found or user doesn't have access
     """
-    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == current_user.id).first()
+    project = member_project(db, current_user, project_id, ProjectRole.OWNER).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Project not found or access denied")
 
-    db.delete(project)
+    project.deleted_at = datetime.utcnow()
+    deletion = ProjectDeletion(project_id=project.id, owner_id=current_user.id)
+    db.add(deletion)
+    db.flush()
+    deletion_response = ProjectDeletionResponse(id=deletion.id, project_id=deletion.project_id,
+                                                status=deletion.status, tasks_deleted=deletion.tasks_deleted,
+                                                created_at=deletion.created_at, finished_at=deletion.finished_at)
+    activity_log.record(db, project_id, None, current_user.id, "deleted")
     db.commit()
-    return {"detail": "Project deleted successfully"}
+    view_cache.project_changed(project_id)
+
+    background_tasks.add_task(run_project_deletion, db.get_bind(), deletion_response.id)
+    response.headers["Location"] = f"/projects/deletions/{deletion_response.id}"
+    return deletion_response
+
+
+@project_router.get("/deletions/{deletion_id}", response_model=ProjectDeletionResponse)
+def get_project_deletion(deletion_id: int, db: Session = Depends(get_db),
+                         current_user: User = Depends(get_current_user)) -> ProjectDeletionResponse:
+    """
+    Get the status of a background project deletion.
+
+    Args:
+        deletion_id: The ID of the deletion job
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ProjectDeletionResponse: The deletion job's current state
+
+    Raises:
+        HTTPException: If the job is not found or belongs to another user
+    """
+    deletion = db.query(ProjectDeletion).filter(ProjectDeletion.id == deletion_id,
+                                                ProjectDeletion.owner_id == current_user.id).first()
+    if deletion is None:
+        raise HTTPException(status_code=404, detail="Deletion not found")
+    return ProjectDeletionResponse(id=deletion.id, project_id=deletion.project_id, status=deletion.status,
+                                   tasks_deleted=deletion.tasks_deleted, created_at=deletion.created_at,
+                                   finished_at=deletion.finished_at)
@@ -2,31 +2,98 @@
 Task management router for CRUD operations.
 
 This module provides endpoints for creating, reading, updating, and deleting tasks
-within projects. Tasks can be filtered by status and priority. All operations
-verify that the user owns the associated project.
+within projects. Tasks can be filtered by status and priority. Reading a task
+requires any role in its project, changing one the editor role. Archived tasks
+are read from the archive table and are read-only. Tasks can be nested as subtasks; subtrees
+are listed, rolled up and moved as a whole.
 """
+import json
+from datetime import datetime
 from typing import Optional
 
-from fastapi import Depends, APIRouter, HTTPException
+from fastapi import Depends, APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.activity import activity_log
+from app.archive import archive_tasks, completed_tasks
+from app.batch import parse_ids
+from app.concurrency import etag, parse_if_match
+from app.config import settings
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_current_reader, member_project, member_projects
+from app.fieldsets import ListFormat, parse_fields, load_fields, render_item, render_list, all_fields, as_dict
+from app.hierarchy import HierarchyError, attach, delete_subtree, move, rollup, subtasks
+from app.idempotency import IdempotentRoute
 from app.models.project import Project
-from app.models.task import Task
+from app.models.task import ArchivedTask, Task
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.permissions import memberships
+from app.replicas import get_read_db
+from app.saved_views import view_cache
+from app.scheduler import due_scheduler
+from app.pagination import parse_sort, paginate
+from app.schemas.batch import BatchError
+from app.schemas.member import ProjectRole
+from app.schemas.project import ArchiveResponse
+from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskStatus, TaskPriority, TaskMove, TaskRollup, \
+    TaskBatchResponse
 
 task_router = APIRouter(
     prefix="/projects/{project_id}/tasks",
     tags=["Tasks"],
+    route_class=IdempotentRoute,
 )
 
 task_detail_router = APIRouter(
     prefix="/tasks",
     tags=["Tasks"],
+    route_class=IdempotentRoute,
 )
 
+TASK_SORT_FIELDS = {"priority", "due_date", "created_at", "updated_at", "name"}
+ACTIVITY_FIELDS = {"name", "description", "status", "priority", "due_date", "assignee_id", "parent_id"}
+EXPORT_BATCH_SIZE = 1000
+
+
+def _find_task(db: Session, task_id: int, selected: Optional[list[str]] = None) -> tuple[Task | ArchivedTask, bool]:
+    """
+    Look a task up in the hot table, falling back to the archive.
+
+    Args:
+        db: Database session
+        task_id: The ID of the task
+        selected: Optional fields to load
+
+    Returns:
+        tuple: The task and whether it was found in the archive
+
+    Raises:
+        HTTPException: If the task is in neither table
+    """
+    for model in (Task, ArchivedTask):
+        query = db.query(model).filter(model.id == task_id)
+        if selected is not None:
+            query = query.options(load_fields(model, selected, extra=["project_id", "version"]))
+        task = query.first()
+        if task is not None:
+            return task, model is ArchivedTask
+    raise HTTPException(status_code=404, detail="Task not found")
+
+
+def _parent_task(db: Session, parent_id: int, project_id: int) -> Task:
+    """
+    Look up a live task of the same project to nest a task under.
+
+    Raises:
+        HTTPException: If there is no such task
+    """
+    parent = db.query(Task).filter(Task.id == parent_id, Task.project_id == project_id).first()
+    if parent is None:
+        raise HTTPException(status_code=422, detail="Parent must be a live task of the same project")
+    return parent
+
 
 @task_router.post("/", response_model=TaskResponse)
 def create_task(project_id: int, task_create: TaskCreate, db: Session = Depends(get_db),
@@ -44,98 +111,293 @@ def create_task(project_id: int, task_create: TaskCreate, db: Session = Depends(
         TaskResponse: The created task information
 
     Raises:
-        HTTPException: If project not found or user doesn't have access
+        HTTPException: If project not found, user doesn't have access, the project is archived,
+        or the parent task is invalid or already nested as deep as allowed
     """
-    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == current_user.id).first()
+    project = member_project(db, current_user, project_id, ProjectRole.EDITOR).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Project not found or access denied")
+    if project.archived_at is not None:
+        raise HTTPException(status_code=409, detail="Project is archived")
+    parent = _parent_task(db, task_create.parent_id, project_id) if task_create.parent_id is not None else None
 
     new_task = Task(name=task_create.name, description=task_create.description, due_date=task_create.due_date,
-                    assignee_id=task_create.assignee_id, project_id=project_id)
+                    assignee_id=task_create.assignee_id, parent_id=parent.id if parent is not None else None,
+                    project_id=project_id)
     db.add(new_task)
+    db.flush()
+    try:
+        attach(db, new_task, parent)
+    except HierarchyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    task_response = TaskResponse(id=new_task.id, name=new_task.name, description=new_task.description,
+                                 status=new_task.status, priority=new_task.priority, due_date=new_task.due_date,
+                                 project_id=new_task.project_id, assignee_id=new_task.assignee_id,
+                                 parent_id=new_task.parent_id, created_at=new_task.created_at,
+                                 updated_at=new_task.updated_at)
+    version = new_task.version
+    activity_log.record(db, project_id, task_response.id, current_user.id, "created",
+                        task_response.model_dump(include=ACTIVITY_FIELDS, exclude_none=True), version)
     db.commit()
-    db.refresh(new_task)
-    return TaskResponse(id=new_task.id, name=new_task.name, description=new_task.description, status=new_task.status,
-                        priority=new_task.priority, due_date=new_task.due_date, project_id=new_task.project_id,
-                        assignee_id=new_task.assignee_id, created_at=new_task.created_at,
-                        updated_at=new_task.updated_at)
+    due_scheduler.task_changed(task_response.id, task_response.due_date, task_response.status)
+    view_cache.task_changed(task_response, version)
+    return task_response
 
 
 @task_router.get("/", response_model=list[TaskResponse])
-def list_tasks(project_id: int, status: Optional[str] = None, priority: Optional[str] = None,
-               db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> list[TaskResponse]:
+def list_tasks(project_id: int, response: Response, status: Optional[TaskStatus] = None,
+               priority: Optional[TaskPriority] = None, sort: Optional[str] = None,
+               limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size), cursor: Optional[str] = None,
+               fields: Optional[str] = None, list_format: ListFormat = Query("objects", alias="format"),
+               archived: bool = False, db: Session = Depends(get_read_db),
+               current_user: User = Depends(get_current_reader)) -> list[TaskResponse]:
     """
-    List all tasks for a project with optional filtering.
+    List tasks for a project with optional filtering, sorting and keyset pagination.
+
+    Sorting accepts a comma-separated list of priority, due_date, created_at,
+    updated_at and name, each optionally prefixed with "-" for descending
+    order (e.g. "-priority,due_date"). Ties are broken by task ID. When
+    ``limit`` is given and more rows remain, the cursor for the next page is
+    returned in the ``X-Next-Cursor`` header.
+
+    ``fields`` restricts both the loaded columns and the response keys, and
+    ``format=columnar`` returns one array per field instead of a list of
+    objects.
+
+    ``archived=true`` lists the project's archived tasks instead; archived
+    projects always list from the archive.
 
     Args:
         project_id: The ID of the project to list tasks from
+        response: Response used to attach the next-page cursor header
         status: Optional filter for task status
         priority: Optional filter for task priority
-        db: Database session dependency
+        sort: Optional sort specification
+        limit: Optional maximum number of tasks to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        fields: Optional comma-separated list of fields to return
+        list_format: "objects" (default) or "columnar"
+        archived: List archived tasks instead of live ones
+        db: Read session dependency (replica when available)
         current_user: Authenticated user dependency
 
     Returns:
         list[TaskResponse]: List of tasks matching the filters
 
     Raises:
-        HTTPException: If project not found or user doesn't have access
+        HTTPException: If project not found or user doesn't have access, or if
+        the sort, cursor or fields are invalid
     """
-    project = db.query(Project).filter(Project.id == project_id, Project.owner_id == current_user.id).first()
+    keys = parse_sort(sort, TASK_SORT_FIELDS)
+    selected = parse_fields(fields, TaskResponse)
+    project = member_project(db, current_user, project_id).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Project not found or access denied")
 
-    query = db.query(Task).filter(Task.project_id == project_id)
+    model = ArchivedTask if archived or project.archived_at is not None else Task
+    query = db.query(model).filter(model.project_id == project_id)
     if status is not None:
-        query = query.filter(Task.status == status)
+        query = query.filter(model.status == status)
     if priority is not None:
-        query = query.filter(Task.priority == priority)
-
-    tasks = query.all()
+        query = query.filter(model.priority == priority)
+    if selected is not None:
+        # Sort keys must be loaded too, since the next-page cursor is built from them
+        query = query.options(load_fields(model, selected, extra=[name for name, _ in keys]))
+
+    tasks, next_cursor = paginate(query, model, keys, cursor, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
+    if selected is not None or list_format == "columnar":
+        return render_list(tasks, selected or all_fields(TaskResponse), list_format, headers)
+    if headers:
+        response.headers.update(headers)
     return [TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
                          priority=task.priority, due_date=task.due_date, project_id=task.project_id,
-                         assignee_id=task.assignee_id, created_at=task.created_at, updated_at=task.updated_at) for task
+                         assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                         updated_at=task.updated_at) for task
             in tasks]
 
 
+@task_router.get("/export")
+def export_tasks(project_id: int, fields: Optional[str] = None, db: Session = Depends(get_read_db),
+                 current_user: User = Depends(get_current_reader)) -> StreamingResponse:
+    """
+    Stream every task of a project, live and archived, as newline-delimited JSON.
+
+    Tasks are read in keyset batches on a dedicated session, so memory use and
+    transaction length stay bounded regardless of project size, and each batch
+    is sent (and compressed) as soon as it is read.
+
+    Args:
+        project_id: The ID of the project to export
+        fields: Optional comma-separated list of fields to include
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        StreamingResponse: One JSON object per line
+
+    Raises:
+        HTTPException: If project not found, user doesn't have access, or fields are invalid
+    """
+    selected = parse_fields(fields, TaskResponse) or all_fields(TaskResponse)
+    project = member_project(db, current_user, project_id).first()
+    if project is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    bind = db.get_bind()
+
+    def lines():
+        with Session(bind=bind) as session:
+            for model in (Task, ArchivedTask):
+                cursor = None
+                while True:
+                    query = session.query(model).filter(model.project_id == project_id).options(
+                        load_fields(model, selected))
+                    tasks, cursor = paginate(query, model, [], cursor, EXPORT_BATCH_SIZE)
+                    yield "".join(json.dumps(as_dict(task, selected)) + "\n" for task in tasks).encode()
+                    session.expunge_all()
+                    if cursor is None:
+                        break
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@task_router.post("/archive", response_model=ArchiveResponse)
+def archive_done_tasks(project_id: int, completed_before: Optional[datetime] = None, db: Session = Depends(get_db),
+                       current_user: User = Depends(get_current_user)) -> ArchiveResponse:
+    """
+    Move a project's done tasks into the archive table.
+
+    Archived tasks remain readable through ``GET /tasks/{task_id}`` and
+    ``GET /projects/{project_id}/tasks/?archived=true``.
+
+    Args:
+        project_id: The ID of the project
+        completed_before: Only archive tasks last updated before this time
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ArchiveResponse: Number of tasks moved
+
+    Raises:
+        HTTPException: If project not found or user doesn't have access
+    """
+    project = member_project(db, current_user, project_id, ProjectRole.EDITOR).first()
+    if project is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+
+    actor_id = current_user.id
+    moved = archive_tasks(db, completed_tasks(project_id, completed_before))
+    activity_log.record(db, project_id, None, actor_id, "archived", {"tasks_moved": moved})
+    db.commit()
+    view_cache.project_changed(project_id)
+    return ArchiveResponse(project_id=project_id, tasks_moved=moved)
+
+
+@task_detail_router.get("/", response_model=TaskBatchResponse)
+def get_tasks(ids: str, db: Session = Depends(get_read_db),
+              current_user: User = Depends(get_current_reader)) -> TaskBatchResponse:
+    """
+    Look up several tasks by ID, whether live or archived.
+
+    The tasks and their live projects are resolved with one query, and access
+    is checked against the cached membership map; the archive is only queried
+    for IDs not found live.
+    IDs that cannot be returned are reported in ``errors`` with the status
+    ``GET /tasks/{id}`` would have returned.
+
+    Args:
+        ids: Comma-separated list of task IDs
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        TaskBatchResponse: Tasks found in request order, and per-ID errors
+
+    Raises:
+        HTTPException: If the IDs are invalid or too many are given
+    """
+    task_ids = parse_ids(ids)
+    found: dict[int, tuple[Task | ArchivedTask, bool]] = {}
+    for model in (Task, ArchivedTask):
+        remaining = [task_id for task_id in task_ids if task_id not in found]
+        if not remaining:
+            break
+        rows = db.query(model, Project.id).outerjoin(
+            Project, (Project.id == model.project_id) & Project.deleted_at.is_(None)).filter(model.id.in_(remaining))
+        found.update((task.id, (task, live_id is not None and memberships.allows(
+            db, current_user, task.project_id, ProjectRole.VIEWER))) for task, live_id in rows)
+
+    items, errors = [], []
+    for task_id in task_ids:
+        task, allowed = found.get(task_id, (None, False))
+        if task is None:
+            errors.append(BatchError(id=task_id, status=404, detail="Task not found"))
+        elif not allowed:
+            errors.append(BatchError(id=task_id, status=403, detail="Access denied"))
+        else:
+            items.append(TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                                      priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                                      assignee_id=task.assignee_id, parent_id=task.parent_id,
+                                      created_at=task.created_at, updated_at=task.updated_at))
+    return TaskBatchResponse(items=items, errors=errors)
+
+
 @task_detail_router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: int, db: Session = Depends(get_db),
-             current_user: User = Depends(get_current_user)) -> TaskResponse:
+def get_task(task_id: int, response: Response, fields: Optional[str] = None, db: Session = Depends(get_read_db),
+             current_user: User = Depends(get_current_reader)) -> TaskResponse:
     """
-    Get a specific task by ID.
+    Get a specific task by ID, whether live or archived.
+
+    The ``ETag`` header carries the task's version for ``If-Match`` updates.
 
     Args:
         task_id: The ID of the task to retrieve
-        db: Database session dependency
+        response: Response used to attach the ETag header
+        fields: Optional comma-separated list of fields to return
+        db: Read session dependency (replica when available)
         current_user: Authenticated user dependency
 
     Returns:
         TaskResponse: The requested task information
 
     Raises:
-        HTTPException: If task not found or user doesn't have access to the project
+        HTTPException: If task not found, user doesn't have access to the project,
+        or fields are invalid
     """
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
+    selected = parse_fields(fields, TaskResponse)
+    task, _ = _find_task(db, task_id, selected)
 
-    project = db.query(Project).filter(Project.id == task.project_id, Project.owner_id == current_user.id).first()
+    project = member_project(db, current_user, task.project_id).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Access denied")
 
+    if selected is not None:
+        return render_item(task, selected, {"ETag": etag(task.version)})
+    response.headers["ETag"] = etag(task.version)
     return TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
                         priority=task.priority, due_date=task.due_date, project_id=task.project_id,
-                        assignee_id=task.assignee_id, created_at=task.created_at, updated_at=task.updated_at)
+                        assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                        updated_at=task.updated_at)
 
 
 @task_detail_router.put("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get_db),
-                current_user: User = Depends(get_current_user)) -> TaskResponse:
+def update_task(task_id: int, task_update: TaskUpdate, response: Response, if_match: Optional[str] = Header(None),
+                db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> TaskResponse:
     """
     Update a task's properties.
 
+    The change is applied with a single ``UPDATE`` that also checks the editor
+    role (see ``member_projects``) and, when ``If-Match`` is given, the task's
+    version, so nothing is written for users without access and concurrent
+    edits never wait on each other's locks; a stale version fails with 412.
+
     Args:
         task_id: The ID of the task to update
         task_update: Updated task data
+        response: Response used to attach the new ETag header
+        if_match: Optional ETag(s) of the version the update is based on
         db: Database session dependency
         current_user: Authenticated user dependency
 
@@ -143,40 +405,43 @@ def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get
         TaskResponse: The updated task information
 
     Raises:
-        HTTPException: If task not found or user doesn't have access to the project
+        HTTPException: If task not found, user doesn't have access to the project,
+        the task is archived, or it no longer has the version given in If-Match
     """
-    task = db.query(Task).filter(Task.id == task_id).first()
+    versions = parse_if_match(if_match)
+    editable = member_projects(db, current_user, ProjectRole.EDITOR).with_entities(Project.id)
+    statement = update(Task).where(Task.id == task_id, Task.project_id.in_(editable)).values(
+        **task_update.model_dump(exclude_none=True), version=Task.version + 1)
+    if versions is not None:
+        statement = statement.where(Task.version.in_(versions))
+    task = db.scalars(statement.returning(Task), execution_options={"synchronize_session": False}).first()
     if task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    project = db.query(Project).filter(Project.id == task.project_id, Project.owner_id == current_user.id).first()
-    if project is None:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    if task_update.name is not None:
-        task.name = task_update.name
-    if task_update.description is not None:
-        task.description = task_update.description
-    if task_update.status is not None:
-        task.status = task_update.status
-    if task_update.priority is not None:
-        task.priority = task_update.priority
-    if task_update.due_date is not None:
-        task.due_date = task_update.due_date
-    if task_update.assignee_id is not None:
-        task.assignee_id = task_update.assignee_id
-
+        task, archived = _find_task(db, task_id)
+        if member_project(db, current_user, task.project_id, ProjectRole.EDITOR).first() is None:
+            raise HTTPException(status_code=403, detail="Access denied")
+        if archived:
+            raise HTTPException(status_code=409, detail="Task is archived")
+        raise HTTPException(status_code=412, detail="Task was modified by another request",
+                            headers={"ETag": etag(task.version)})
+
+    version = task.version
+    response.headers["ETag"] = etag(version)
+    task_response = TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                                 priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                                 assignee_id=task.assignee_id, parent_id=task.parent_id,
+                                 created_at=task.created_at, updated_at=task.updated_at)
+    activity_log.record(db, task.project_id, task_id, current_user.id, "updated",
+                        task_update.model_dump(exclude_none=True), version)
     db.commit()
-    db.refresh(task)
-    return TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
-                        priority=task.priority, due_date=task.due_date, project_id=task.project_id,
-                        assignee_id=task.assignee_id, created_at=task.created_at, updated_at=task.updated_at)
+    due_scheduler.task_changed(task_response.id, task_response.due_date, task_response.status)
+    view_cache.task_changed(task_response, version)
+    return task_response
 
 
 @task_detail_router.delete("/{task_id}")
 def delete_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> dict:
     """
-    Delete a task.
+    Delete a task together with its subtasks.
 
     Args:
         task_id: The ID of the task to delete
@@ -187,16 +452,131 @@ def delete_task(task_id: int, db: Session = Depends(get_db), current_user: User
         dict: Success message
 
     Raises:
-        HTTPException: If task not found or user doesn't have access to the project
+        HTTPException: If task not found, user doesn't have access to the project,
+        or the task is archived
     """
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    project = db.query(Project).filter(Project.id == task.project_id, Project.owner_id == current_user.id).first()
+    task, archived = _find_task(db, task_id)
+    project = member_project(db, current_user, task.project_id, ProjectRole.EDITOR).first()
     if project is None:
         raise HTTPException(status_code=403, detail="Access denied")
+    if archived:
+        raise HTTPException(status_code=409, detail="Task is archived")
 
-    db.delete(task)
+    # Deleting is the change following the task's last version
+    version, project_id = task.version + 1, task.project_id
+    deleted = delete_subtree(db, task_id)
+    activity_log.record(db, project_id, task_id, current_user.id, "deleted", {"tasks_deleted": deleted}, version)
     db.commit()
+    view_cache.project_changed(project_id)
     return {"detail": "Task deleted successfully"}
+
+
+@task_detail_router.get("/{task_id}/subtasks", response_model=list[TaskResponse])
+def list_subtasks(task_id: int, response: Response, depth: Optional[int] = Query(None, ge=1),
+                  sort: Optional[str] = None, limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size),
+                  cursor: Optional[str] = None, db: Session = Depends(get_read_db),
+                  current_user: User = Depends(get_current_reader)) -> list[TaskResponse]:
+    """
+    List the live subtasks of a task at any depth.
+
+    Sorting and pagination work as in the task listing.
+
+    Args:
+        task_id: The ID of the parent task
+        response: Response used to attach the next-page cursor header
+        depth: Optional number of levels to include (1 for direct children)
+        sort: Optional sort specification
+        limit: Optional maximum number of tasks to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[TaskResponse]: The subtasks
+
+    Raises:
+        HTTPException: If task not found, user doesn't have access, or the sort or cursor are invalid
+    """
+    keys = parse_sort(sort, TASK_SORT_FIELDS)
+    task, _ = _find_task(db, task_id)
+    if member_project(db, current_user, task.project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    tasks, next_cursor = paginate(subtasks(db, task_id, depth), Task, keys, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                         priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                         assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                         updated_at=task.updated_at) for task in tasks]
+
+
+@task_detail_router.get("/{task_id}/rollup", response_model=TaskRollup)
+def get_task_rollup(task_id: int, db: Session = Depends(get_read_db),
+                    current_user: User = Depends(get_current_reader)) -> TaskRollup:
+    """
+    Count the statuses of a task and all of its subtasks, archived ones included.
+
+    Args:
+        task_id: The ID of the subtree's root task
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        TaskRollup: Status counts of the subtree
+
+    Raises:
+        HTTPException: If task not found or user doesn't have access
+    """
+    task, _ = _find_task(db, task_id)
+    if member_project(db, current_user, task.project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    counts = rollup(db, task_id)
+    return TaskRollup(task_id=task_id, total=sum(counts.values()), counts=counts)
+
+
+@task_detail_router.post("/{task_id}/move", response_model=TaskResponse)
+def move_task(task_id: int, task_move: TaskMove, db: Session = Depends(get_db),
+              current_user: User = Depends(get_current_user)) -> TaskResponse:
+    """
+    Move a task, with all of its subtasks, below another parent.
+
+    Args:
+        task_id: The ID of the task to move
+        task_move: The new parent (None to make the task top-level)
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        TaskResponse: The moved task
+
+    Raises:
+        HTTPException: If task not found, user doesn't have access, the task is archived,
+        the parent is invalid, or the move would create a loop or nest too deeply
+    """
+    task, archived = _find_task(db, task_id)
+    if member_project(db, current_user, task.project_id, ProjectRole.EDITOR).first() is None:
+        raise HTTPException(status_code=403, detail="Access denied")
+    if archived:
+        raise HTTPException(status_code=409, detail="Task is archived")
+    parent = _parent_task(db, task_move.parent_id, task.project_id) if task_move.parent_id is not None else None
+
+    # Serialize moves per project so concurrent moves cannot form a loop together
+    db.query(Project).filter(Project.id == task.project_id).with_for_update().one()
+    try:
+        move(db, task, parent)
+    except HierarchyError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    db.flush()
+    task_response = TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                                 priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                                 assignee_id=task.assignee_id, parent_id=task.parent_id,
+                                 created_at=task.created_at, updated_at=task.updated_at)
+    version = task.version
+    activity_log.record(db, task.project_id, task_id, current_user.id, "moved", {"parent_id": task.parent_id},
+                        version)
+    db.commit()
+    view_cache.task_changed(task_response, version)
+    return task_response
@@ -0,0 +1,265 @@
+"""
+Saved view router.
+
+This module provides endpoints for saving named task filters over a project
+("smart views"), listing, updating and deleting them, and opening them.
+Views are private to the user who saved them, who needs any role in the
+project. Opening a cached view is served from the worker's in-memory result
+(see app.saved_views); the ``X-View-Cache`` header tells whether the result
+was a "hit", was loaded on this request ("miss"), or the view was read from
+the database ("off").
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Depends, APIRouter, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_current_user, get_current_reader, member_project
+from app.idempotency import IdempotentRoute
+from app.models.task import ArchivedTask, Task
+from app.models.user import User
+from app.models.view import SavedView
+from app.pagination import parse_sort, paginate
+from app.permissions import memberships
+from app.replicas import get_read_db
+from app.routers.tasks import TASK_SORT_FIELDS
+from app.saved_views import dump_filters, load_filters, view_cache, view_conditions
+from app.schemas.member import ProjectRole
+from app.schemas.task import TaskResponse
+from app.schemas.view import ViewCreate, ViewResponse, ViewUpdate
+
+project_view_router = APIRouter(
+    prefix="/projects/{project_id}/views",
+    tags=["Views"],
+    route_class=IdempotentRoute,
+)
+
+view_router = APIRouter(
+    prefix="/views",
+    tags=["Views"],
+    route_class=IdempotentRoute,
+)
+
+
+def _view_response(view: SavedView) -> ViewResponse:
+    return ViewResponse(id=view.id, project_id=view.project_id, name=view.name, filters=load_filters(view),
+                        sort=view.sort, cached=view.cached, created_at=view.created_at)
+
+
+def _own_view(db: Session, user: User, view_id: int) -> SavedView:
+    view = db.query(SavedView).filter(SavedView.id == view_id, SavedView.user_id == user.id).first()
+    if view is None:
+        raise HTTPException(status_code=404, detail="View not found")
+    return view
+
+
+def _unique_name(db: Session, user_id: int, project_id: int, name: str) -> None:
+    if db.query(SavedView.id).filter(SavedView.user_id == user_id, SavedView.project_id == project_id,
+                                     SavedView.name == name).first() is not None:
+        raise HTTPException(status_code=409, detail="A view with this name already exists")
+
+
+@project_view_router.post("/", response_model=ViewResponse)
+def create_view(project_id: int, view_create: ViewCreate, db: Session = Depends(get_db),
+                current_user: User = Depends(get_current_user)) -> ViewResponse:
+    """
+    Save a view over a project's tasks.
+
+    Args:
+        project_id: The ID of the project to filter
+        view_create: Name, predicate and sort of the view
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ViewResponse: The saved view
+
+    Raises:
+        HTTPException: If project not found or user doesn't have access, the sort
+        is invalid, or the user already has a view with this name in the project
+    """
+    parse_sort(view_create.sort, TASK_SORT_FIELDS)
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    _unique_name(db, current_user.id, project_id, view_create.name)
+
+    view = SavedView(user_id=current_user.id, project_id=project_id, name=view_create.name,
+                     filters=dump_filters(view_create.filters), sort=view_create.sort, cached=view_create.cached)
+    db.add(view)
+    db.flush()
+    view_response = _view_response(view)
+    db.commit()
+    return view_response
+
+
+@project_view_router.get("/", response_model=list[ViewResponse])
+def list_views(project_id: int, db: Session = Depends(get_read_db),
+               current_user: User = Depends(get_current_reader)) -> list[ViewResponse]:
+    """
+    List the authenticated user's views of a project.
+
+    Args:
+        project_id: The ID of the project
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[ViewResponse]: The views in the order they were saved
+
+    Raises:
+        HTTPException: If project not found or user doesn't have access
+    """
+    if member_project(db, current_user, project_id).first() is None:
+        raise HTTPException(status_code=403, detail="Project not found or access denied")
+    views = db.query(SavedView).filter(SavedView.user_id == current_user.id,
+                                       SavedView.project_id == project_id).order_by(SavedView.id)
+    return [_view_response(view) for view in views]
+
+
+@view_router.get("/{view_id}", response_model=ViewResponse)
+def get_view(view_id: int, db: Session = Depends(get_read_db),
+             current_user: User = Depends(get_current_reader)) -> ViewResponse:
+    """
+    Get one of the authenticated user's views.
+
+    Args:
+        view_id: The ID of the view
+        db: Read session dependency (replica when available)
+        current_user: Authenticated user dependency
+
+    Returns:
+        ViewResponse: The view
+
+    Raises:
+        HTTPException: If the view is not found
+    """
+    return _view_response(_own_view(db, current_user, view_id))
+
+
+@view_router.put("/{view_id}", response_model=ViewResponse)
+def update_view(view_id: int, view_update: ViewUpdate, db: Session = Depends(get_db),
+                current_user: User = Depends(get_current_user)) -> ViewResponse:
+    """
+    Update one of the authenticated user's views.
+
+    Cached results of the previous definition are dropped in every worker.
+
+    Args:
+        view_id: The ID of the view
+        view_update: Updated view data
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        ViewResponse: The updated view
+
+    Raises:
+        HTTPException: If the view is not found, the sort is invalid, or the new
+        name is already used by another of the user's views in the project
+    """
+    view = _own_view(db, current_user, view_id)
+    if view_update.sort is not None:
+        parse_sort(view_update.sort, TASK_SORT_FIELDS)
+        view.sort = view_update.sort
+    if view_update.name is not None and view_update.name != view.name:
+        _unique_name(db, current_user.id, view.project_id, view_update.name)
+        view.name = view_update.name
+    if view_update.filters is not None:
+        view.filters = dump_filters(view_update.filters)
+    if view_update.cached is not None:
+        view.cached = view_update.cached
+    db.flush()
+    view_response = _view_response(view)
+    db.commit()
+    view_cache.drop(view_id)
+    return view_response
+
+
+@view_router.delete("/{view_id}")
+def delete_view(view_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> dict:
+    """
+    Delete one of the authenticated user's views.
+
+    Args:
+        view_id: The ID of the view
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        dict: Success message
+
+    Raises:
+        HTTPException: If the view is not found
+    """
+    db.delete(_own_view(db, current_user, view_id))
+    db.commit()
+    view_cache.drop(view_id)
+    return {"detail": "View deleted successfully"}
+
+
+@view_router.get("/{view_id}/tasks", response_model=list[TaskResponse])
+def open_view(view_id: int, response: Response,
+              limit: Optional[int] = Query(None, ge=1, le=settings.max_page_size), cursor: Optional[str] = None,
+              db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> list[TaskResponse]:
+    """
+    List the tasks matching one of the authenticated user's views.
+
+    Tasks are sorted by the view's sort and paginated as in the task listing.
+    A cached view whose result is in memory costs the view lookup only; its
+    result is otherwise loaded from the primary database, so replica lag is
+    never cached. Views of archived projects list the archived tasks.
+
+    Args:
+        view_id: The ID of the view
+        response: Response used to attach the cache and next-page cursor headers
+        limit: Optional maximum number of tasks to return
+        cursor: Cursor from the previous page's ``X-Next-Cursor`` header
+        db: Database session dependency
+        current_user: Authenticated user dependency
+
+    Returns:
+        list[TaskResponse]: Tasks matching the view
+
+    Raises:
+        HTTPException: If the view is not found, the user no longer has access to
+        its project, or the cursor is invalid
+    """
+    view = _own_view(db, current_user, view_id)
+    filters = load_filters(view)
+    keys = parse_sort(view.sort, TASK_SORT_FIELDS)
+    now = datetime.utcnow()
+
+    cached = view_cache.get(view) if view.cached else None
+    state = "hit"
+    if cached is not None:
+        # Deleting or archiving the project drops its cached views, so a role is enough
+        if not memberships.allows(db, current_user, view.project_id, ProjectRole.VIEWER):
+            raise HTTPException(status_code=403, detail="Project not found or access denied")
+    else:
+        project = member_project(db, current_user, view.project_id).first()
+        if project is None:
+            raise HTTPException(status_code=403, detail="Project not found or access denied")
+        archived = project.archived_at is not None
+        if view.cached and not archived:
+            cached = view_cache.load(db, view, filters, keys)
+            state = "miss"
+
+    if cached is not None:
+        tasks, next_cursor = view_cache.page(cached, now, cursor, limit)
+    else:
+        model = ArchivedTask if archived else Task
+        query = db.query(model).filter(model.project_id == view.project_id,
+                                       *view_conditions(model, filters, view.user_id, now))
+        rows, next_cursor = paginate(query, model, keys, cursor, limit)
+        tasks = [TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                              priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                              assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                              updated_at=task.updated_at) for task in rows]
+        state = "off"
+    response.headers["X-View-Cache"] = state
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
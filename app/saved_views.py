@@ -0,0 +1,497 @@
+"""
+Saved views and their cached results.
+
+A saved view is a user's named filter over a project's tasks (see
+ViewFilters): statuses, priorities, an assignee ("me" or a given user) and
+a due date window relative to now. Its predicate compiles to conditions on
+the task columns that the project's composite indexes serve, so opening an
+uncached view costs the same as the equivalent task listing.
+
+Views saved with ``cached`` keep their result in memory in each worker.
+The first open loads every task matching the view's time-independent
+conditions (with one indexed query, on the primary database); later opens
+sort the cached rows once, apply the due date window, and serve the page
+without querying the tasks. Results are maintained in place rather than
+recomputed:
+
+- Task writes call ``view_cache.task_changed`` after committing, which adds
+  the task to, replaces it in or removes it from every cached view of its
+  project according to the view's predicate.
+- Bulk changes (deleting a subtree, archiving, deleting the project) drop
+  the project's cached views, which reload on their next open.
+- ``ViewSync`` applies the changes made through other workers by polling
+  the activity log (see app.activity), re-reading the tasks it names. A
+  cached view reflects another worker's change within
+  ``settings.activity_flush_seconds`` plus ``settings.view_sync_seconds``.
+
+The activity log is lossy by design: a killed worker loses the entries it
+had not written yet, and a worker that cannot reach the database drops its
+oldest pending ones. So that a lost entry cannot leave a view wrong
+indefinitely, cached results are reloaded once they are
+``settings.view_cache_ttl_seconds`` old, whatever changes they saw.
+
+Only the most recently opened ``settings.view_cache_views`` results are
+kept, and a view matching more than ``settings.view_cache_max_rows`` tasks
+is served from the database instead.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import cmp_to_key
+from itertools import islice
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.activity import ActivityEntry
+from app.models.task import PRIORITY_CODES, Task
+from app.models.view import SavedView
+from app.pagination import SortKey, decode_cursor, encode_cursor, with_tiebreaker
+from app.polling import PollingThread
+from app.schemas.task import TaskPriority, TaskResponse
+from app.schemas.view import ViewFilters
+
+# Activity log entries re-read on each poll, so entries committed out of ID
+# order by concurrent flushes are not missed
+SYNC_OVERLAP_ROWS = 100
+
+# Task entries of the activity log whose task is re-read into the cached views
+TASK_ACTIONS = {"created", "updated", "moved"}
+
+# Entries after which the project's cached views are dropped: the change
+# touched several tasks, or moved them out of the live table
+BULK_ACTIONS = {"deleted", "archived", "unarchived"}
+
+
+def load_filters(view: SavedView) -> ViewFilters:
+    """
+    Parse the predicate stored with a view.
+
+    Args:
+        view: The saved view
+
+    Returns:
+        ViewFilters: The view's predicate
+    """
+    return ViewFilters.model_validate_json(view.filters)
+
+
+def dump_filters(filters: ViewFilters) -> str:
+    """
+    Serialize a predicate for storage, leaving out conditions that are not set.
+
+    Args:
+        filters: The predicate
+
+    Returns:
+        str: Compact JSON object
+    """
+    return filters.model_dump_json(exclude_defaults=True)
+
+
+def _assignee(filters: ViewFilters, user_id: int) -> Optional[int]:
+    return user_id if filters.assigned_to_me else filters.assignee_id
+
+
+def _due_limit(filters: ViewFilters, now: datetime) -> Optional[datetime]:
+    return None if filters.due_within_days is None else now + timedelta(days=filters.due_within_days)
+
+
+def view_conditions(model, filters: ViewFilters, user_id: int, now: Optional[datetime] = None) -> list:
+    """
+    Compile a view's predicate to SQL conditions on a task model.
+
+    Args:
+        model: Task or ArchivedTask
+        filters: The view's predicate
+        user_id: ID of the user who saved the view ("me")
+        now: Reference time of the due date window; without it only the
+            time-independent conditions are compiled, and the window is
+            reduced to the task having a due date
+
+    Returns:
+        list: Conditions to AND together, besides the project condition
+    """
+    conditions = []
+    if filters.status:
+        conditions.append(model.status.in_(filters.status))
+    if filters.priority:
+        conditions.append(model.priority.in_(filters.priority))
+    assignee_id = _assignee(filters, user_id)
+    if assignee_id is not None:
+        conditions.append(model.assignee_id == assignee_id)
+    if filters.due_within_days is not None:
+        conditions.append(model.due_date.is_not(None) if now is None else model.due_date <= _due_limit(filters, now))
+    return conditions
+
+
+def matches(filters: ViewFilters, user_id: int, task: TaskResponse) -> bool:
+    """
+    Evaluate the time-independent conditions of a view's predicate on a task.
+
+    Mirrors ``view_conditions`` without ``now``.
+
+    Args:
+        filters: The view's predicate
+        user_id: ID of the user who saved the view
+        task: The task
+
+    Returns:
+        bool: True if the task belongs in the view's cached result
+    """
+    if filters.status and task.status not in filters.status:
+        return False
+    if filters.priority and task.priority not in filters.priority:
+        return False
+    assignee_id = _assignee(filters, user_id)
+    if assignee_id is not None and task.assignee_id != assignee_id:
+        return False
+    return filters.due_within_days is None or task.due_date is not None
+
+
+def _sort_value(name: str, value: Any) -> Any:
+    # Priorities sort by their stored code, as in the database
+    if value is not None and name == "priority":
+        return PRIORITY_CODES[TaskPriority(value)]
+    return value
+
+
+def sort_key(keys: list[SortKey]) -> Callable[[Any], Any]:
+    """
+    Build a sort key ordering tasks as ``paginate`` does in the database.
+
+    NULLs are greater than every value, and ties are broken by ID.
+
+    Args:
+        keys: Parsed sort keys
+
+    Returns:
+        Callable: Key function for ``sorted`` and ``bisect``
+    """
+    full_keys = with_tiebreaker(keys)
+
+    def compare(a, b) -> int:
+        for name, descending in full_keys:
+            x, y = _sort_value(name, getattr(a, name)), _sort_value(name, getattr(b, name))
+            if x == y:
+                continue
+            greater = True if x is None else False if y is None else x > y
+            return -1 if greater == descending else 1
+        return 0
+
+    return cmp_to_key(compare)
+
+
+def _task_response(task: Task) -> TaskResponse:
+    return TaskResponse(id=task.id, name=task.name, description=task.description, status=task.status,
+                        priority=task.priority, due_date=task.due_date, project_id=task.project_id,
+                        assignee_id=task.assignee_id, parent_id=task.parent_id, created_at=task.created_at,
+                        updated_at=task.updated_at)
+
+
+def _stored(task: TaskResponse) -> TaskResponse:
+    # Due dates are stored without time zone; compare them the same way
+    if task.due_date is not None and task.due_date.tzinfo is not None:
+        return task.model_copy(update={"due_date": task.due_date.replace(tzinfo=None)})
+    return task
+
+
+@dataclass
+class CachedView:
+    """
+    Cached result of a saved view.
+
+    Attributes:
+        view_id: ID of the view
+        version: Version of the view definition the result was built for
+        user_id: ID of the user who saved the view
+        project_id: ID of the filtered project
+        filters: The view's predicate
+        keys: The view's sort keys
+        rows: Tasks matching the time-independent conditions, by ID
+        versions: Row version of every task loaded into or applied to the view,
+            removed ones included, so an older write never replaces a newer one
+        ordered: ``rows`` in sort order, rebuilt on the first read after a change
+        loaded_at: ``time.monotonic()`` when the result was loaded
+    """
+    view_id: int
+    version: int
+    user_id: int
+    project_id: int
+    filters: ViewFilters
+    keys: list[SortKey]
+    rows: dict[int, TaskResponse] = field(default_factory=dict)
+    versions: dict[int, int] = field(default_factory=dict)
+    ordered: Optional[list[TaskResponse]] = None
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+class ViewCache:
+    """
+    Least recently used cache of saved view results, maintained as tasks change.
+
+    Attributes:
+        max_views: Number of view results kept
+        max_rows: Largest result that is cached
+        ttl_seconds: Age at which a result is reloaded, bounding the effect of lost activity log entries
+        loads: Results loaded from the database since the cache was created
+        last_id: Highest activity log entry applied by ``sync`` (None before the first sync)
+    """
+
+    def __init__(self, max_views: int = 1000, max_rows: int = 10_000, ttl_seconds: float = 300.0):
+        self.max_views = max_views
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self.loads = 0
+        self.last_id: Optional[int] = None
+        self._views: OrderedDict[int, CachedView] = OrderedDict()
+        self._projects: dict[int, set[int]] = {}
+        # Changes seen per project; a load racing with a change is not kept
+        self._generations: dict[int, int] = {}
+        self._seen: set[int] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def get(self, view: SavedView) -> Optional[CachedView]:
+        """
+        Return the cached result of a view, if it was built for its current definition and has not expired.
+
+        Args:
+            view: The saved view
+
+        Returns:
+            Optional[CachedView]: The cached result, or None
+        """
+        with self._lock:
+            cached = self._views.get(view.id)
+            if cached is None or cached.version != view.version:
+                return None
+            if time.monotonic() - cached.loaded_at > self.ttl_seconds:
+                self._drop(view.id)
+                return None
+            self._views.move_to_end(view.id)
+            return cached
+
+    def load(self, db: Session, view: SavedView, filters: ViewFilters, keys: list[SortKey]) -> Optional[CachedView]:
+        """
+        Build a view's result from the database and cache it.
+
+        Args:
+            db: Session on the primary database
+            view: The saved view
+            filters: The view's predicate
+            keys: The view's sort keys
+
+        Returns:
+            Optional[CachedView]: The result, or None if it has more than ``max_rows`` tasks
+        """
+        with self._lock:
+            generation = self._generations.get(view.project_id, 0)
+        tasks = db.query(Task).filter(Task.project_id == view.project_id,
+                                      *view_conditions(Task, filters, view.user_id)).limit(self.max_rows + 1).all()
+        if len(tasks) > self.max_rows:
+            return None
+        cached = CachedView(view_id=view.id, version=view.version, user_id=view.user_id, project_id=view.project_id,
+                            filters=filters, keys=keys, rows={task.id: _task_response(task) for task in tasks},
+                            versions={task.id: task.version for task in tasks})
+        with self._lock:
+            self.loads += 1
+            # A change committed while loading may be missing from the result: serve it once, do not keep it
+            if self._generations.get(view.project_id, 0) != generation:
+                return cached
+            self._drop(view.id)
+            self._views[view.id] = cached
+            self._projects.setdefault(view.project_id, set()).add(view.id)
+            while len(self._views) > self.max_views:
+                self._drop(next(iter(self._views)))
+        return cached
+
+    def page(self, cached: CachedView, now: datetime, cursor: Optional[str] = None,
+             limit: Optional[int] = None) -> tuple[list[TaskResponse], Optional[str]]:
+        """
+        Read one page of a cached view, with the same cursors as ``paginate``.
+
+        Args:
+            cached: Result returned by ``get`` or ``load``
+            now: Reference time of the due date window
+            cursor: Optional cursor from the previous page
+            limit: Optional page size; without it all remaining tasks are returned
+
+        Returns:
+            tuple[list[TaskResponse], Optional[str]]: Tasks of the page and the
+            cursor for the next page (None when this is the last page)
+
+        Raises:
+            HTTPException: If the cursor is malformed or was issued for another sort
+        """
+        key = sort_key(cached.keys)
+        with self._lock:
+            if cached.ordered is None:
+                cached.ordered = sorted(cached.rows.values(), key=key)
+            # Changes replace the list rather than modifying it, so it can be read unlocked
+            ordered = cached.ordered
+        start = 0
+        if cursor is not None:
+            values = decode_cursor(Task, cached.keys, cursor)
+            last = SimpleNamespace(**{name: value for (name, _), value
+                                      in zip(with_tiebreaker(cached.keys), values)})
+            start = bisect_right(ordered, key(last), key=key)
+        due_limit = _due_limit(cached.filters, now)
+        rows = (ordered[i] for i in range(start, len(ordered))
+                if due_limit is None or ordered[i].due_date <= due_limit)
+        if limit is None:
+            return list(rows), None
+        tasks = list(islice(rows, limit + 1))
+        if len(tasks) <= limit:
+            return tasks, None
+        tasks = tasks[:limit]
+        return tasks, encode_cursor(cached.keys, tasks[-1])
+
+    def task_changed(self, task: TaskResponse, version: int) -> None:
+        """
+        Apply a committed task write to the cached views of its project.
+
+        Writes can arrive out of order (a local write and the sync re-reading
+        another worker's later one), so they are ordered by the task's row
+        version: timestamps are not a valid order, having 1-second resolution
+        on SQLite and being the transaction start time on PostgreSQL.
+
+        Args:
+            task: The task as written
+            version: Row version of the task after the write
+        """
+        task = _stored(task)
+        with self._lock:
+            self._generations[task.project_id] = self._generations.get(task.project_id, 0) + 1
+            for view_id in list(self._projects.get(task.project_id, ())):
+                cached = self._views[view_id]
+                if cached.versions.get(task.id, 0) > version:
+                    # A newer write was already applied
+                    continue
+                cached.versions[task.id] = version
+                current = cached.rows.get(task.id)
+                if matches(cached.filters, cached.user_id, task):
+                    cached.rows[task.id] = task
+                    if len(cached.rows) > self.max_rows:
+                        self._drop(view_id)
+                        continue
+                elif current is None:
+                    continue
+                else:
+                    del cached.rows[task.id]
+                cached.ordered = None
+
+    def project_changed(self, project_id: int) -> None:
+        """
+        Drop the cached views of a project after a change to many of its tasks.
+
+        Args:
+            project_id: ID of the project
+        """
+        with self._lock:
+            self._generations[project_id] = self._generations.get(project_id, 0) + 1
+            for view_id in list(self._projects.get(project_id, ())):
+                self._drop(view_id)
+
+    def drop(self, view_id: int) -> None:
+        """
+        Forget the cached result of a view.
+
+        Args:
+            view_id: ID of the view
+        """
+        with self._lock:
+            self._drop(view_id)
+
+    def _drop(self, view_id: int) -> None:
+        cached = self._views.pop(view_id, None)
+        if cached is not None:
+            views = self._projects[cached.project_id]
+            views.discard(view_id)
+            if not views:
+                del self._projects[cached.project_id]
+
+    def sync(self, bind: Engine) -> int:
+        """
+        Apply the task changes logged by every worker since the last sync.
+
+        The first sync only records where the log ends: nothing is cached yet.
+
+        Args:
+            bind: Engine (or connection) holding the activity log and tasks
+
+        Returns:
+            int: Number of log entries applied
+        """
+        with Session(bind=bind) as session:
+            if self.last_id is None:
+                self.last_id = session.scalar(select(func.max(ActivityEntry.id))) or 0
+                return 0
+            rows = session.execute(select(ActivityEntry.id, ActivityEntry.project_id, ActivityEntry.task_id,
+                                          ActivityEntry.action)
+                                   .where(ActivityEntry.id > self.last_id - SYNC_OVERLAP_ROWS)).all()
+            changed: dict[int, int] = {}
+            bulk: set[int] = set()
+            applied = 0
+            for row in rows:
+                if row.id in self._seen:
+                    continue
+                self._seen.add(row.id)
+                self.last_id = max(self.last_id, row.id)
+                applied += 1
+                if row.task_id is not None and row.action in TASK_ACTIONS:
+                    changed[row.task_id] = row.project_id
+                elif row.action in BULK_ACTIONS:
+                    bulk.add(row.project_id)
+            self._seen = {entry_id for entry_id in self._seen if entry_id > self.last_id - SYNC_OVERLAP_ROWS}
+
+            ids = list(changed)
+            for start in range(0, len(ids), settings.max_page_size):
+                tasks = session.scalars(select(Task).where(Task.id.in_(ids[start:start + settings.max_page_size])))
+                for task in tasks:
+                    self.task_changed(_task_response(task), task.version)
+                    del changed[task.id]
+            # Tasks no longer live were deleted or archived since
+            bulk.update(changed.values())
+        for project_id in bulk:
+            self.project_changed(project_id)
+        return applied
+
+    def clear(self) -> None:
+        """Forget every cached result."""
+        with self._lock:
+            self._views.clear()
+            self._projects.clear()
+            self._generations.clear()
+
+
+class ViewSync(PollingThread):
+    """
+    Background thread in each worker applying other workers' task changes to ``view_cache``.
+
+    Attributes:
+        bind: Engine holding the activity log and tasks
+        cache: Cache to keep up to date
+    """
+    failure_message = "Saved view sync failed"
+
+    def __init__(self, bind: Engine, cache: ViewCache, poll_seconds: float = 1.0):
+        super().__init__("view-sync", poll_seconds)
+        self.bind = bind
+        self.cache = cache
+
+    def poll(self) -> None:
+        self.cache.sync(self.bind)
+
+
+view_cache = ViewCache(max_views=settings.view_cache_views, max_rows=settings.view_cache_max_rows,
+                       ttl_seconds=settings.view_cache_ttl_seconds)
@@ -0,0 +1,312 @@
+"""
+Due-soon and overdue notifications.
+
+A task fires two events: "due_soon" ``settings.due_soon_minutes`` before its
+due date, and "overdue" at its due date, unless it is done by then. Each
+event inserts a TaskNotification for the task's assignee (or the project
+owner) and is passed to the callbacks registered with
+``DueScheduler.subscribe``.
+
+The scheduler never scans the task table. It keeps the events of the next
+``settings.scheduler_window_seconds`` in a heap ordered by firing time and
+loads each following window shortly before it starts, with one range scan
+per event kind over the ``(due_date, status)`` index. Task writes call
+``task_changed``, which pushes the new events of a task when they fall into
+the window already loaded; later ones are picked up when their window is
+loaded. Entries are never removed from the heap: when an entry fires, the
+task is re-read and the entry is dropped if the task was completed, deleted,
+archived or rescheduled in the meantime.
+
+Notifications are unique per task, kind and due date, so every worker can
+run a scheduler: the first one to insert a notification emits the event,
+the others skip it. How far events have been processed is checkpointed in
+the database; after a restart the scheduler catches up on the events that
+fell due while it was down, again with range scans of the index.
+"""
+import heapq
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.notification import SchedulerCheckpoint, TaskNotification
+from app.models.project import Project
+from app.models.task import Task
+from app.polling import PollingThread
+from app.schemas.task import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+DUE_SOON = "due_soon"
+OVERDUE = "overdue"
+CHECKPOINT = "due_scheduler"
+
+
+@dataclass
+class DueEvent:
+    """
+    A task that became due soon or overdue.
+
+    Attributes:
+        kind: "due_soon" or "overdue"
+        task_id: ID of the task
+        project_id: ID of the task's project
+        user_id: ID of the notified user
+        due_date: Due date of the task
+        notification_id: ID of the stored TaskNotification
+    """
+    kind: str
+    task_id: int
+    project_id: int
+    user_id: int
+    due_date: datetime
+    notification_id: int
+
+
+def _insert_ignoring_duplicates(dialect_name: str):
+    return (postgresql if dialect_name == "postgresql" else sqlite).insert(TaskNotification)
+
+
+class DueScheduler:
+    """
+    Heap of the due-soon and overdue events of the loaded time window.
+
+    Attributes:
+        due_soon: How long before its due date a task is due soon
+        window: Length of the time window loaded at once
+        loaded_until: End of the loaded window (None before the first load)
+        processed_until: Every event firing before this time has been handled
+    """
+
+    def __init__(self, due_soon: timedelta, window: timedelta):
+        self.due_soon = due_soon
+        self.window = window
+        self.loaded_until: Optional[datetime] = None
+        self.processed_until: Optional[datetime] = None
+        self._heap: list[tuple[datetime, int, str, datetime]] = []
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[DueEvent], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _lead(self, kind: str) -> timedelta:
+        return self.due_soon if kind == DUE_SOON else timedelta(0)
+
+    def subscribe(self, callback: Callable[[DueEvent], None]) -> None:
+        """
+        Call ``callback`` with every event emitted by this scheduler.
+
+        Args:
+            callback: Function taking a DueEvent; exceptions it raises are logged
+        """
+        self._listeners.append(callback)
+
+    def task_changed(self, task_id: int, due_date: Optional[datetime], status: TaskStatus) -> None:
+        """
+        Schedule the events of a created or updated task.
+
+        Only events firing within the loaded window are pushed; events that
+        no longer apply are discarded when they fire.
+
+        Args:
+            task_id: ID of the task
+            due_date: The task's due date
+            status: The task's status
+        """
+        if due_date is None or status == TaskStatus.DONE or self.loaded_until is None:
+            return
+        # Due dates are stored without a time zone
+        due_date = due_date.replace(tzinfo=None)
+        with self._lock:
+            for kind in (DUE_SOON, OVERDUE):
+                fire_at = due_date - self._lead(kind)
+                if fire_at < self.loaded_until:
+                    heapq.heappush(self._heap, (fire_at, task_id, kind, due_date))
+
+    def load(self, bind: Engine, start: datetime, end: datetime) -> int:
+        """
+        Push the events firing in ``[start, end)``.
+
+        Args:
+            bind: Engine (or connection) holding the tasks
+            start: Start of the window
+            end: End of the window
+
+        Returns:
+            int: Number of events pushed
+        """
+        entries = []
+        with Session(bind=bind) as session:
+            for kind in (DUE_SOON, OVERDUE):
+                lead = self._lead(kind)
+                rows = session.execute(select(Task.id, Task.due_date).where(
+                    Task.due_date >= start + lead, Task.due_date < end + lead, Task.status != TaskStatus.DONE)).all()
+                entries.extend((row.due_date - lead, row.id, kind, row.due_date) for row in rows)
+        with self._lock:
+            for entry in entries:
+                heapq.heappush(self._heap, entry)
+            self.loaded_until = max(self.loaded_until or end, end)
+        return len(entries)
+
+    def fire(self, bind: Engine, now: datetime) -> list[DueEvent]:
+        """
+        Emit the events that are due, skipping those that no longer apply.
+
+        If storing the notifications fails, the due entries are put back so
+        the next call emits them.
+
+        Args:
+            bind: Engine (or connection) holding the tasks
+            now: Current time
+
+        Returns:
+            list[DueEvent]: Events emitted by this call
+        """
+        with self._lock:
+            entries = []
+            while self._heap and self._heap[0][0] <= now:
+                entries.append(heapq.heappop(self._heap))
+        events = []
+        if entries:
+            try:
+                events = self._notify(bind, entries)
+            except Exception:
+                # Emitted again on the next call; notifications already stored are not duplicated
+                with self._lock:
+                    for entry in entries:
+                        heapq.heappush(self._heap, entry)
+                raise
+        self.processed_until = max(self.processed_until or now, now)
+        for event in events:
+            for callback in self._listeners:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Due event listener failed")
+        return events
+
+    def _notify(self, bind: Engine, entries: list[tuple[datetime, int, str, datetime]]) -> list[DueEvent]:
+        """Store the notifications of the entries that still apply; return their events."""
+        with Session(bind=bind) as session:
+            tasks = {row.id: row for row in session.execute(
+                select(Task.id, Task.due_date, Task.status, Task.project_id, Task.assignee_id, Project.owner_id)
+                .join(Project, Project.id == Task.project_id)
+                .where(Task.id.in_({entry[1] for entry in entries}), Project.deleted_at.is_(None),
+                       Project.archived_at.is_(None)))}
+            values, events = {}, []
+            for _, task_id, kind, due_date in entries:
+                task = tasks.get(task_id)
+                if task is not None and task.due_date == due_date and task.status != TaskStatus.DONE:
+                    values[task_id, kind] = {"user_id": task.assignee_id or task.owner_id, "task_id": task_id,
+                                             "project_id": task.project_id, "kind": kind, "due_date": due_date}
+            if values:
+                statement = _insert_ignoring_duplicates(bind.dialect.name).values(
+                    list(values.values())).on_conflict_do_nothing(
+                    index_elements=["task_id", "kind", "due_date"])
+                inserted = session.execute(statement.returning(
+                    TaskNotification.id, TaskNotification.user_id, TaskNotification.task_id,
+                    TaskNotification.project_id, TaskNotification.kind, TaskNotification.due_date)).all()
+                events = [DueEvent(kind=row.kind, task_id=row.task_id, project_id=row.project_id,
+                                   user_id=row.user_id, due_date=row.due_date, notification_id=row.id)
+                          for row in inserted]
+            session.commit()
+        return events
+
+    def checkpoint(self, bind: Engine) -> None:
+        """
+        Record ``processed_until`` in the database; it never moves backwards.
+
+        Args:
+            bind: Engine (or connection) holding the checkpoint
+        """
+        if self.processed_until is None:
+            return
+        with Session(bind=bind) as session:
+            result = session.execute(update(SchedulerCheckpoint).where(
+                SchedulerCheckpoint.name == CHECKPOINT, SchedulerCheckpoint.processed_until < self.processed_until)
+                .values(processed_until=self.processed_until))
+            if result.rowcount == 0 and session.get(SchedulerCheckpoint, CHECKPOINT) is None:
+                session.add(SchedulerCheckpoint(name=CHECKPOINT, processed_until=self.processed_until))
+            session.commit()
+
+    def catch_up(self, bind: Engine, now: datetime) -> list[DueEvent]:
+        """
+        Start the scheduler: emit the events missed since the last checkpoint
+        and load the first window.
+
+        Without a checkpoint (first start) nothing is caught up, so existing
+        overdue tasks are not all notified at once.
+
+        Args:
+            bind: Engine (or connection) holding the tasks
+            now: Current time
+
+        Returns:
+            list[DueEvent]: Events emitted while catching up
+        """
+        with Session(bind=bind) as session:
+            checkpoint = session.get(SchedulerCheckpoint, CHECKPOINT)
+            since = checkpoint.processed_until if checkpoint is not None else now
+        self.load(bind, min(since, now), now + self.window)
+        events = self.fire(bind, now)
+        self.checkpoint(bind)
+        return events
+
+    def tick(self, bind: Engine, now: datetime) -> list[DueEvent]:
+        """
+        Emit the events that are due and load the next window once half of
+        the current one has passed.
+
+        Args:
+            bind: Engine (or connection) holding the tasks
+            now: Current time
+
+        Returns:
+            list[DueEvent]: Events emitted by this tick
+        """
+        events = self.fire(bind, now)
+        if self.loaded_until is None or now + self.window / 2 >= self.loaded_until:
+            start = self.loaded_until or now
+            self.load(bind, start, max(start, now) + self.window)
+            self.checkpoint(bind)
+        return events
+
+
+class DueSchedulerThread(PollingThread):
+    """
+    Background thread in each worker running the due scheduler.
+
+    The first poll catches up on the events missed while no worker was
+    running; later ones tick.
+
+    Attributes:
+        bind: Engine holding the tasks
+        scheduler: Scheduler to run
+    """
+    poll_at_start = True
+    failure_message = "Due scheduler tick failed"
+
+    def __init__(self, bind: Engine, scheduler: DueScheduler, tick_seconds: float = 1.0):
+        super().__init__("due-scheduler", tick_seconds)
+        self.bind = bind
+        self.scheduler = scheduler
+        self._caught_up = False
+
+    def poll(self) -> None:
+        if not self._caught_up:
+            self.scheduler.catch_up(self.bind, datetime.utcnow())
+            self._caught_up = True
+        else:
+            self.scheduler.tick(self.bind, datetime.utcnow())
+
+
+due_scheduler = DueScheduler(due_soon=timedelta(minutes=settings.due_soon_minutes),
+                             window=timedelta(seconds=settings.scheduler_window_seconds))
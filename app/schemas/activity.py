@@ -0,0 +1,36 @@
+"""
+Activity log Pydantic schemas.
+
+This module defines the schema of the entries returned by the project and
+task activity feeds.
+"""
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+class ActivityResponse(BaseModel):
+    """
+    Schema for an activity log entry in API responses.
+
+    Attributes:
+        id: Entry's unique identifier (increasing in the order entries were written)
+        project_id: ID of the project
+        task_id: ID of the task (None for changes to the project itself)
+        actor_id: ID of the user who made the change
+        action: What was done ("created", "updated", "moved", "deleted", "archived", "unarchived",
+            "member_added", "member_updated" or "member_removed")
+        changes: Fields written by the change and their new values
+        created_at: Time the change was made
+        task_version: Row version of the task after the change, ordering the
+            task's entries (None for changes to the project itself)
+    """
+    id: int
+    project_id: int
+    task_id: Optional[int] = None
+    actor_id: int
+    action: str
+    changes: dict[str, Any]
+    created_at: datetime
+    task_version: Optional[int] = None
@@ -0,0 +1,22 @@
+"""
+Admin-related Pydantic schemas for request/response validation.
+
+This module defines schemas for the CPU profiler endpoints.
+"""
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ProfileResponse(BaseModel):
+    """
+    Schema for a started CPU profile.
+
+    Attributes:
+        id: Profile ID used to download the result
+        until: Time sampling ends in every worker
+        interval_ms: Milliseconds between samples
+    """
+    id: str
+    until: datetime
+    interval_ms: int
@@ -0,0 +1,21 @@
+"""
+Batch lookup Pydantic schemas.
+
+This module defines the per-item error reported by batch lookups for IDs
+that could not be returned.
+"""
+from pydantic import BaseModel
+
+
+class BatchError(BaseModel):
+    """
+    Schema for an ID a batch lookup could not return.
+
+    Attributes:
+        id: The requested ID
+        status: HTTP status the single-item endpoint would have returned
+        detail: Error message
+    """
+    id: int
+    status: int
+    detail: str
@@ -0,0 +1,62 @@
+"""
+Project membership Pydantic schemas.
+
+This module defines the project roles and the schemas used to add members to
+a project, change their role and list them.
+"""
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ProjectRole(str, Enum):
+    """
+    Enumeration of project roles, from most to least privileged.
+
+    Values:
+        OWNER: Manages members, archives and deletes the project
+        EDITOR: Updates the project and creates, edits and deletes its tasks
+        VIEWER: Reads the project and its tasks
+    """
+    OWNER = "owner"
+    EDITOR = "editor"
+    VIEWER = "viewer"
+
+
+class MemberCreate(BaseModel):
+    """
+    Schema for adding a member to a project.
+
+    Attributes:
+        email: Email address of the user to add
+        role: Role given to the user
+    """
+    email: str
+    role: ProjectRole
+
+
+class MemberUpdate(BaseModel):
+    """
+    Schema for changing a member's role.
+
+    Attributes:
+        role: New role of the member
+    """
+    role: ProjectRole
+
+
+class MemberResponse(BaseModel):
+    """
+    Schema for project member data in API responses.
+
+    Attributes:
+        user_id: ID of the member
+        email: Email address of the member
+        role: Role of the member in the project
+        created_at: Time the user joined the project
+    """
+    user_id: int
+    email: str
+    role: ProjectRole
+    created_at: datetime
@@ -0,0 +1,45 @@
+"""
+Notification Pydantic schemas.
+
+This module defines the schema of the due-soon and overdue notifications
+returned by the notification endpoints.
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class NotificationKind(str, Enum):
+    """
+    Enumeration of notification kinds.
+
+    Values:
+        DUE_SOON: The task is due within ``settings.due_soon_minutes``
+        OVERDUE: The task's due date has passed and it is not done
+    """
+    DUE_SOON = "due_soon"
+    OVERDUE = "overdue"
+
+
+class NotificationResponse(BaseModel):
+    """
+    Schema for notification data in API responses.
+
+    Attributes:
+        id: Notification's unique identifier
+        kind: Notification kind
+        task_id: ID of the task the notification is about
+        project_id: ID of the task's project
+        due_date: Due date of the task when the notification was emitted
+        created_at: Time the notification was emitted
+        read_at: Time the notification was marked as read (None while unread)
+    """
+    id: int
+    kind: NotificationKind
+    task_id: int
+    project_id: int
+    due_date: datetime
+    created_at: datetime
+    read_at: Optional[datetime] = None
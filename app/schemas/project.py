@@ -9,6 +9,8 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from app.schemas.batch import BatchError
+
 
 class ProjectCreate(BaseModel):
     """
@@ -32,12 +34,26 @@ class ProjectResponse(BaseModel):
         description: Project description
         owner_id: ID of the user who owns this project
         created_at: Project creation timestamp
+        archived_at: When the project was archived (None while active)
     """
     id: int
     title: str
     description: str
     owner_id: int
     created_at: datetime
+    archived_at: Optional[datetime] = None
+
+
+class ProjectBatchResponse(BaseModel):
+    """
+    Schema for a batch lookup of projects by ID.
+
+    Attributes:
+        items: Projects found, in request order
+        errors: IDs that could not be returned, with the reason
+    """
+    items: list[ProjectResponse]
+    errors: list[BatchError]
 
 
 class ProjectUpdate(BaseModel):
@@ -52,3 +68,35 @@ class ProjectUpdate(BaseModel):
     """
     title: Optional[str] = None
     description: Optional[str] = None
+
+
+class ProjectDeletionResponse(BaseModel):
+    """
+    Schema for the status of a background project deletion.
+
+    Attributes:
+        id: Deletion job identifier
+        project_id: ID of the project being deleted
+        status: Job state (pending, running, completed, failed)
+        tasks_deleted: Number of tasks removed so far
+        created_at: Timestamp of the deletion request
+        finished_at: Timestamp the job completed or failed
+    """
+    id: int
+    project_id: int
+    status: str
+    tasks_deleted: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class ArchiveResponse(BaseModel):
+    """
+    Schema for the result of moving tasks between the hot and archive tables.
+
+    Attributes:
+        project_id: ID of the affected project
+        tasks_moved: Number of tasks moved
+    """
+    project_id: int
+    tasks_moved: int
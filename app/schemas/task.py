@@ -10,6 +10,8 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from app.schemas.batch import BatchError
+
 
 class TaskStatus(str, Enum):
     """
@@ -49,12 +51,14 @@ class TaskCreate(BaseModel):
         priority: Optional task priority (defaults to medium)
         due_date: Optional deadline
         assignee_id: Optional ID of user to assign task to
+        parent_id: Optional ID of the parent task, making this a subtask
     """
     name: str
     description: Optional[str] = None
     priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
     assignee_id: Optional[int] = None
+    parent_id: Optional[int] = None
 
 
 class TaskResponse(BaseModel):
@@ -70,6 +74,7 @@ class TaskResponse(BaseModel):
         due_date: Task deadline
         assignee_id: ID of assigned user
         project_id: ID of parent project
+        parent_id: ID of the parent task (None for top-level tasks)
         created_at: Task creation timestamp
         updated_at: Last update timestamp
     """
@@ -81,10 +86,23 @@ class TaskResponse(BaseModel):
     due_date: Optional[datetime] = None
     assignee_id: Optional[int] = None
     project_id: int
+    parent_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
 
+class TaskBatchResponse(BaseModel):
+    """
+    Schema for a batch lookup of tasks by ID.
+
+    Attributes:
+        items: Tasks found, in request order
+        errors: IDs that could not be returned, with the reason
+    """
+    items: list[TaskResponse]
+    errors: list[BatchError]
+
+
 class TaskUpdate(BaseModel):
     """
     Schema for task update request.
@@ -105,3 +123,63 @@ class TaskUpdate(BaseModel):
     priority: Optional[TaskPriority] = None
     due_date: Optional[datetime] = None
     assignee_id: Optional[int] = None
+
+
+class TaskMove(BaseModel):
+    """
+    Schema for moving a task, with its subtasks, below another parent.
+
+    Attributes:
+        parent_id: ID of the new parent task (None to make the task top-level)
+    """
+    parent_id: Optional[int] = None
+
+
+class TaskRollup(BaseModel):
+    """
+    Schema for the status counts of a task and its subtasks.
+
+    Attributes:
+        task_id: ID of the subtree's root task
+        total: Number of tasks in the subtree, the root included
+        counts: Number of tasks per status
+    """
+    task_id: int
+    total: int
+    counts: dict[TaskStatus, int]
+
+
+class DependencyCreate(BaseModel):
+    """
+    Schema for adding a dependency to a task.
+
+    Attributes:
+        blocked_by_id: ID of the task that must be done first
+    """
+    blocked_by_id: int
+
+
+class DependencyResponse(BaseModel):
+    """
+    Schema for a dependency in API responses.
+
+    Attributes:
+        task_id: ID of the blocked task
+        blocked_by_id: ID of the task that must be done first
+        created_at: Time the dependency was added
+    """
+    task_id: int
+    blocked_by_id: int
+    created_at: datetime
+
+
+class CriticalPathResponse(BaseModel):
+    """
+    Schema for a project's critical path.
+
+    Attributes:
+        target_id: ID of the task the path leads to (None if the project has no unfinished task)
+        tasks: Tasks on the path, first blocker first and the target last
+    """
+    target_id: Optional[int] = None
+    tasks: list[TaskResponse]
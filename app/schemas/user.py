@@ -5,6 +5,7 @@ This module defines schemas for user registration, authentication,
 and API responses.
 """
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -42,6 +43,28 @@ class Token(BaseModel):
     Attributes:
         access_token: JWT access token string
         token_type: Token type (always "bearer")
+        refresh_token: Single-use token for ``POST /auth/refresh``
     """
     access_token: str
     token_type: str
+    refresh_token: str
+
+
+class RefreshRequest(BaseModel):
+    """
+    Schema for exchanging a refresh token for new tokens.
+
+    Attributes:
+        refresh_token: Refresh token from login or the previous refresh
+    """
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    """
+    Schema for logout request.
+
+    Attributes:
+        refresh_token: Optional refresh token to revoke along with the access token
+    """
+    refresh_token: Optional[str] = None
@@ -0,0 +1,86 @@
+"""
+Saved view Pydantic schemas.
+
+This module defines the predicate of a saved view and the schemas used to
+save, update and list views.
+"""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.task import TaskPriority, TaskStatus
+
+
+class ViewFilters(BaseModel):
+    """
+    Predicate of a saved view; tasks must match every condition given.
+
+    Attributes:
+        status: Statuses to include (None or empty for any)
+        priority: Priorities to include (None or empty for any)
+        assigned_to_me: Only tasks assigned to the user who saved the view
+        assignee_id: Only tasks assigned to this user
+        due_within_days: Only tasks due within this many days from now, overdue ones included
+    """
+    status: Optional[list[TaskStatus]] = None
+    priority: Optional[list[TaskPriority]] = None
+    assigned_to_me: bool = False
+    assignee_id: Optional[int] = None
+    due_within_days: Optional[int] = Field(None, ge=0)
+
+
+class ViewCreate(BaseModel):
+    """
+    Schema for saving a view.
+
+    Attributes:
+        name: Name of the view
+        filters: Predicate of the view
+        sort: Optional sort specification, as accepted by the task listing
+        cached: Keep the view's result in memory, maintained as tasks change
+    """
+    name: str
+    filters: ViewFilters = ViewFilters()
+    sort: Optional[str] = None
+    cached: bool = True
+
+
+class ViewUpdate(BaseModel):
+    """
+    Schema for updating a view.
+
+    All fields are optional to allow partial updates.
+
+    Attributes:
+        name: Updated name
+        filters: Updated predicate, replacing the previous one
+        sort: Updated sort specification
+        cached: Updated caching choice
+    """
+    name: Optional[str] = None
+    filters: Optional[ViewFilters] = None
+    sort: Optional[str] = None
+    cached: Optional[bool] = None
+
+
+class ViewResponse(BaseModel):
+    """
+    Schema for saved view data in API responses.
+
+    Attributes:
+        id: View's unique identifier
+        project_id: ID of the filtered project
+        name: Name of the view
+        filters: Predicate of the view
+        sort: Sort specification (None for ID order)
+        cached: Whether the view's result is kept in memory
+        created_at: View creation timestamp
+    """
+    id: int
+    project_id: int
+    name: str
+    filters: ViewFilters
+    sort: Optional[str] = None
+    cached: bool
+    created_at: datetime
@@ -0,0 +1,103 @@
+"""
+Production serving profile.
+
+A gunicorn configuration module running the app under several uvicorn worker
+processes:
+
+    gunicorn -c python:app.serving
+
+- ``preload_app``: the app is imported once in the master and workers are
+  forked from it, so startup work is done once and code pages are shared.
+  Each worker then drops the database connections inherited from the master
+  (``post_fork``) and opens its own.
+- Recycling: a worker is replaced after about ``worker_max_requests``
+  requests (with jitter so workers do not restart together), or when its
+  resident memory exceeds ``worker_max_memory_mb``.
+- Draining: on SIGTERM (or when recycled) a worker stops accepting
+  connections and gets ``worker_graceful_timeout`` seconds to finish the
+  requests already in flight.
+
+All values come from ``Settings`` and can be overridden through the
+environment (e.g. ``WEB_CONCURRENCY=4``).
+"""
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import threading
+from typing import Callable
+
+from app.config import settings
+from app.database import dispose_engines
+
+wsgi_app = "app.main:TaskForge"
+bind = settings.bind
+workers = settings.web_concurrency or multiprocessing.cpu_count()
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+max_requests = settings.worker_max_requests
+max_requests_jitter = settings.worker_max_requests_jitter
+graceful_timeout = settings.worker_graceful_timeout
+keepalive = 5
+
+MEMORY_CHECK_SECONDS = 5.0
+
+
+def rss_bytes() -> int:
+    """Return the resident memory of the current process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current RSS, reported in bytes on macOS and KiB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryWatcher(threading.Thread):
+    """
+    Background thread calling ``on_exceed`` once when the process grows past a limit.
+
+    Attributes:
+        limit_bytes: Resident memory threshold
+        on_exceed: Called (once) when the threshold is crossed
+        interval: Seconds between checks
+    """
+
+    def __init__(self, limit_bytes: int, on_exceed: Callable[[int], None], interval: float = MEMORY_CHECK_SECONDS):
+        super().__init__(name="memory-watcher", daemon=True)
+        self.limit_bytes = limit_bytes
+        self.on_exceed = on_exceed
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            rss = rss_bytes()
+            if rss > self.limit_bytes:
+                self.on_exceed(rss)
+                return
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stopped.set()
+
+
+def post_fork(server, worker) -> None:
+    """
+    gunicorn hook run in each worker right after it is forked.
+
+    Args:
+        server: The gunicorn arbiter
+        worker: The new worker
+    """
+    dispose_engines()
+    if settings.worker_max_memory_mb:
+        def recycle(rss: int) -> None:
+            server.log.info("Worker %s uses %d MB (limit %d MB), recycling", worker.pid, rss // 2 ** 20,
+                            settings.worker_max_memory_mb)
+            # Same as a graceful shutdown: in-flight requests finish, then the arbiter forks a replacement
+            os.kill(worker.pid, signal.SIGTERM)
+
+        MemoryWatcher(settings.worker_max_memory_mb * 2 ** 20, recycle, MEMORY_CHECK_SECONDS).start()
@@ -0,0 +1,535 @@
+"""
+Distributed tracing.
+
+A small OpenTelemetry-compatible tracer: every sampled request gets a server
+span, with child spans for token verification, the user lookup, each SQL
+statement and response serialization. Trace context is read from and
+propagated with the W3C ``traceparent`` header, and spans are exported in the
+OTLP/JSON span format, so they can be sent to any OpenTelemetry collector.
+
+Exporters are pluggable (``settings.tracing_exporter``):
+
+- ``none``: tracing disabled (default)
+- ``console``: one JSON span per line on stderr
+- ``file``: one JSON span per line appended to ``settings.tracing_file``
+- ``otlp``: OTLP/HTTP JSON batches posted to ``settings.tracing_otlp_endpoint``
+- ``package.module:Class``: any class with ``export(spans)`` and ``shutdown()``
+
+Finished spans are exported in batches from a background thread, so the
+request path only appends to a queue. Sampling is decided once per trace:
+requests arriving with a ``traceparent`` follow the caller's decision, other
+traces are kept with probability ``settings.tracing_sample_rate``.
+"""
+import functools
+import importlib
+import json
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Protocol
+
+import fastapi.routing
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+
+    Attributes:
+        name: Operation name
+        trace_id: 32 hex digits shared by all spans of a trace
+        span_id: 16 hex digits identifying this span
+        parent_id: span_id of the parent span, if any
+        kind: "server", "client" or "internal"
+        recording: False for spans of unsampled traces, which are never exported
+        attributes: Key/value metadata
+        status: "unset", "ok" or "error"
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    recording: bool = True
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "unset"
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute (ignored when not recording)."""
+        if self.recording:
+            self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (0 while the span is open)."""
+        return ((self.end_ns or self.start_ns) - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.recording else '00'}"
+
+    def to_otlp(self) -> dict:
+        """Render the span in the OTLP/JSON format."""
+        def value(raw):
+            if isinstance(raw, bool):
+                return {"boolValue": raw}
+            if isinstance(raw, int):
+                return {"intValue": str(raw)}
+            if isinstance(raw, float):
+                return {"doubleValue": raw}
+            return {"stringValue": str(raw)}
+
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": key, "value": value(raw)} for key, raw in self.attributes.items()],
+            "status": {"code": {"unset": 0, "ok": 1, "error": 2}[self.status]},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Exporter(Protocol):
+    """Destination for finished spans."""
+
+    def export(self, spans: list[Span]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class ConsoleExporter:
+    """Writes one OTLP/JSON span per line to a stream (stderr by default)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+
+    def export(self, spans: list[Span]) -> None:
+        self.stream.write("".join(json.dumps(span.to_otlp()) + "\n" for span in spans))
+        self.stream.flush()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Appends one OTLP/JSON span per line to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock, open(self.path, "a") as output:
+            output.write("".join(json.dumps(span.to_otlp()) + "\n" for span in spans))
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OTLPHttpExporter:
+    """Posts spans to an OpenTelemetry collector's OTLP/HTTP JSON endpoint."""
+
+    def __init__(self, endpoint: str, service_name: str = "taskforge", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: list[Span]) -> None:
+        body = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+        try:
+            self.client.post(self.endpoint, json=body)
+        except httpx.HTTPError:
+            pass  # Tracing must never break the application
+
+    def shutdown(self) -> None:
+        self.client.close()
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list (for tests)."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchProcessor:
+    """
+    Exports finished spans from a background thread in batches.
+
+    Attributes:
+        exporter: Destination of the batches
+        max_batch: Largest batch handed to the exporter
+        interval: Seconds between flushes of partial batches
+        max_queue: Spans beyond this many waiting are dropped
+    """
+
+    def __init__(self, exporter: Exporter, max_batch: int = 512, interval: float = 1.0, max_queue: int = 10000):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            pass
+
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self.exporter.export(batch)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._drain()
+
+    def flush(self) -> None:
+        """Export every queued span now."""
+        self._drain()
+
+    def shutdown(self) -> None:
+        """Stop the background thread, export what is queued and close the exporter."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._drain()
+        self.exporter.shutdown()
+
+
+class SimpleProcessor:
+    """Exports each span as soon as it ends."""
+
+    def __init__(self, exporter: Exporter):
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span of the current request, if any."""
+    return _current.get()
+
+
+class Tracer:
+    """
+    Creates spans and hands finished ones to a processor.
+
+    Attributes:
+        processor: Batch or simple processor, or None when tracing is disabled
+        sample_rate: Fraction of new traces that are recorded
+    """
+
+    def __init__(self, processor=None, sample_rate: float = 1.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def should_sample(self, trace_id: str) -> bool:
+        """Sample by trace ID, so every service sampling at the same rate keeps the same traces."""
+        return int(trace_id[16:], 16) < self.sample_rate * 2 ** 64
+
+    def start_trace(self, name: str, traceparent: Optional[str] = None, kind: str = "server") -> Span:
+        """
+        Start the root span of a request, continuing the caller's trace if any.
+
+        Args:
+            name: Span name
+            traceparent: Incoming W3C traceparent header
+            kind: Span kind
+
+        Returns:
+            Span: The new span (not yet made current)
+        """
+        match = TRACEPARENT.match(traceparent or "")
+        if match and match.group(1) != "0" * 32:
+            trace_id, parent_id, flags = match.groups()
+            recording = bool(int(flags, 16) & 1)
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            recording = self.should_sample(trace_id)
+        return Span(name, trace_id, secrets.token_hex(8), parent_id, kind, recording)
+
+    def start_span(self, name: str, kind: str = "internal", attributes: Optional[dict] = None) -> Optional[Span]:
+        """
+        Start a child of the current span.
+
+        Returns:
+            Optional[Span]: The new span, or None outside a recorded trace
+        """
+        parent = _current.get()
+        if parent is None or not parent.recording:
+            return None
+        return Span(name, parent.trace_id, secrets.token_hex(8), parent.span_id, kind,
+                    attributes=dict(attributes or {}))
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        """Finish a span and export it if recorded."""
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.status = "error"
+            span.attributes["exception.type"] = type(error).__name__
+        if span.recording and self.processor is not None:
+            self.processor.on_end(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[dict] = None) -> Iterator[Optional[Span]]:
+        """
+        Context manager timing a block as a child of the current span.
+
+        Yields:
+            Optional[Span]: The span, or None outside a recorded trace
+        """
+        span = self.start_span(name, kind, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            self.end_span(span, exc)
+            raise
+        finally:
+            _current.reset(token)
+        self.end_span(span)
+
+
+tracer = Tracer()
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording each call of a function as a span.
+
+    Args:
+        name: Span name (defaults to the function name)
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with tracer.span(span_name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = tracer.start_span(f"SQL {statement.split(None, 1)[0].upper()}" if statement.strip() else "SQL", "client",
+                             {"db.system": conn.dialect.name, "db.statement": statement})
+    conn.info.setdefault("tracing_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = conn.info["tracing_spans"].pop()
+    if span is not None:
+        tracer.end_span(span)
+
+
+def _handle_error(exception_context):
+    spans = exception_context.connection.info.get("tracing_spans") if exception_context.connection else None
+    if spans:
+        span = spans.pop()
+        if span is not None:
+            tracer.end_span(span, exception_context.original_exception)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record a client span for every SQL statement executed on an engine (idempotent).
+
+    Args:
+        engine: Engine to instrument
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+_serialize_response = fastapi.routing.serialize_response
+
+
+async def _traced_serialize_response(*args, **kwargs):
+    with tracer.span("serialize_response"):
+        return await _serialize_response(*args, **kwargs)
+
+
+def instrument_serialization() -> None:
+    """
+    Record response-model validation and serialization as a span.
+
+    FastAPI's request handler looks ``serialize_response`` up in
+    ``fastapi.routing`` on every call; it is replaced with a traced wrapper.
+    Endpoints that build their own Response (e.g. sparse fieldsets) serialize
+    inside the endpoint and are not covered.
+    """
+    fastapi.routing.serialize_response = _traced_serialize_response
+
+
+def make_exporter(name: str, file_path: str = "traces.jsonl", otlp_endpoint: str = "",
+                  service_name: str = "taskforge") -> Optional[Exporter]:
+    """
+    Build an exporter from its configured name.
+
+    Args:
+        name: "none", "console", "file", "otlp" or "package.module:Class"
+        file_path: Output file of the "file" exporter
+        otlp_endpoint: Collector URL of the "otlp" exporter
+        service_name: service.name reported to the collector
+
+    Returns:
+        Optional[Exporter]: The exporter, or None when tracing is disabled
+
+    Raises:
+        ValueError: If the name is not recognised
+    """
+    if name == "none":
+        return None
+    if name == "console":
+        return ConsoleExporter()
+    if name == "file":
+        return FileExporter(file_path)
+    if name == "otlp":
+        return OTLPHttpExporter(otlp_endpoint, service_name)
+    module, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError(f"Unknown tracing exporter: {name}")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+def configure(exporter: Optional[Exporter], sample_rate: float = 1.0, batch: bool = True) -> Tracer:
+    """
+    Configure the global tracer.
+
+    Args:
+        exporter: Where spans go (None disables tracing)
+        sample_rate: Fraction of new traces recorded
+        batch: Export from a background thread (False exports synchronously)
+
+    Returns:
+        Tracer: The global tracer
+    """
+    if tracer.processor is not None:
+        tracer.processor.shutdown()
+    tracer.processor = None if exporter is None else (BatchProcessor(exporter) if batch else SimpleProcessor(exporter))
+    tracer.sample_rate = sample_rate
+    return tracer
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware creating the server span of each request.
+
+    The span is named after the matched route template (e.g.
+    ``GET /tasks/{task_id}``) and its ID is returned in the ``traceparent``
+    response header.
+
+    Attributes:
+        app: Wrapped ASGI application
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        span = tracer.start_trace(f"{scope['method']} {scope['path']}",
+                                  Headers(scope=scope).get("traceparent"))
+        span.set_attribute("http.request.method", scope["method"])
+        span.set_attribute("url.path", scope["path"])
+        span.set_attribute("process.pid", os.getpid())
+        token = _current.set(span)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "error"
+                MutableHeaders(scope=message)["traceparent"] = span.traceparent
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+            tracer.end_span(span, error)
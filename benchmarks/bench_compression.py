@@ -0,0 +1,81 @@
+"""
+Benchmark response compression for typical task listings.
+
+Builds a list of TaskResponse payloads shaped like a real project listing,
+serializes it the way the API does, and reports bytes on the wire, ratio and
+CPU time for each available encoding and level, for both the object and the
+columnar list formats.
+
+Usage:
+    python -m benchmarks.bench_compression [--tasks 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.compression import StreamCompressor, available_encodings
+from app.schemas.task import TaskPriority, TaskResponse, TaskStatus
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 9, 11), "zstd": (1, 3, 9, 19)}
+WORDS = "api backend bug client deploy design docs fix index login migrate query review test ui update".split()
+
+
+def build_payload(count: int, seed: int = 42) -> list[dict]:
+    """Build ``count`` serialized TaskResponse objects with realistic variety."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    tasks = []
+    for task_id in range(1, count + 1):
+        created = start + timedelta(minutes=rng.randrange(500_000))
+        task = TaskResponse(
+            id=task_id,
+            name=" ".join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            description=" ".join(rng.choices(WORDS, k=rng.randint(0, 40))) or None,
+            status=rng.choice(list(TaskStatus)),
+            priority=rng.choice(list(TaskPriority)),
+            due_date=created + timedelta(days=rng.randint(1, 60)) if rng.random() < 0.7 else None,
+            assignee_id=rng.choice([None, *range(1, 50)]),
+            project_id=1,
+            created_at=created,
+            updated_at=created + timedelta(minutes=rng.randrange(10_000)),
+        )
+        tasks.append(task.model_dump(mode="json"))
+    return tasks
+
+
+def columnar(tasks: list[dict]) -> dict:
+    return {name: [task[name] for task in tasks] for name in tasks[0]} if tasks else {}
+
+
+def measure(body: bytes, encoding: str, level: int, repeat: int) -> tuple[int, float]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(StreamCompressor(encoding, level).finish(body))
+        best = min(best, time.perf_counter() - started)
+    return size, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tasks = build_payload(args.tasks)
+    for layout, document in (("objects", tasks), ("columnar", columnar(tasks))):
+        body = json.dumps(document, separators=(",", ":")).encode()
+        print(f"\n{args.tasks} tasks, {layout} layout: {len(body):,} bytes uncompressed")
+        print(f"{'encoding':<8} {'level':>5} {'bytes':>12} {'ratio':>7} {'ms':>9} {'MB/s':>8}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                size, seconds = measure(body, encoding, level, args.repeat)
+                print(f"{encoding:<8} {level:>5} {size:>12,} {len(body) / size:>7.1f} {seconds * 1000:>9.1f} "
+                      f"{len(body) / seconds / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
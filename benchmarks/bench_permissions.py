@@ -0,0 +1,165 @@
+"""
+Benchmark project permission checks as memberships grow.
+
+Gives one user memberships in an increasing number of projects, each shared
+with a few other users, and times checking the user's role in a random
+project three ways: joining project_members into the project lookup on
+every check, loading the project after a lookup in the cached membership
+map (what the endpoints do), and the cached lookup alone. The cached map is
+loaded once per user, so its overhead should stay flat while the table
+grows.
+
+It then times listing all of the user's projects (``member_projects``), with
+the cached project IDs bound inline and with the subquery of the membership
+table used above ``settings.membership_inline_ids``. Inline IDs grow the
+statement with the map; the subquery catches up at about a thousand
+projects and wins beyond, and is not subject to the database's limit on
+bound parameters.
+
+Without --database-url the benchmark runs on a temporary SQLite file; a
+given database must be empty (see benchmarks/database.py).
+
+Usage:
+    python -m benchmarks.bench_permissions [--checks 5000] [--listings 50] [--sizes 10,100,1000,10000]
+        [--database-url ...]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.dependencies import member_project, member_projects
+from app.models.member import ProjectMember
+from app.models.project import Project
+from app.models.task import Task  # noqa: F401  (resolves Project.tasks)
+from app.models.user import User
+from app.permissions import ROLE_RANK, memberships
+from app.profiling import query_budget
+from app.schemas.member import ProjectRole
+from benchmarks.database import open_database
+
+# Other members of every project, so the table grows faster than the user's map
+OTHER_MEMBERS = 4
+
+EDITOR_ROLES = [role.value for role, rank in ROLE_RANK.items() if rank >= ROLE_RANK[ProjectRole.EDITOR]]
+
+
+def join_check(db: Session, user: User, project_id: int) -> bool:
+    return db.query(Project).join(ProjectMember, ProjectMember.project_id == Project.id).filter(
+        Project.id == project_id, Project.deleted_at.is_(None), ProjectMember.user_id == user.id,
+        ProjectMember.role.in_(EDITOR_ROLES)).first() is not None
+
+
+def cached_check(db: Session, user: User, project_id: int) -> bool:
+    return member_project(db, user, project_id, ProjectRole.EDITOR).first() is not None
+
+
+def cached_lookup(db: Session, user: User, project_id: int) -> bool:
+    return memberships.allows(db, user, project_id, ProjectRole.EDITOR)
+
+
+STRATEGIES = [
+    ("join per check", join_check),
+    ("cached map + project", cached_check),
+    ("cached map only", cached_lookup),
+]
+
+# Values of settings.membership_inline_ids forcing each way of listing
+LISTINGS = [
+    ("inline project IDs", 10 ** 9),
+    ("membership subquery", 0),
+]
+
+
+def populate(engine, size: int) -> tuple[int, list[int]]:
+    """Create a user who edits ``size`` projects, each with other members; return the user and project IDs."""
+    with Session(engine) as db:
+        users = [User(email=f"user{size}-{i}@example.com", hashed_password="x") for i in range(OTHER_MEMBERS + 1)]
+        db.add_all(users)
+        db.flush()
+        owner = users[0]
+        project_ids = list(db.scalars(insert(Project).returning(Project.id),
+                                      [{"title": f"project {i}", "description": "d", "owner_id": owner.id}
+                                       for i in range(size)]))
+        rows = [{"project_id": project_id, "user_id": user.id,
+                 "role": ProjectRole.EDITOR.value if user is owner else ProjectRole.VIEWER.value}
+                for project_id in project_ids for user in users]
+        db.execute(insert(ProjectMember), rows)
+        db.commit()
+        return owner.id, project_ids
+
+
+def run(engine, user_id: int, project_ids: list[int], check, checks: int) -> tuple[float, float, float]:
+    memberships.clear()
+    rng = random.Random(0)
+    latencies = []
+    with Session(engine) as db:
+        user = db.get(User, user_id)
+        with query_budget(10 ** 9, engine) as profile:
+            for _ in range(checks):
+                project_id = rng.choice(project_ids)
+                started = time.perf_counter()
+                assert check(db, user, project_id)
+                latencies.append(time.perf_counter() - started)
+    return len(profile) / checks, statistics.median(latencies), statistics.mean(latencies)
+
+
+def run_listing(engine, user_id: int, size: int, inline_ids: int, listings: int) -> tuple[float, float]:
+    memberships.clear()
+    default, settings.membership_inline_ids = settings.membership_inline_ids, inline_ids
+    latencies = []
+    try:
+        with Session(engine) as db:
+            user = db.get(User, user_id)
+            memberships.roles(db, user)
+            for _ in range(listings):
+                started = time.perf_counter()
+                assert len(member_projects(db, user).all()) == size
+                latencies.append(time.perf_counter() - started)
+    finally:
+        settings.membership_inline_ids = default
+    return statistics.median(latencies), statistics.mean(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--listings", type=int, default=50)
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    engine = open_database(args.database_url, "bench-permissions-")
+
+    print(f"{args.checks} checks per strategy on {engine.dialect.name}, {OTHER_MEMBERS} other members per project")
+    print(f"{'projects':>8} {'member rows':>11} {'strategy':<22} {'stmts/check':>11} {'p50 us':>9} {'mean us':>9}")
+    rows = 0
+    users = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        user_id, project_ids = populate(engine, size)
+        users.append((size, user_id))
+        # Earlier sizes stay in the table, as other tenants would
+        rows += size * (OTHER_MEMBERS + 1)
+        for name, check in STRATEGIES:
+            statements, p50, mean = run(engine, user_id, project_ids, check, args.checks)
+            print(f"{size:>8} {rows:>11} {name:<22} {statements:>11.2f} {p50 * 1e6:>9.0f} {mean * 1e6:>9.0f}")
+
+    print(f"\n{args.listings} listings of all the user's projects per strategy, {rows} member rows")
+    print(f"{'projects':>8} {'strategy':<22} {'p50 ms':>9} {'mean ms':>9}")
+    for size, user_id in users:
+        for name, inline_ids in LISTINGS:
+            try:
+                p50, mean = run_listing(engine, user_id, size, inline_ids, args.listings)
+            except Exception as error:
+                print(f"{size:>8} {name:<22} failed: {type(error).__name__}")
+                continue
+            print(f"{size:>8} {name:<22} {p50 * 1e3:>9.2f} {mean * 1e3:>9.2f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
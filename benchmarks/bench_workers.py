@@ -0,0 +1,127 @@
+"""
+Benchmark request throughput of the production server across worker counts.
+
+Seeds a temporary SQLite database with one project of tasks, then for each
+worker count starts ``gunicorn -c python:app.serving`` on it, drives the
+task listing endpoint from a pool of client threads for a fixed time, and
+reports requests per second and latency percentiles. Throughput should grow
+with the worker count up to the number of CPU cores.
+
+Usage:
+    python -m benchmarks.bench_workers [--workers 1,2,4] [--clients 16] [--seconds 10] [--tasks 500]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.auth import get_password_hash
+from app.database import Base, make_engine
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench"
+
+
+def seed(url: str, tasks: int) -> int:
+    """Create the schema, a user and a project with ``tasks`` tasks; return the project ID."""
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(email=EMAIL, hashed_password=get_password_hash(PASSWORD))
+        session.add(user)
+        session.flush()
+        project = Project(title="Bench", description="Benchmark project", owner_id=user.id)
+        session.add(project)
+        session.flush()
+        session.execute(insert(Task), [{"name": f"Task {i}", "description": "x" * 80, "project_id": project.id}
+                                       for i in range(tasks)])
+        session.commit()
+        project_id = project.id
+    engine.dispose()
+    return project_id
+
+
+def start_server(url: str, workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": url, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "python:app.serving"], env=env,
+                              cwd=Path(__file__).resolve().parent.parent, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+def drive(base_url: str, path: str, headers: dict, clients: int, seconds: float) -> list[float]:
+    """Send requests from ``clients`` threads for ``seconds``; return the latencies."""
+    latencies: list[float] = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def client() -> None:
+        local = []
+        with httpx.Client(base_url=base_url, headers=headers) as http:
+            while time.monotonic() < stop_at:
+                started = time.perf_counter()
+                http.get(path).raise_for_status()
+                local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)))
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{Path(directory) / 'bench.db'}"
+        project_id = seed(url, args.tasks)
+        path = f"/projects/{project_id}/tasks/?limit=50"
+        print(f"{os.cpu_count()} CPU cores, {args.clients} clients, GET {path}")
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for workers in (int(n) for n in args.workers.split(",")):
+            server = start_server(url, workers, args.port)
+            try:
+                base_url = f"http://127.0.0.1:{args.port}"
+                token = httpx.post(f"{base_url}/auth/login",
+                                   data={"username": EMAIL, "password": PASSWORD}).json()["access_token"]
+                latencies = drive(base_url, path, {"Authorization": f"Bearer {token}"}, args.clients, args.seconds)
+            finally:
+                server.terminate()
+                server.wait()
+            percentiles = statistics.quantiles(latencies, n=100)
+            print(f"{workers:>7} {len(latencies) / args.seconds:>9.0f} {percentiles[49] * 1000:>8.1f} "
+                  f"{percentiles[98] * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark write round trips: commit-then-refresh versus RETURNING.
+
+Creates and updates tasks through the ORM the way the endpoints used to
+(load, modify, commit, then refresh with a SELECT) and the way they do now
+(one INSERT/UPDATE ... RETURNING, then commit), and reports the statements
+and the latency per write. The default SQLite file shows the statement
+savings; point --database-url at an empty PostgreSQL database to include
+network round trips (see benchmarks/database.py).
+
+Usage:
+    python -m benchmarks.bench_writes [--writes 2000] [--database-url postgresql://...]
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.profiling import query_budget
+from benchmarks.database import open_database
+
+
+# Each write returns the server-generated timestamp a response would include
+def refresh_create(db: Session, project_id: int, i: int) -> datetime:
+    task = Task(name=f"task {i}", project_id=project_id)
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task.created_at
+
+
+def returning_create(db: Session, project_id: int, i: int) -> datetime:
+    task = Task(name=f"task {i}", project_id=project_id)
+    db.add(task)
+    db.flush()
+    created_at = task.created_at
+    db.commit()
+    return created_at
+
+
+def refresh_update(db: Session, project_id: int, i: int) -> datetime:
+    task = db.query(Task).filter(Task.id == i).first()
+    db.query(Project).filter(Project.id == task.project_id).first()
+    task.name = f"renamed {i}"
+    db.commit()
+    db.refresh(task)
+    return task.updated_at
+
+
+def returning_update(db: Session, project_id: int, i: int) -> datetime:
+    owned = db.query(Project.id).filter(Project.id == project_id)
+    statement = update(Task).where(Task.id == i, Task.project_id.in_(owned.scalar_subquery())).values(
+        name=f"renamed {i}", version=Task.version + 1).returning(Task)
+    task = db.scalars(statement, execution_options={"synchronize_session": False}).first()
+    updated_at = task.updated_at
+    db.commit()
+    return updated_at
+
+
+STRATEGIES = [
+    ("create", "commit + refresh", refresh_create),
+    ("create", "RETURNING", returning_create),
+    ("update", "load + commit + refresh", refresh_update),
+    ("update", "UPDATE ... RETURNING", returning_update),
+]
+
+
+def run(engine, project_id: int, write, writes: int, first_id: int) -> tuple[float, float, float]:
+    latencies = []
+    with query_budget(10 ** 9, engine) as profile:
+        with Session(engine) as db:
+            for i in range(first_id, first_id + writes):
+                started = time.perf_counter()
+                write(db, project_id, i)
+                latencies.append(time.perf_counter() - started)
+    return len(profile) / writes, statistics.median(latencies), statistics.mean(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    engine = open_database(args.database_url, "bench-writes-")
+    with Session(engine) as db:
+        user = User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        project = Project(title="bench", description="d", owner_id=user.id)
+        db.add(project)
+        db.commit()
+        project_id = project.id
+
+    print(f"{args.writes} writes per strategy on {engine.dialect.name}")
+    print(f"{'write':<7} {'strategy':<24} {'stmts/write':>11} {'p50 us':>9} {'mean us':>9}")
+    # Creates run first so the update strategies each rewrite tasks that exist
+    for index, (kind, name, write) in enumerate(STRATEGIES):
+        first_id = 1 + (index % 2) * args.writes
+        statements, p50, mean = run(engine, project_id, write, args.writes, first_id)
+        print(f"{kind:<7} {name:<24} {statements:>11.1f} {p50 * 1e6:>9.0f} {mean * 1e6:>9.0f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Databases the benchmarks run against.
+
+By default each run gets a throwaway SQLite file. A ``--database-url`` is
+only accepted if it holds none of the application's tables: benchmarks
+create the schema and fill it, and must never drop or mix with real data.
+Point it at an empty database created for the run.
+"""
+import os
+import tempfile
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.database import Base, make_engine
+
+
+def open_database(database_url: Optional[str], prefix: str) -> Engine:
+    """
+    Open the database of a benchmark run and create the schema in it.
+
+    Args:
+        database_url: Database given on the command line (None for a temporary SQLite file)
+        prefix: Prefix of the temporary directory
+
+    Returns:
+        Engine: Engine with the application's tables created
+
+    Raises:
+        SystemExit: If the database already has any of the application's tables
+    """
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix=prefix), 'bench.db')}"
+    engine = make_engine(database_url)
+    existing = set(inspect(engine).get_table_names()) & set(Base.metadata.tables)
+    if existing:
+        engine.dispose()
+        raise SystemExit(f"Refusing to run on {engine.url!r}: it already has tables "
+                         f"({', '.join(sorted(existing))}). Use an empty database.")
+    Base.metadata.create_all(engine)
+    return engine
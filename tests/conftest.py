@@ -1,3 +1,6 @@
+from dataclasses import replace
+from datetime import datetime
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, StaticPool
@@ -5,6 +8,10 @@ from sqlalchemy.orm import sessionmaker
 
 from app.database import Base, get_db
 from app.main import TaskForge
+from app.permissions import memberships
+from app.replicas import get_read_db
+from app.saved_views import view_cache
+from app.seed import PROFILES, seed
 
 engine = create_engine(
     "sqlite:///",
@@ -18,6 +25,9 @@ Base.metadata.create_all(bind=engine)
 @pytest.fixture(scope="function")
 def db():
     Base.metadata.create_all(bind=engine)
+    # User and view IDs restart with every test database
+    memberships.clear()
+    view_cache.clear()
     db = TestSessionLocal()
     try:
         yield db
@@ -36,6 +46,7 @@ def client(db):
             pass
 
     TaskForge.dependency_overrides[get_db] = override_get_db
+    TaskForge.dependency_overrides[get_read_db] = override_get_db
     yield TestClient(TaskForge)
     TaskForge.dependency_overrides.clear()
 
@@ -48,3 +59,39 @@ def auth_headers(client):
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
 
+
+@pytest.fixture(scope="function")
+def create_project(client, auth_headers):
+    # create_project() adds a project owned by the test user and returns its ID
+    def create(title="Test"):
+        response = client.post("/projects/", json={"title": title, "description": "A test project"},
+                               headers=auth_headers)
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def create_task(client, auth_headers):
+    # create_task(project_id, "name", due_date=datetime(...), parent_id=...) adds a task and returns its ID
+    def create(project_id, name="Task", priority=None, **fields):
+        fields = {key: value.isoformat() if isinstance(value, datetime) else value for key, value in fields.items()}
+        response = client.post(f"/projects/{project_id}/tasks/", json={"name": name, **fields}, headers=auth_headers)
+        assert response.status_code == 200
+        task_id = response.json()["id"]
+        if priority is not None:
+            # Task creation does not take the priority, so it is set by an update
+            client.put(f"/tasks/{task_id}", json={"priority": priority}, headers=auth_headers)
+        return task_id
+
+    return create
+
+
+@pytest.fixture(scope="function")
+def seed_data(db):
+    # seed_data("skewed", tasks=50_000) bulk-loads a named SeedProfile, with overrides
+    def generate(profile="small", **overrides):
+        return seed(db.get_bind(), replace(PROFILES[profile], **overrides))
+
+    return generate
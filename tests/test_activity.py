@@ -0,0 +1,127 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.activity import activity_log, compact, purge
+from app.models.activity import ActivityEntry
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    activity_log.drain()
+    yield
+    activity_log.drain()
+
+
+def feed(client, auth_headers, url, **params):
+    response = client.get(url, params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return response
+
+
+def test_changes_are_logged_after_commit(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id)
+    client.put(f"/tasks/{task_id}", json={"status": "done", "priority": "high"}, headers=auth_headers)
+
+    assert db.query(ActivityEntry).count() == 0
+    assert len(activity_log) == 3
+    assert activity_log.flush(db.get_bind()) == 3
+    assert len(activity_log) == 0
+
+    entries = feed(client, auth_headers, f"/tasks/{task_id}/activity/").json()
+    assert [entry["action"] for entry in entries] == ["updated", "created"]
+    assert entries[0]["changes"] == {"status": "done", "priority": "high"}
+    assert entries[1]["changes"]["name"] == "Task"
+    assert entries[1]["project_id"] == project_id
+
+
+def test_failed_requests_are_not_logged(client, auth_headers, create_project, db):
+    project_id = create_project()
+    activity_log.drain()
+
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "Child", "parent_id": 999999},
+                           headers=auth_headers)
+    assert response.status_code >= 400
+    assert len(activity_log) == 0
+
+
+def test_project_feed_is_newest_first_and_paginated(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    first = create_task(project_id, "first")
+    second = create_task(project_id, "second")
+    client.post(f"/tasks/{second}/move", json={"parent_id": first}, headers=auth_headers)
+    client.delete(f"/tasks/{first}", headers=auth_headers)
+    activity_log.flush(db.get_bind())
+
+    response = feed(client, auth_headers, f"/projects/{project_id}/activity/", limit=2)
+    page = response.json()
+    assert [(entry["task_id"], entry["action"]) for entry in page] == [(first, "deleted"), (second, "moved")]
+    assert page[0]["changes"] == {"tasks_deleted": 2}
+    rest = feed(client, auth_headers, f"/projects/{project_id}/activity/",
+                cursor=response.headers["X-Next-Cursor"]).json()
+    assert [(entry["task_id"], entry["action"]) for entry in rest] == [
+        (second, "created"), (first, "created"), (None, "created")]
+
+    # The feed of a deleted task is still readable
+    assert len(feed(client, auth_headers, f"/tasks/{first}/activity/").json()) == 2
+
+
+def test_feeds_require_ownership(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id)
+    activity_log.flush(db.get_bind())
+
+    client.post("/auth/register", json={"email": "other", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "other", "password": "pass"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+    assert client.get(f"/projects/{project_id}/activity/", headers=other_headers).status_code == 403
+    assert client.get(f"/tasks/{task_id}/activity/", headers=other_headers).status_code == 403
+    assert client.get("/tasks/999999/activity/", headers=auth_headers).status_code == 404
+
+
+def test_compact_merges_old_updates(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id)
+    client.put(f"/tasks/{task_id}", json={"status": "in_progress"}, headers=auth_headers)
+    client.put(f"/tasks/{task_id}", json={"priority": "low"}, headers=auth_headers)
+    client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+    activity_log.flush(db.get_bind())
+
+    assert compact(db, datetime.utcnow() + timedelta(seconds=1), batch_size=1) == 2
+    entries = feed(client, auth_headers, f"/tasks/{task_id}/activity/").json()
+    assert [entry["action"] for entry in entries] == ["updated", "created"]
+    assert entries[0]["changes"] == {"status": "done", "priority": "low"}
+    assert compact(db, datetime.utcnow() + timedelta(seconds=1)) == 0
+
+
+def test_task_changes_are_ordered_by_version(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id)
+    activity_log.flush(db.get_bind())
+    client.put(f"/tasks/{task_id}", json={"status": "in_progress"}, headers=auth_headers)
+    client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+
+    # Two workers flushing in the opposite order to the changes
+    db.execute(insert(ActivityEntry), list(reversed(activity_log.drain())))
+    db.commit()
+    entries = feed(client, auth_headers, f"/tasks/{task_id}/activity/").json()
+    assert [(entry["task_version"], entry["changes"]) for entry in entries] == [
+        (3, {"status": "done"}), (2, {"status": "in_progress"}), (1, {"name": "Task", "status": "todo",
+                                                                      "priority": "medium"})]
+    assert entries[0]["id"] < entries[1]["id"]
+
+    assert compact(db, datetime.utcnow() + timedelta(seconds=1)) == 1
+    entries = feed(client, auth_headers, f"/tasks/{task_id}/activity/").json()
+    assert [(entry["task_version"], entry["changes"]) for entry in entries][0] == (3, {"status": "done"})
+
+
+def test_purge_deletes_old_entries(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    create_task(project_id)
+    activity_log.flush(db.get_bind())
+
+    assert purge(db, datetime.utcnow() - timedelta(days=1)) == 0
+    assert purge(db, datetime.utcnow() + timedelta(seconds=1), batch_size=1) == 2
+    assert db.query(ActivityEntry).count() == 0
@@ -1,3 +1,10 @@
+from datetime import datetime, timedelta
+
+from app.models.token import RevokedToken
+from app.profiling import query_budget
+from app.revocation import RevocationList
+
+
 def test_auth_new_user(client):
     # Test registration
     response = client.post("/auth/register", json={"email": "newuser", "password": "newpass"})
@@ -21,4 +28,89 @@ def test_auth_access_protected_route(client, auth_headers):
 def test_auth_access_protected_route_no_token(client):
     # Test access to a protected route without token
     response = client.get("/projects/")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+def login(client, email="testuser", password="testpass"):
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_rotates_tokens(client, auth_headers):
+    tokens = login(client)
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    assert client.get("/projects/", headers={"Authorization": f"Bearer {refreshed['access_token']}"}).status_code == 200
+
+    # The rotated token is good for the next refresh
+    response = client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == 200
+
+
+def test_refresh_does_not_hash_passwords(client, auth_headers, monkeypatch):
+    tokens = login(client)
+
+    def fail(*args):
+        raise AssertionError("bcrypt used")
+    monkeypatch.setattr("app.auth.pwd_context.verify", fail)
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+
+
+def test_refresh_token_reuse_revokes_all_refresh_tokens(client, auth_headers):
+    tokens = login(client)
+    refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+
+    response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+    response = client.post("/auth/refresh", json={"refresh_token": refreshed["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_refresh_invalid_token(client):
+    response = client.post("/auth/refresh", json={"refresh_token": "not-a-token"})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_tokens(client, auth_headers):
+    tokens = login(client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    response = client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+    response = client.get("/projects/", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+    # Other sessions are unaffected
+    assert client.get("/projects/", headers=auth_headers).status_code == 200
+
+
+def test_revocation_check_does_not_query_database(client, auth_headers, db):
+    client.post("/auth/logout", headers={"Authorization": f"Bearer {login(client)['access_token']}"})
+    # Loads the user's membership map
+    client.get("/projects/", headers=auth_headers)
+
+    # Only the user lookup and the listing itself
+    with query_budget(2, db.get_bind()) as profile:
+        client.get("/projects/", headers=auth_headers)
+    assert not any("revoked_tokens" in record.statement for record in profile.records)
+
+
+def test_revocations_sync_between_workers(db):
+    now = datetime.utcnow()
+    db.add_all([RevokedToken(jti="live", expires_at=now + timedelta(minutes=5)),
+                RevokedToken(jti="expired", expires_at=now - timedelta(minutes=5))])
+    db.commit()
+
+    worker = RevocationList()
+    assert worker.sync(db.get_bind()) == 1
+    assert "live" in worker and "expired" not in worker
+
+    db.add(RevokedToken(jti="later", expires_at=now + timedelta(minutes=5)))
+    db.commit()
+    worker.sync(db.get_bind())
+    assert "later" in worker
@@ -0,0 +1,132 @@
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, StreamCompressor, negotiate
+
+BODY = "x" * 5000
+
+
+def make_client(**options):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(BODY)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"line {i}\n" for i in range(100)), media_type="text/plain")
+
+    @app.get("/image")
+    def image():
+        return PlainTextResponse(BODY, media_type="image/png")
+
+    return TestClient(app)
+
+
+def test_negotiate():
+    supported = ("zstd", "br", "gzip")
+    assert negotiate("gzip, deflate", supported) == "gzip"
+    assert negotiate("gzip, br, zstd", supported) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert negotiate("zstd;q=0, gzip", supported) == "gzip"
+    assert negotiate("*", ("gzip",)) == "gzip"
+    assert negotiate("identity", supported) is None
+    assert negotiate("", supported) is None
+
+
+def test_small_responses_are_not_compressed():
+    response = make_client(minimum_size=1024).get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "tiny"
+
+
+def test_large_responses_are_gzipped():
+    response = make_client(minimum_size=1024).get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(BODY)
+    assert response.text == BODY
+
+
+def test_offloaded_compression():
+    response = make_client(minimum_size=10, offload_size=100).get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+
+def test_no_accept_encoding():
+    response = make_client().get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+
+def test_incompressible_content_type():
+    response = make_client().get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_responses_are_compressed_incrementally():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"line {i}\n" for i in range(100))
+
+
+def test_stream_compressor_chunks_decode_independently():
+    compressor = StreamCompressor("gzip", 6)
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(compressor.compress(b"first chunk ")) == b"first chunk "
+    assert decoder.decompress(compressor.finish(b"last")) == b"last"
+
+
+@pytest.mark.parametrize("encoding,module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encodings(encoding, module):
+    pytest.importorskip(module)
+    client = make_client()
+    for path in ("/large", "/stream"):
+        response = client.get(path, headers={"Accept-Encoding": encoding})
+        assert response.headers["content-encoding"] == encoding
+    assert client.get("/large", headers={"Accept-Encoding": encoding}).text == BODY
+
+
+def test_task_listing_is_compressed(client, auth_headers, create_project):
+    project_id = create_project()
+    for i in range(20):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}", "description": "d" * 50},
+                    headers=auth_headers)
+
+    response = client.get(f"/projects/{project_id}/tasks/", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+def test_export_tasks_streams_ndjson(client, auth_headers, create_project):
+    project_id = create_project()
+    for i in range(5):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+
+    response = client.get(f"/projects/{project_id}/tasks/export", params={"fields": "name"},
+                          headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["content-encoding"] == "gzip"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == [f"Task {i}" for i in range(5)]
+    assert set(rows[0]) == {"id", "name"}
+
+
+def test_export_tasks_requires_access(client, auth_headers):
+    response = client.get("/projects/9999/tasks/export", headers=auth_headers)
+    assert response.status_code == 403
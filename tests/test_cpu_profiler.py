@@ -0,0 +1,89 @@
+import time
+from collections import Counter
+
+import pytest
+
+from app import cpu_profiler
+from app.config import settings
+from app.cpu_profiler import (ProfileTriggerWatcher, StackSampler, format_collapsed, parse_collapsed, render_svg)
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+@pytest.fixture
+def admin(monkeypatch, tmp_path, auth_headers):
+    monkeypatch.setattr(settings, "admin_emails", ["testuser"])
+    monkeypatch.setattr(cpu_profiler.profile_sessions, "directory", tmp_path)
+    return auth_headers
+
+
+def test_sampler_records_busy_function():
+    sampler = StackSampler(interval=0.001).start()
+    busy_loop(0.2)
+    stacks = sampler.stop()
+
+    assert sampler.samples > 10
+    assert any(stack.endswith("test_cpu_profiler.py:busy_loop") for stack in stacks)
+    assert parse_collapsed(format_collapsed(stacks)) == stacks
+
+
+def test_sampler_respects_overhead_cap():
+    sampler = StackSampler(interval=0.0001, max_overhead=0.01).start()
+    busy_loop(0.3)
+    sampler.stop()
+    assert sampler.interval > sampler.base_interval
+    assert sampler.overhead < 0.05
+
+
+def test_render_svg():
+    svg = render_svg(Counter({"main;handler;verify_password": 8, "main;handler;query": 2}))
+    assert svg.startswith("<svg")
+    assert "verify_password (8 samples, 80.0%)" in svg
+
+
+def test_profile_endpoints_require_admin(client, auth_headers):
+    assert client.post("/admin/profiles", headers=auth_headers).status_code == 403
+    assert client.get("/admin/profiles/" + "0" * 32, headers=auth_headers).status_code == 403
+
+
+def test_profile_across_workers(client, admin):
+    response = client.post("/admin/profiles", params={"seconds": 1, "interval_ms": 1}, headers=admin)
+    assert response.status_code == 202
+    location = response.headers["Location"]
+
+    # Stands in for the watcher thread every worker runs
+    watcher = ProfileTriggerWatcher(cpu_profiler.profile_sessions)
+    threads = watcher.poll()
+    assert len(threads) == 1 and watcher.poll() == []
+    assert client.get(location, headers=admin).status_code == 202
+    busy_loop(1.0)
+    threads[0].join()
+
+    response = client.get(location, headers=admin)
+    assert response.status_code == 200
+    assert "test_cpu_profiler.py:busy_loop" in response.text
+    response = client.get(location, params={"format": "svg"}, headers=admin)
+    assert response.headers["content-type"] == "image/svg+xml"
+
+
+def test_profile_not_found(client, admin):
+    assert client.get("/admin/profiles/" + "0" * 32, headers=admin).status_code == 404
+    assert client.get("/admin/profiles/../secret", headers=admin).status_code == 404
+
+
+def test_profile_header(client, admin):
+    response = client.get("/projects/", headers={**admin, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    response = client.get(f"/admin/profiles/{profile_id}", headers=admin)
+    assert response.status_code == 200
+
+    # Ignored for non-admins
+    settings.admin_emails = []
+    assert "X-Profile-Id" not in client.get("/projects/", headers={**admin, "X-Profile": "1"}).headers
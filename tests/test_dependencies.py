@@ -0,0 +1,139 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.models.dependency import TaskDependency
+from app.models.task import Task
+
+
+def block(client, auth_headers, task_id, blocked_by_id):
+    return client.post(f"/tasks/{task_id}/dependencies/", json={"blocked_by_id": blocked_by_id}, headers=auth_headers)
+
+
+def ready_ids(client, auth_headers, project_id):
+    response = client.get(f"/projects/{project_id}/tasks/ready", headers=auth_headers)
+    assert response.status_code == 200
+    return [task["id"] for task in response.json()]
+
+
+def test_add_and_list_dependencies(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    first, second = (create_task(project_id) for _ in range(2))
+
+    response = block(client, auth_headers, second, first)
+    assert response.status_code == 200
+    assert response.json()["task_id"] == second and response.json()["blocked_by_id"] == first
+    assert block(client, auth_headers, second, first).status_code == 200
+
+    response = client.get(f"/tasks/{second}/dependencies/", headers=auth_headers)
+    assert [task["id"] for task in response.json()] == [first]
+
+
+def test_cycles_are_rejected(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    a, b, c = (create_task(project_id) for _ in range(3))
+
+    assert block(client, auth_headers, a, a).status_code == 409
+    assert block(client, auth_headers, b, a).status_code == 200
+    assert block(client, auth_headers, c, b).status_code == 200
+    response = block(client, auth_headers, a, c)
+    assert response.status_code == 409
+    assert "cycle" in response.json()["detail"]
+
+
+def test_reordering_keeps_blockers_first(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    a, b, c, d = (create_task(project_id) for _ in range(4))
+
+    # Each edge points backwards in creation order, forcing a reorder
+    assert block(client, auth_headers, c, d).status_code == 200
+    assert block(client, auth_headers, b, c).status_code == 200
+    assert block(client, auth_headers, a, b).status_code == 200
+    assert block(client, auth_headers, d, a).status_code == 409
+
+    response = client.get(f"/projects/{project_id}/tasks/critical-path", params={"task_id": a}, headers=auth_headers)
+    assert [task["id"] for task in response.json()["tasks"]] == [d, c, b, a]
+
+
+def test_reordering_does_not_touch_tasks(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    first, second = (create_task(project_id) for _ in range(2))
+    edited = datetime(2024, 1, 1)
+    db.execute(update(Task).values(updated_at=edited))
+    db.commit()
+    before = {task_id: client.get(f"/tasks/{task_id}", headers=auth_headers) for task_id in (first, second)}
+
+    # Points backwards in creation order, so both tasks are reordered
+    assert block(client, auth_headers, first, second).status_code == 200
+    for task_id, response in before.items():
+        after = client.get(f"/tasks/{task_id}", headers=auth_headers)
+        assert after.json()["updated_at"] == response.json()["updated_at"] == edited.isoformat()
+        assert after.headers["ETag"] == response.headers["ETag"]
+    assert db.query(Task.topo_order).filter(Task.id == first).scalar() is not None
+
+
+def test_dependency_validation(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    task_id = create_task(project_id)
+    other_task = create_task(create_project())
+
+    assert block(client, auth_headers, task_id, other_task).status_code == 422
+    assert block(client, auth_headers, task_id, 999).status_code == 422
+    assert block(client, auth_headers, 999, task_id).status_code == 404
+    assert block(client, auth_headers, task_id, task_id).status_code == 409
+
+
+def test_remove_dependency(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    first, second = (create_task(project_id) for _ in range(2))
+    block(client, auth_headers, second, first)
+
+    assert client.delete(f"/tasks/{second}/dependencies/{first}", headers=auth_headers).status_code == 200
+    assert client.delete(f"/tasks/{second}/dependencies/{first}", headers=auth_headers).status_code == 404
+    assert block(client, auth_headers, first, second).status_code == 200
+
+
+def test_ready_tasks(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    first, second, third = (create_task(project_id) for _ in range(3))
+    block(client, auth_headers, second, first)
+    block(client, auth_headers, third, second)
+    assert ready_ids(client, auth_headers, project_id) == [first]
+
+    client.put(f"/tasks/{first}", json={"status": "done"}, headers=auth_headers)
+    assert ready_ids(client, auth_headers, project_id) == [second]
+
+    client.put(f"/tasks/{second}", json={"status": "in_progress"}, headers=auth_headers)
+    assert ready_ids(client, auth_headers, project_id) == []
+
+
+def test_critical_path_defaults_to_earliest_due_date(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    design = create_task(project_id, "design")
+    build = create_task(project_id, "build")
+    docs = create_task(project_id, "docs")
+    release = create_task(project_id, "release", due_date="2030-01-01T00:00:00")
+    create_task(project_id, "later", due_date="2031-01-01T00:00:00")
+    block(client, auth_headers, build, design)
+    block(client, auth_headers, release, build)
+    block(client, auth_headers, release, docs)
+
+    response = client.get(f"/projects/{project_id}/tasks/critical-path", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["target_id"] == release
+    assert [task["name"] for task in response.json()["tasks"]] == ["design", "build", "release"]
+
+    client.put(f"/tasks/{design}", json={"status": "done"}, headers=auth_headers)
+    response = client.get(f"/projects/{project_id}/tasks/critical-path", headers=auth_headers)
+    assert len(response.json()["tasks"]) == 2
+
+
+def test_deleting_task_removes_its_edges(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    first, second, third = (create_task(project_id) for _ in range(3))
+    block(client, auth_headers, second, first)
+    block(client, auth_headers, third, second)
+
+    assert client.delete(f"/tasks/{second}", headers=auth_headers).status_code == 200
+    assert db.query(TaskDependency).count() == 0
+    assert ready_ids(client, auth_headers, project_id) == [first, third]
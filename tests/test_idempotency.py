@@ -0,0 +1,118 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.idempotency import REPLAYED_HEADER, fingerprint, purge_expired
+from app.models.idempotency import IdempotencyKey
+from app.models.task import Task
+from app.models.user import User
+
+
+def test_retry_replays_stored_response(client, auth_headers, create_project, db):
+    project_id = create_project()
+    headers = {**auth_headers, "Idempotency-Key": "create-1"}
+
+    first = client.post(f"/projects/{project_id}/tasks/", json={"name": "Once"}, headers=headers)
+    retry = client.post(f"/projects/{project_id}/tasks/", json={"name": "Once"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert REPLAYED_HEADER not in first.headers
+    assert retry.headers[REPLAYED_HEADER] == "true"
+    assert db.query(Task).filter(Task.project_id == project_id).count() == 1
+
+
+def test_keys_are_scoped_to_the_user(client, auth_headers):
+    client.post("/auth/register", json={"email": "other", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "other", "password": "pass"}).json()["access_token"]
+
+    body = {"title": "Same", "description": "d"}
+    mine = client.post("/projects/", json=body, headers={**auth_headers, "Idempotency-Key": "k"})
+    theirs = client.post("/projects/", json=body, headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "k"})
+    assert mine.json()["id"] != theirs.json()["id"]
+    assert REPLAYED_HEADER not in theirs.headers
+
+
+def test_key_reused_for_different_request(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "k"}
+    client.post("/projects/", json={"title": "One", "description": "d"}, headers=headers)
+
+    response = client.post("/projects/", json={"title": "Two", "description": "d"}, headers=headers)
+    assert response.status_code == 422
+
+
+def test_failed_request_releases_key(client, auth_headers, create_project, db):
+    project_id = create_project()
+    client.post(f"/projects/{project_id}/archive", headers=auth_headers)
+    headers = {**auth_headers, "Idempotency-Key": "k"}
+
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "Task"}, headers=headers)
+    assert response.status_code == 409
+    assert db.query(IdempotencyKey).count() == 0
+
+    client.post(f"/projects/{project_id}/unarchive", headers=auth_headers)
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "Task"}, headers=headers)
+    assert response.status_code == 200
+    assert REPLAYED_HEADER not in response.headers
+
+
+def claim_in_flight(db, project_id, body):
+    user = db.query(User).filter(User.email == "testuser").first()
+    request_fingerprint = fingerprint("POST", f"/projects/{project_id}/tasks/?", json.dumps(body).encode())
+    key = IdempotencyKey(user_id=user.id, key="k", fingerprint=request_fingerprint,
+                         expires_at=datetime.utcnow() + timedelta(minutes=1))
+    db.add(key)
+    db.commit()
+    return key
+
+
+def test_duplicate_waits_for_request_in_flight(client, auth_headers, create_project, db, monkeypatch):
+    project_id = create_project()
+    body = {"name": "Task"}
+    key = claim_in_flight(db, project_id, body)
+    headers = {**auth_headers, "Idempotency-Key": "k", "Content-Type": "application/json"}
+
+    # The first request never finishes
+    monkeypatch.setattr(settings, "idempotency_wait_seconds", 0.2)
+    response = client.post(f"/projects/{project_id}/tasks/", content=json.dumps(body), headers=headers)
+    assert response.status_code == 409
+
+    # The first request finishes while the duplicate waits
+    def finish():
+        key.status_code, key.media_type, key.body = 200, "application/json", b'{"id": 42}'
+        db.commit()
+    timer = threading.Timer(0.2, finish)
+    monkeypatch.setattr(settings, "idempotency_wait_seconds", 5)
+    timer.start()
+    response = client.post(f"/projects/{project_id}/tasks/", content=json.dumps(body), headers=headers)
+    timer.join()
+    assert response.status_code == 200
+    assert response.json() == {"id": 42}
+    assert db.query(Task).count() == 0
+
+
+def test_abandoned_and_expired_keys_are_reused(client, auth_headers, create_project, db):
+    project_id = create_project()
+    body = {"name": "Task"}
+    key = claim_in_flight(db, project_id, body)
+    key.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    headers = {**auth_headers, "Idempotency-Key": "k", "Content-Type": "application/json"}
+
+    response = client.post(f"/projects/{project_id}/tasks/", content=json.dumps(body), headers=headers)
+    assert response.status_code == 200
+    assert REPLAYED_HEADER not in response.headers
+    assert db.query(Task).count() == 1
+
+
+def test_expired_keys_of_every_user_are_purged(client, auth_headers, db):
+    user = db.query(User).filter(User.email == "testuser").first()
+    now = datetime.utcnow()
+    db.add_all([IdempotencyKey(user_id=user.id, key=f"expired {i}", fingerprint="f",
+                               expires_at=now - timedelta(seconds=1)) for i in range(3)])
+    db.add(IdempotencyKey(user_id=user.id, key="live", fingerprint="f", expires_at=now + timedelta(minutes=1)))
+    db.commit()
+
+    assert purge_expired(db.get_bind(), batch_size=2) == 3
+    assert [key.key for key in db.query(IdempotencyKey)] == ["live"]
@@ -0,0 +1,143 @@
+import pytest
+
+from app.config import settings
+from app.permissions import memberships
+from app.profiling import query_budget
+
+
+@pytest.fixture
+def member_headers(client, auth_headers):
+    client.post("/auth/register", json={"email": "member", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "member", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def add_member(client, headers, project_id, role, email="member"):
+    return client.post(f"/projects/{project_id}/members/", json={"email": email, "role": role}, headers=headers)
+
+
+def test_owner_is_a_member(client, auth_headers, create_project):
+    project_id = create_project()
+    members = client.get(f"/projects/{project_id}/members/", headers=auth_headers).json()
+    assert [(member["email"], member["role"]) for member in members] == [("testuser", "owner")]
+
+
+def test_viewer_reads_but_cannot_write(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    task_id = client.post(f"/projects/{project_id}/tasks/", json={"name": "Task"}, headers=auth_headers).json()["id"]
+    assert client.get(f"/projects/{project_id}", headers=member_headers).status_code == 403
+
+    response = add_member(client, auth_headers, project_id, "viewer")
+    assert response.status_code == 200
+    assert response.json()["role"] == "viewer"
+
+    assert [project["id"] for project in client.get("/projects/", headers=member_headers).json()] == [project_id]
+    assert client.get(f"/tasks/{task_id}", headers=member_headers).status_code == 200
+    assert len(client.get(f"/projects/{project_id}/tasks/", headers=member_headers).json()) == 1
+    assert client.post(f"/projects/{project_id}/tasks/", json={"name": "New"},
+                       headers=member_headers).status_code == 403
+    assert client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=member_headers).status_code == 403
+    assert client.delete(f"/tasks/{task_id}", headers=member_headers).status_code == 403
+    assert client.put(f"/projects/{project_id}", json={"title": "Mine"}, headers=member_headers).status_code == 403
+
+
+def test_editor_writes_tasks_but_cannot_manage_project(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    add_member(client, auth_headers, project_id, "viewer")
+    member_id = client.get(f"/projects/{project_id}/members/", headers=auth_headers).json()[1]["user_id"]
+
+    response = client.put(f"/projects/{project_id}/members/{member_id}", json={"role": "editor"}, headers=auth_headers)
+    assert response.status_code == 200
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "New"}, headers=member_headers)
+    assert response.status_code == 200
+    task_id = response.json()["id"]
+    assert client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=member_headers).status_code == 200
+    assert client.put(f"/projects/{project_id}", json={"title": "Renamed"}, headers=member_headers).status_code == 200
+
+    assert client.post(f"/projects/{project_id}/archive", headers=member_headers).status_code == 403
+    assert client.delete(f"/projects/{project_id}", headers=member_headers).status_code == 403
+    assert add_member(client, member_headers, project_id, "viewer", email="testuser").status_code == 403
+
+
+def test_removed_member_loses_access(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    add_member(client, auth_headers, project_id, "editor")
+    member_id = client.get(f"/projects/{project_id}/members/", headers=auth_headers).json()[1]["user_id"]
+    assert client.get(f"/projects/{project_id}", headers=member_headers).status_code == 200
+
+    response = client.delete(f"/projects/{project_id}/members/{member_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert client.get(f"/projects/{project_id}", headers=member_headers).status_code == 403
+    assert client.get("/projects/", headers=member_headers).json() == []
+
+
+def test_members_can_leave(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    add_member(client, auth_headers, project_id, "viewer")
+    members = client.get(f"/projects/{project_id}/members/", headers=member_headers).json()
+    owner_id, member_id = members[0]["user_id"], members[1]["user_id"]
+
+    assert client.delete(f"/projects/{project_id}/members/{owner_id}", headers=member_headers).status_code == 403
+    assert client.delete(f"/projects/{project_id}/members/{member_id}", headers=member_headers).status_code == 200
+    assert client.get(f"/projects/{project_id}", headers=member_headers).status_code == 403
+
+
+def test_membership_changes_are_validated(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    owner_id = client.get(f"/projects/{project_id}/members/", headers=auth_headers).json()[0]["user_id"]
+
+    assert add_member(client, auth_headers, project_id, "owner").status_code == 422
+    assert add_member(client, auth_headers, project_id, "viewer", email="nobody").status_code == 404
+    assert add_member(client, auth_headers, project_id, "viewer").status_code == 200
+    assert add_member(client, auth_headers, project_id, "editor").status_code == 409
+    response = client.put(f"/projects/{project_id}/members/{owner_id}", json={"role": "viewer"}, headers=auth_headers)
+    assert response.status_code == 409
+    assert client.delete(f"/projects/{project_id}/members/{owner_id}", headers=auth_headers).status_code == 409
+    assert client.delete(f"/projects/{project_id}/members/999999", headers=auth_headers).status_code == 404
+
+
+def test_membership_map_is_cached_until_changed(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    task_id = client.post(f"/projects/{project_id}/tasks/", json={"name": "Task"}, headers=auth_headers).json()["id"]
+    client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert client.get(f"/tasks/{task_id}", headers=member_headers).status_code == 403
+    loads = memberships.loads
+
+    for _ in range(3):
+        assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 200
+        assert client.get(f"/projects/{project_id}/tasks/", headers=auth_headers).status_code == 200
+    assert memberships.loads == loads
+
+    # Only the added member's map is reloaded
+    add_member(client, auth_headers, project_id, "viewer")
+    client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert memberships.loads == loads
+    assert client.get(f"/tasks/{task_id}", headers=member_headers).status_code == 200
+    assert memberships.loads == loads + 1
+
+
+def test_listings_of_users_in_many_projects_read_the_membership_table(client, auth_headers, create_project,
+                                                                      member_headers, db, monkeypatch):
+    shared = [create_project() for _ in range(3)]
+    create_project()
+    for project_id in shared:
+        add_member(client, auth_headers, project_id, "viewer")
+    client.delete(f"/projects/{shared[2]}", headers=auth_headers)
+    listed = [project["id"] for project in client.get("/projects/", headers=member_headers).json()]
+
+    monkeypatch.setattr(settings, "membership_inline_ids", 1)
+    with query_budget(10, db.get_bind()) as profile:
+        response = client.get("/projects/", headers=member_headers)
+    assert any("FROM project_members" in record.statement for record in profile.records)
+    assert [project["id"] for project in response.json()] == listed == shared[:2]
+
+
+def test_update_without_editor_role_writes_nothing(client, auth_headers, create_project, member_headers):
+    project_id = create_project()
+    task_id = client.post(f"/projects/{project_id}/tasks/", json={"name": "Task"}, headers=auth_headers).json()["id"]
+    add_member(client, auth_headers, project_id, "viewer")
+    before = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert client.put(f"/tasks/{task_id}", json={"name": "Mine"}, headers=member_headers).status_code == 403
+    after = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert after.json()["name"] == "Task"
+    assert after.headers["ETag"] == before.headers["ETag"]
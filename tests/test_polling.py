@@ -0,0 +1,30 @@
+import threading
+
+from app.polling import PollingThread
+
+
+class Flaky(PollingThread):
+    poll_at_start = True
+    failure_message = "Flaky poll failed"
+
+    def __init__(self):
+        super().__init__("flaky", 0.01)
+        self.polls = 0
+        self.recovered = threading.Event()
+
+    def poll(self) -> None:
+        self.polls += 1
+        if self.polls == 1:
+            raise RuntimeError("database unreachable")
+        self.recovered.set()
+
+
+def test_failed_polls_are_logged_and_retried(caplog):
+    thread = Flaky()
+    thread.start()
+    assert thread.recovered.wait(5)
+    thread.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+    [record] = [record for record in caplog.records if record.message == "Flaky poll failed"]
+    assert record.name == __name__ and record.exc_info[0] is RuntimeError
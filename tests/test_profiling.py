@@ -0,0 +1,68 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.models.project import Project
+from app.models.user import User
+from app.profiling import QueryBudgetExceeded, SQLProfilingMiddleware, instrument, query_budget, statement_shape
+
+
+def test_statement_shape():
+    assert statement_shape("SELECT * FROM tasks WHERE id IN (?, ?,\n ?)") == "SELECT * FROM tasks WHERE id IN (?)"
+    assert statement_shape("SELECT * FROM tasks WHERE id IN (%(id_1)s)") == "SELECT * FROM tasks WHERE id IN (?)"
+    assert statement_shape("SELECT 1 LIMIT 20") == "SELECT ? LIMIT ?"
+
+
+def test_read_routes_stay_within_query_budget(client, auth_headers, create_project, db):
+    project_id = create_project()
+    for i in range(20):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+
+    # User lookup, project ownership check, one listing query: no per-row queries
+    with query_budget(3, db.get_bind()) as profile:
+        assert len(client.get(f"/projects/{project_id}/tasks/", headers=auth_headers).json()) == 20
+    assert profile.repeated(2) == []
+    with query_budget(2, db.get_bind()):
+        client.get("/projects/", headers=auth_headers)
+
+
+def test_query_budget_reports_n_plus_one(client, auth_headers, create_project, db):
+    for i in range(3):
+        create_project()
+    db.expire_all()
+
+    with pytest.raises(QueryBudgetExceeded) as raised:
+        with query_budget(2, db.get_bind()):
+            for project in db.query(Project).all():
+                db.expire(project.owner)
+                assert project.owner.email == "testuser"
+
+    report = str(raised.value)
+    assert "repeated" in report and report.endswith("FROM users WHERE users.id = ?")
+
+
+def test_profiling_middleware_headers(db):
+    app = FastAPI()
+    app.add_middleware(SQLProfilingMiddleware, repeat_threshold=3)
+
+    @app.get("/users")
+    def users():
+        for _ in range(4):
+            db.execute(text("SELECT count(*) FROM users")).scalar()
+        return db.query(User).count()
+
+    instrument(db.get_bind())
+    response = TestClient(app).get("/users")
+    assert response.headers["X-SQL-Queries"] == "5"
+    assert response.headers["X-SQL-Repeated"] == "1"
+    assert float(response.headers["X-SQL-Time-Ms"]) >= 0
+
+
+def test_failed_statements_are_not_left_started(db):
+    instrument(db.get_bind())
+    connection = db.connection()
+    with pytest.raises(OperationalError):
+        connection.execute(text("SELECT * FROM missing"))
+    assert connection.info["profiling_started"] == []
@@ -1,3 +1,11 @@
+from datetime import datetime
+
+from app.deletion import run_project_deletion, resume_project_deletions
+from app.models.deletion import ProjectDeletion
+from app.models.project import Project
+from app.models.task import ArchivedTask, Task
+
+
 def create_project(client, auth_headers):
     response = client.post("/projects/", json={"title": "Test", "description": "A test project"}, headers=auth_headers)
     return response.json()["id"]
@@ -62,7 +70,7 @@ def test_delete_project_success(client, auth_headers):
     project_id = create_project(client, auth_headers)
 
     response = client.delete(f"/projects/{project_id}", headers=auth_headers)
-    assert response.status_code == 200
+    assert response.status_code == 202
 
     # Verify the project is deleted
     response = client.get(f"/projects/{project_id}", headers=auth_headers)
@@ -105,3 +113,137 @@ def test_create_second_user_project_isolation(client, auth_headers):
     data = response.json()
     assert isinstance(data, list)
     assert all(project["id"] != project_id for project in data)
+
+def test_list_projects_sparse_fields(client, auth_headers):
+    project_id = create_project(client, auth_headers)
+
+    response = client.get("/projects", params={"fields": "title"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": project_id, "title": "Test"}]
+
+def test_list_projects_columnar(client, auth_headers):
+    first = create_project(client, auth_headers)
+    second = create_project(client, auth_headers)
+
+    response = client.get("/projects", params={"fields": "title", "format": "columnar"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": [first, second], "title": ["Test", "Test"]}
+
+    response = client.get("/projects", params={"format": "rows"}, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_get_project_sparse_fields(client, auth_headers):
+    project_id = create_project(client, auth_headers)
+
+    response = client.get(f"/projects/{project_id}", params={"fields": "description,owner_id"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"id", "description", "owner_id"}
+
+def test_delete_project_runs_background_job(client, auth_headers, db):
+    project_id = create_project(client, auth_headers)
+    for i in range(7):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+
+    response = client.delete(f"/projects/{project_id}", headers=auth_headers)
+    assert response.status_code == 202
+    assert response.json()["project_id"] == project_id
+    location = response.headers["Location"]
+
+    response = client.get(location, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["tasks_deleted"] == 7
+    assert data["finished_at"] is not None
+    assert db.query(Task).filter(Task.project_id == project_id).count() == 0
+    assert db.query(Project).filter(Project.id == project_id).count() == 0
+
+def test_deletion_in_batches_and_resume(client, auth_headers, db):
+    project_id = create_project(client, auth_headers)
+    for i in range(5):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+    project = db.get(Project, project_id)
+    deletion = ProjectDeletion(project_id=project_id, owner_id=project.owner_id)
+    project.deleted_at = datetime.utcnow()
+    db.add(deletion)
+    db.commit()
+
+    # Hidden from every endpoint while the job is pending
+    assert client.get(f"/projects/{project_id}", headers=auth_headers).status_code == 403
+    assert client.get(f"/projects/{project_id}/tasks/", headers=auth_headers).status_code == 403
+
+    run_project_deletion(db.get_bind(), deletion.id, batch_size=2)
+    db.expire_all()
+    assert deletion.status == "completed"
+    assert deletion.tasks_deleted == 5
+    assert resume_project_deletions(db.get_bind()) == 0
+
+def test_get_project_deletion_other_user(client, auth_headers):
+    project_id = create_project(client, auth_headers)
+    location = client.delete(f"/projects/{project_id}", headers=auth_headers).headers["Location"]
+
+    client.post("/auth/register", json={"email": "seconduser", "password": "secondpass"})
+    token = client.post("/auth/login", data={"username": "seconduser", "password": "secondpass"}).json()["access_token"]
+    response = client.get(location, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 404
+
+def test_archive_and_unarchive_project(client, auth_headers, db):
+    project_id = create_project(client, auth_headers)
+    for i in range(3):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+
+    response = client.post(f"/projects/{project_id}/archive", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"project_id": project_id, "tasks_moved": 3}
+    assert db.query(Task).filter(Task.project_id == project_id).count() == 0
+    assert client.get(f"/projects/{project_id}", headers=auth_headers).json()["archived_at"] is not None
+    assert client.post(f"/projects/{project_id}/archive", headers=auth_headers).status_code == 409
+
+    # Archived projects list from the archive and reject new tasks
+    response = client.get(f"/projects/{project_id}/tasks/", params={"sort": "-name"}, headers=auth_headers)
+    assert [task["name"] for task in response.json()] == ["Task 2", "Task 1", "Task 0"]
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "New"}, headers=auth_headers)
+    assert response.status_code == 409
+
+    response = client.post(f"/projects/{project_id}/unarchive", headers=auth_headers)
+    assert response.json()["tasks_moved"] == 3
+    assert db.query(ArchivedTask).count() == 0
+    assert len(client.get(f"/projects/{project_id}/tasks/", headers=auth_headers).json()) == 3
+    assert client.post(f"/projects/{project_id}/unarchive", headers=auth_headers).status_code == 409
+
+def test_delete_archived_project(client, auth_headers, db):
+    project_id = create_project(client, auth_headers)
+    for i in range(2):
+        client.post(f"/projects/{project_id}/tasks/", json={"name": f"Task {i}"}, headers=auth_headers)
+    client.post(f"/projects/{project_id}/archive", headers=auth_headers)
+
+    location = client.delete(f"/projects/{project_id}", headers=auth_headers).headers["Location"]
+    assert client.get(location, headers=auth_headers).json()["tasks_deleted"] == 2
+    assert db.query(ArchivedTask).filter(ArchivedTask.project_id == project_id).count() == 0
+
+def test_get_projects_batch(client, auth_headers):
+    first, second = create_project(client, auth_headers), create_project(client, auth_headers)
+    client.post("/auth/register", json={"email": "seconduser", "password": "secondpass"})
+    token = client.post("/auth/login", data={"username": "seconduser", "password": "secondpass"}).json()["access_token"]
+    foreign = create_project(client, {"Authorization": f"Bearer {token}"})
+
+    response = client.get("/projects", params={"ids": f"{second},{foreign},{first},999"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [project["id"] for project in response.json()["items"]] == [second, first]
+    assert [error["id"] for error in response.json()["errors"]] == [foreign, 999]
+    assert {error["status"] for error in response.json()["errors"]} == {403}
+
+    response = client.get("/projects/", params={"ids": str(first), "fields": "title"}, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_update_project_if_match(client, auth_headers):
+    project_id = create_project(client, auth_headers)
+    etag = client.get(f"/projects/{project_id}", headers=auth_headers).headers["ETag"]
+
+    response = client.put(f"/projects/{project_id}", json={"title": "First"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    response = client.put(f"/projects/{project_id}", json={"title": "Second"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/projects/{project_id}", headers=auth_headers).json()["title"] == "First"
+    assert client.put("/projects/999", json={"title": "x"}, headers={**auth_headers, "If-Match": etag}).status_code == 403
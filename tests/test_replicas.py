@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import app.database as database
+from app.database import Base, make_engine
+from app.main import TaskForge
+from app.replicas import STICKY_COOKIE, replica_health
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    primary = make_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = make_engine(f"sqlite:///{tmp_path / 'replica.db'}", pool_pre_ping=True)
+    Base.metadata.create_all(primary)
+    Base.metadata.create_all(replica)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autoflush=False, bind=primary))
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autoflush=False, bind=replica))
+    replica_health.reset()
+
+    def replicate():
+        replica.dispose()
+        with sqlite3.connect(tmp_path / "primary.db") as source, sqlite3.connect(tmp_path / "replica.db") as target:
+            source.backup(target)
+
+    yield TestClient(TaskForge), replicate
+    replica_health.reset()
+    primary.dispose()
+    replica.dispose()
+
+
+def login(client):
+    client.post("/auth/register", json={"email": "replicauser", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "replicauser", "password": "pass"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def titles(client, headers):
+    return [project["title"] for project in client.get("/projects/", headers=headers).json()]
+
+
+def test_reads_go_to_replica(replicated):
+    client, replicate = replicated
+    headers = login(client)
+    client.post("/projects/", json={"title": "First", "description": "d"}, headers=headers)
+    replicate()
+    client.post("/projects/", json={"title": "Second", "description": "d"}, headers=headers)
+
+    # The replica lags behind the primary until the next replication
+    client.cookies.clear()
+    assert titles(client, headers) == ["First"]
+    replicate()
+    assert titles(client, headers) == ["First", "Second"]
+
+
+def test_reads_after_write_stick_to_primary(replicated):
+    client, replicate = replicated
+    headers = login(client)
+    replicate()
+
+    response = client.post("/projects/", json={"title": "Fresh", "description": "d"}, headers=headers)
+    assert STICKY_COOKIE in response.cookies
+    assert titles(client, headers) == ["Fresh"]
+    project_id = response.json()["id"]
+    assert client.get(f"/projects/{project_id}", headers=headers).status_code == 200
+
+    # Failed writes do not pin reads
+    client.cookies.clear()
+    response = client.put("/projects/9999", json={"title": "x"}, headers=headers)
+    assert response.status_code == 403
+    assert STICKY_COOKIE not in response.cookies
+    assert titles(client, headers) == []
+
+
+def test_unreachable_replica_falls_back_to_primary(replicated, tmp_path, monkeypatch):
+    client, _ = replicated
+    headers = login(client)
+    client.post("/projects/", json={"title": "Only on primary", "description": "d"}, headers=headers)
+    client.cookies.clear()
+
+    broken = make_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}", pool_pre_ping=True)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=broken))
+    assert titles(client, headers) == ["Only on primary"]
+    assert not replica_health.available()
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.models.notification import SchedulerCheckpoint, TaskNotification
+from app.profiling import query_budget
+from app.scheduler import DUE_SOON, OVERDUE, DueScheduler
+
+NOW = datetime(2030, 1, 1, 12, 0)
+
+
+def make_scheduler(events=None):
+    scheduler = DueScheduler(due_soon=timedelta(hours=1), window=timedelta(minutes=10))
+    if events is not None:
+        scheduler.subscribe(events.append)
+    return scheduler
+
+
+def kinds(events):
+    return sorted((event.kind, event.task_id) for event in events)
+
+
+def test_events_fire_when_due(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    soon = create_task(project_id, "soon", due_date=NOW + timedelta(minutes=30))
+    late = create_task(project_id, "late", due_date=NOW - timedelta(minutes=5))
+    later = create_task(project_id, "later", due_date=NOW + timedelta(hours=5))
+    events = []
+    scheduler = make_scheduler(events)
+    bind = db.get_bind()
+
+    scheduler.load(bind, NOW - timedelta(hours=2), NOW + timedelta(minutes=10))
+    assert kinds(scheduler.fire(bind, NOW)) == sorted([(DUE_SOON, late), (DUE_SOON, soon), (OVERDUE, late)])
+    assert scheduler.fire(bind, NOW) == []
+    assert kinds(events) == sorted([(DUE_SOON, late), (DUE_SOON, soon), (OVERDUE, late)])
+
+    notification = db.query(TaskNotification).filter(TaskNotification.task_id == soon).one()
+    assert notification.kind == DUE_SOON
+    assert db.query(TaskNotification).filter(TaskNotification.task_id == later).count() == 0
+
+
+def test_events_survive_a_failed_tick(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    soon = create_task(project_id, "soon", due_date=NOW + timedelta(minutes=30))
+    events = []
+    scheduler = make_scheduler(events)
+    bind = db.get_bind()
+    scheduler.load(bind, NOW - timedelta(hours=1), NOW + timedelta(minutes=10))
+
+    def unreachable(conn, cursor, statement, parameters, context, executemany):
+        raise OperationalError(statement, parameters, Exception("database is unreachable"))
+    event.listen(bind, "before_cursor_execute", unreachable)
+    try:
+        with pytest.raises(OperationalError):
+            scheduler.fire(bind, NOW)
+    finally:
+        event.remove(bind, "before_cursor_execute", unreachable)
+    assert events == []
+
+    assert kinds(scheduler.fire(bind, NOW + timedelta(seconds=1))) == [(DUE_SOON, soon)]
+    assert kinds(events) == [(DUE_SOON, soon)]
+
+
+def test_window_loads_are_range_scans(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    create_task(project_id, "soon", due_date=NOW + timedelta(minutes=30))
+    scheduler = make_scheduler()
+
+    with query_budget(2, db.get_bind()) as profile:
+        scheduler.load(db.get_bind(), NOW, NOW + timedelta(minutes=10))
+    assert all("due_date >=" in record.statement and "due_date <" in record.statement for record in profile.records)
+    assert len(scheduler) == 0
+    scheduler.load(db.get_bind(), NOW + timedelta(minutes=10), NOW + timedelta(minutes=40))
+    assert len(scheduler) == 1
+
+
+def test_task_writes_update_schedule(client, auth_headers, create_project, create_task, db, monkeypatch):
+    scheduler = make_scheduler()
+    monkeypatch.setattr("app.routers.tasks.due_scheduler", scheduler)
+    bind = db.get_bind()
+    scheduler.load(bind, NOW - timedelta(minutes=10), NOW + timedelta(minutes=10))
+    project_id = create_project()
+
+    # Created inside the loaded window: scheduled without another load
+    created = create_task(project_id, "created", due_date=NOW + timedelta(minutes=5))
+    rescheduled = create_task(project_id, "rescheduled", due_date=NOW + timedelta(minutes=5))
+    completed = create_task(project_id, "completed", due_date=NOW + timedelta(minutes=5))
+    client.put(f"/tasks/{rescheduled}", json={"due_date": (NOW + timedelta(days=7)).isoformat()},
+               headers=auth_headers)
+    client.put(f"/tasks/{completed}", json={"status": "done"}, headers=auth_headers)
+
+    events = scheduler.fire(bind, NOW + timedelta(minutes=5))
+    assert kinds(events) == [(DUE_SOON, created), (OVERDUE, created)]
+
+
+def test_deleted_and_archived_tasks_do_not_fire(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    deleted = create_task(project_id, "deleted", due_date=NOW)
+    archived_project = create_project()
+    create_task(archived_project, "archived", due_date=NOW)
+    scheduler = make_scheduler()
+    scheduler.load(db.get_bind(), NOW - timedelta(hours=2), NOW + timedelta(minutes=10))
+
+    client.delete(f"/tasks/{deleted}", headers=auth_headers)
+    client.post(f"/projects/{archived_project}/archive", headers=auth_headers)
+    assert scheduler.fire(db.get_bind(), NOW) == []
+
+
+def test_workers_emit_each_event_once(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    create_task(project_id, "late", due_date=NOW - timedelta(minutes=5))
+    bind = db.get_bind()
+    first, second = make_scheduler(), make_scheduler()
+    for scheduler in (first, second):
+        scheduler.load(bind, NOW - timedelta(minutes=10), NOW + timedelta(minutes=10))
+
+    assert len(first.fire(bind, NOW)) == 1
+    assert second.fire(bind, NOW) == []
+    assert db.query(TaskNotification).count() == 1
+
+
+def test_restart_catches_up_from_checkpoint(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    bind = db.get_bind()
+    scheduler = make_scheduler()
+    assert scheduler.catch_up(bind, NOW) == []
+    assert db.get(SchedulerCheckpoint, "due_scheduler").processed_until == NOW
+
+    # Falls due while no scheduler is running
+    missed = create_task(project_id, "missed", due_date=NOW + timedelta(hours=2))
+    restarted = make_scheduler()
+    events = restarted.catch_up(bind, NOW + timedelta(hours=3))
+    assert kinds(events) == [(DUE_SOON, missed), (OVERDUE, missed)]
+
+
+def test_first_start_does_not_notify_old_tasks(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    create_task(project_id, "old", due_date=NOW - timedelta(days=30))
+
+    assert make_scheduler().catch_up(db.get_bind(), NOW) == []
+
+
+def test_tick_loads_next_window(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id, "task", due_date=NOW + timedelta(minutes=70))
+    bind = db.get_bind()
+    scheduler = make_scheduler()
+    scheduler.catch_up(bind, NOW)
+
+    now = NOW
+    events = []
+    while now < NOW + timedelta(minutes=71):
+        events += scheduler.tick(bind, now)
+        now += timedelta(minutes=1)
+    assert kinds(events) == [(DUE_SOON, task_id), (OVERDUE, task_id)]
+
+
+def test_notification_endpoints(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id, "late", due_date=NOW - timedelta(minutes=5))
+    scheduler = make_scheduler()
+    scheduler.load(db.get_bind(), NOW - timedelta(hours=2), NOW)
+    scheduler.fire(db.get_bind(), NOW)
+
+    response = client.get("/notifications/", headers=auth_headers)
+    assert [(item["kind"], item["task_id"]) for item in response.json()] == [(DUE_SOON, task_id), (OVERDUE, task_id)]
+
+    notification_id = response.json()[0]["id"]
+    response = client.post(f"/notifications/{notification_id}/read", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["read_at"] is not None
+    unread = client.get("/notifications/", params={"unread": True}, headers=auth_headers).json()
+    assert [item["kind"] for item in unread] == [OVERDUE]
+
+    client.post("/auth/register", json={"email": "other", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "other", "password": "pass"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/notifications/", headers=other_headers).json() == []
+    assert client.post(f"/notifications/{notification_id}/read", headers=other_headers).status_code == 404
@@ -0,0 +1,90 @@
+from collections import Counter
+from datetime import timedelta
+
+from sqlalchemy import create_engine, func, select, text
+
+from app.database import Base
+from app.models.hierarchy import TaskClosure
+from app.models.member import ProjectMember
+from app.models.task import Task
+from app.schemas.task import TaskStatus
+from app.seed import SEED_PASSWORD, SeedProfile, seed, tasks_per_project
+
+
+def login(client, user_id):
+    response = client.post("/auth/login", data={"username": f"seed-{user_id}@example.com", "password": SEED_PASSWORD})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_seed_creates_requested_volumes(db, seed_data):
+    result = seed_data(users=5, projects=20, tasks=2000, members_per_project=2)
+
+    assert db.scalar(select(func.count()).select_from(Task)) == 2000
+    assert db.scalar(select(func.count()).select_from(TaskClosure)) == 2000
+    assert db.scalar(select(func.count()).select_from(ProjectMember)) == 60
+    assert list(result.tasks) == list(db.scalars(select(Task.id).order_by(Task.id)))
+
+    # Seeding again appends after the existing rows
+    more = seed_data(users=1, projects=1, tasks=10)
+    assert more.tasks.start == result.tasks.stop and more.users.start == result.users.stop
+
+
+def test_seed_is_deterministic():
+    def generate(profile):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        seed(engine, profile)
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT * FROM tasks ORDER BY id")).all()
+
+    profile = SeedProfile(users=3, projects=10, tasks=500, project_skew=1.0, members_per_project=1)
+    assert generate(profile) == generate(profile)
+    assert generate(profile) != generate(SeedProfile(users=3, projects=10, tasks=500, seed=1))
+
+
+def test_task_distribution_follows_profile(db):
+    assert tasks_per_project(SeedProfile(projects=3, tasks=10)) == [4, 3, 3]
+    skewed = tasks_per_project(SeedProfile(projects=100, tasks=10_000, project_skew=1.0))
+    assert sum(skewed) == 10_000 and skewed == sorted(skewed, reverse=True)
+    assert skewed[0] > 10 * skewed[50]
+
+    profile = SeedProfile(projects=10, tasks=20_000, due_fraction=0.25, due_spread_days=(0, 7),
+                          status_mix={TaskStatus.TODO: 0.8, TaskStatus.DONE: 0.2})
+    seed(db.get_bind(), profile)
+    statuses = Counter(db.scalars(select(Task.status)))
+    assert set(statuses) == {TaskStatus.TODO, TaskStatus.DONE}
+    assert abs(statuses[TaskStatus.DONE] / 20_000 - 0.2) < 0.02
+    due_dates = db.scalars(select(Task.due_date).where(Task.due_date.is_not(None))).all()
+    assert abs(len(due_dates) / 20_000 - 0.25) < 0.02
+    assert profile.now <= min(due_dates) and max(due_dates) <= profile.now + timedelta(days=7)
+
+
+def test_seeded_users_use_the_api(client, db, seed_data):
+    result = seed_data(users=2, projects=2, tasks=300, members_per_project=1)
+    project_id = result.projects[0]
+    owner_headers, editor_headers = login(client, result.users[0]), login(client, result.users[1])
+
+    expected = db.scalar(select(func.count()).where(Task.project_id == project_id))
+    response = client.get(f"/projects/{project_id}/tasks/", headers=owner_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == expected
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "New"}, headers=editor_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == result.tasks.stop
+
+
+def test_sorted_listing_plan_on_skewed_volume(client, db, seed_data):
+    result = seed_data("skewed", users=5, projects=50, tasks=50_000)
+    largest = result.projects[0]
+    query = db.query(Task).filter(Task.project_id == largest).order_by(Task.due_date.asc().nulls_last(),
+                                                                       Task.id).limit(50)
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "ix_tasks_project_due" in plan
+    assert "TEMP B-TREE" not in plan
+
+    response = client.get(f"/projects/{largest}/tasks/", params={"sort": "due_date", "limit": 50},
+                          headers=login(client, result.users[0]))
+    assert len(response.json()) == 50
+    assert "X-Next-Cursor" in response.headers
@@ -0,0 +1,66 @@
+import logging
+import os
+import signal
+import threading
+
+import app.database as database
+import app.serving as serving
+from app.serving import MemoryWatcher, rss_bytes
+
+
+class FakeWorker:
+    pid = os.getpid()
+
+
+class FakeArbiter:
+    log = logging.getLogger("test.serving")
+
+
+def test_serving_profile():
+    assert serving.preload_app is True
+    assert serving.workers >= 1
+    assert serving.worker_class == "uvicorn_worker.UvicornWorker"
+
+
+def test_rss_bytes():
+    assert rss_bytes() > 1024 * 1024
+
+
+def test_memory_watcher_fires_once_over_limit():
+    fired = threading.Event()
+    calls = []
+
+    def on_exceed(rss):
+        calls.append(rss)
+        fired.set()
+
+    watcher = MemoryWatcher(1, on_exceed, interval=0.01)
+    watcher.start()
+    assert fired.wait(2)
+    watcher.join(2)
+    assert len(calls) == 1 and calls[0] > 1
+
+
+def test_memory_watcher_below_limit():
+    watcher = MemoryWatcher(2 ** 50, lambda rss: None, interval=0.01)
+    watcher.start()
+    watcher.stop()
+    watcher.join(2)
+    assert not watcher.is_alive()
+
+
+def test_post_fork_replaces_inherited_pool():
+    with database.engine.connect():
+        pass
+    inherited = database.engine.pool
+    serving.post_fork(FakeArbiter(), FakeWorker())
+    assert database.engine.pool is not inherited
+
+
+def test_post_fork_recycles_on_memory_limit(monkeypatch):
+    monkeypatch.setattr(serving.settings, "worker_max_memory_mb", 1)
+    monkeypatch.setattr(serving, "MEMORY_CHECK_SECONDS", 0.01)
+    sent = threading.Event()
+    monkeypatch.setattr(serving.os, "kill", lambda pid, sig: sent.set() if sig == signal.SIGTERM else None)
+    serving.post_fork(FakeArbiter(), FakeWorker())
+    assert sent.wait(2)
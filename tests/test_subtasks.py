@@ -0,0 +1,118 @@
+from app.config import settings
+from app.models.hierarchy import TaskClosure
+from app.profiling import query_budget
+
+
+def subtask_names(client, auth_headers, task_id, **params):
+    response = client.get(f"/tasks/{task_id}/subtasks", params=params, headers=auth_headers)
+    assert response.status_code == 200
+    return sorted(task["name"] for task in response.json())
+
+
+def build_tree(create_task, project_id):
+    """root -> (a -> (a1, a2 -> a21), b)"""
+    ids = {"root": create_task(project_id, "root")}
+    ids["a"] = create_task(project_id, "a", parent_id=ids["root"])
+    ids["b"] = create_task(project_id, "b", parent_id=ids["root"])
+    ids["a1"] = create_task(project_id, "a1", parent_id=ids["a"])
+    ids["a2"] = create_task(project_id, "a2", parent_id=ids["a"])
+    ids["a21"] = create_task(project_id, "a21", parent_id=ids["a2"])
+    return ids
+
+
+def test_create_subtasks(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    assert client.get(f"/tasks/{ids['a2']}", headers=auth_headers).json()["parent_id"] == ids["a"]
+    assert subtask_names(client, auth_headers, ids["root"]) == ["a", "a1", "a2", "a21", "b"]
+    assert subtask_names(client, auth_headers, ids["root"], depth=1) == ["a", "b"]
+    assert subtask_names(client, auth_headers, ids["a21"]) == []
+
+
+def test_parent_must_be_in_same_project(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    other = create_task(create_project(), "other")
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "x", "parent_id": other},
+                           headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_subtree_queries_do_not_recurse(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    # Authentication, the task lookup and ownership check, then one query
+    with query_budget(4, db.get_bind()):
+        client.get(f"/tasks/{ids['root']}/subtasks", headers=auth_headers)
+    with query_budget(4, db.get_bind()):
+        client.get(f"/tasks/{ids['root']}/rollup", headers=auth_headers)
+
+
+def test_rollup(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+    for name in ("a1", "a21"):
+        client.put(f"/tasks/{ids[name]}", json={"status": "done"}, headers=auth_headers)
+    client.put(f"/tasks/{ids['b']}", json={"status": "in_progress"}, headers=auth_headers)
+
+    response = client.get(f"/tasks/{ids['root']}/rollup", headers=auth_headers)
+    assert response.json() == {"task_id": ids["root"], "total": 6, "counts": {"todo": 3, "in_progress": 1, "done": 2}}
+
+    # Archived subtasks still count
+    client.post(f"/projects/{project_id}/tasks/archive", headers=auth_headers)
+    response = client.get(f"/tasks/{ids['a']}/rollup", headers=auth_headers)
+    assert response.json()["counts"] == {"todo": 2, "in_progress": 0, "done": 2}
+
+
+def test_move_subtree(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    response = client.post(f"/tasks/{ids['a2']}/move", json={"parent_id": ids["b"]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["parent_id"] == ids["b"]
+    assert subtask_names(client, auth_headers, ids["a"]) == ["a1"]
+    assert subtask_names(client, auth_headers, ids["b"]) == ["a2", "a21"]
+    assert subtask_names(client, auth_headers, ids["root"]) == ["a", "a1", "a2", "a21", "b"]
+    depth = db.query(TaskClosure.depth).filter(TaskClosure.ancestor_id == ids["root"],
+                                               TaskClosure.descendant_id == ids["a21"]).scalar()
+    assert depth == 3
+
+    response = client.post(f"/tasks/{ids['a2']}/move", json={"parent_id": None}, headers=auth_headers)
+    assert response.json()["parent_id"] is None
+    assert subtask_names(client, auth_headers, ids["root"]) == ["a", "a1", "b"]
+    assert subtask_names(client, auth_headers, ids["a2"]) == ["a21"]
+
+
+def test_move_below_itself_is_rejected(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    for parent in ("a", "a21"):
+        response = client.post(f"/tasks/{ids['a']}/move", json={"parent_id": ids[parent]}, headers=auth_headers)
+        assert response.status_code == 409
+    assert subtask_names(client, auth_headers, ids["root"]) == ["a", "a1", "a2", "a21", "b"]
+
+
+def test_depth_limit(client, auth_headers, create_project, create_task, monkeypatch):
+    monkeypatch.setattr(settings, "max_task_depth", 3)
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    response = client.post(f"/projects/{project_id}/tasks/", json={"name": "too deep", "parent_id": ids["a21"]},
+                           headers=auth_headers)
+    assert response.status_code == 409
+    response = client.post(f"/tasks/{ids['a2']}/move", json={"parent_id": ids["a1"]}, headers=auth_headers)
+    assert response.status_code == 409
+
+
+def test_delete_removes_subtree(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    ids = build_tree(create_task, project_id)
+
+    assert client.delete(f"/tasks/{ids['a']}", headers=auth_headers).status_code == 200
+    for name in ("a", "a1", "a2", "a21"):
+        assert client.get(f"/tasks/{ids[name]}", headers=auth_headers).status_code == 404
+    assert subtask_names(client, auth_headers, ids["root"]) == ["b"]
+    assert db.query(TaskClosure).filter(TaskClosure.descendant_id == ids["a21"]).count() == 0
@@ -1,3 +1,16 @@
+import base64
+import json
+
+from sqlalchemy import insert, text, update
+
+from app import archive
+from app.archive import archive_tasks, completed_tasks
+from app.config import settings
+from app.models.task import ArchivedTask, Task
+from app.profiling import query_budget
+from app.schemas.task import TaskPriority, TaskResponse, TaskStatus
+
+
 def create_project(client, auth_headers):
     response = client.post("/projects/", json={"title": "Test", "description": "A test project"}, headers=auth_headers)
     return {"owner_id": response.json()["owner_id"], "project_id": response.json()["id"]}
@@ -110,4 +123,294 @@ def test_create_task_invalid_user(client, auth_headers):
 
     project = create_project(client, auth_headers)
     response = client.post(f"projects/{project['project_id']}/tasks/", json={"name": "Test Task", "description": "A test task", "project_id": project["project_id"], "status": "todo", "priority": "medium"}, headers=other_headers)
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def test_list_tasks_invalid_status_filter(client, auth_headers):
+    project = create_project(client, auth_headers)
+
+    response = client.get(f"projects/{project['project_id']}/tasks/?status=archived", headers=auth_headers)
+    assert response.status_code == 422
+
+def test_list_tasks_filter_by_status(client, auth_headers):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+    done_id = create_task(client, auth_headers, project)
+    client.put(f"/tasks/{done_id}", json={"status": "done"}, headers=auth_headers)
+
+    response = client.get(f"projects/{project['project_id']}/tasks/?status=done", headers=auth_headers)
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [done_id]
+    assert task_id != done_id
+
+def test_task_enums_stored_as_ordered_codes(client, auth_headers, db):
+    project = create_project(client, auth_headers)
+    for priority in ("low", "high", "medium"):
+        task_id = create_task(client, auth_headers, project)
+        client.put(f"/tasks/{task_id}", json={"priority": priority}, headers=auth_headers)
+
+    raw = db.execute(text("SELECT status, priority FROM tasks ORDER BY priority DESC")).all()
+    assert [tuple(row) for row in raw] == [(0, 3), (0, 2), (0, 1)]
+    tasks = db.query(Task).order_by(Task.priority.desc()).all()
+    assert [task.priority for task in tasks] == [TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW]
+
+def create_sort_fixture(client, auth_headers, project):
+    specs = [("b", "low", "2030-01-03T00:00:00"), ("a", "high", "2030-01-02T00:00:00"), ("d", "high", None),
+             ("c", "medium", "2030-01-01T00:00:00"), ("e", "high", "2030-01-01T00:00:00")]
+    ids = {}
+    for name, priority, due_date in specs:
+        response = client.post(f"projects/{project['project_id']}/tasks/", json={"name": name}, headers=auth_headers)
+        ids[name] = response.json()["id"]
+        client.put(f"/tasks/{ids[name]}", json={"priority": priority, "due_date": due_date}, headers=auth_headers)
+    return ids
+
+def test_list_tasks_sorted(client, auth_headers):
+    project = create_project(client, auth_headers)
+    ids = create_sort_fixture(client, auth_headers, project)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    def names(sort):
+        response = client.get(url, params={"sort": sort}, headers=auth_headers)
+        assert response.status_code == 200
+        return "".join(task["name"] for task in response.json())
+
+    assert names("name") == "abcde"
+    assert names("-name") == "edcba"
+    assert names("due_date") == "ceabd"
+    assert names("-due_date") == "dbaec"
+    assert names("-priority,due_date") == "eadcb"
+    assert len(ids) == 5
+
+def test_list_tasks_invalid_sort(client, auth_headers):
+    project = create_project(client, auth_headers)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    assert client.get(url, params={"sort": "description"}, headers=auth_headers).status_code == 422
+    assert client.get(url, params={"sort": "name,-name"}, headers=auth_headers).status_code == 422
+    assert client.get(url, params={"cursor": "garbage"}, headers=auth_headers).status_code == 422
+
+def test_list_tasks_keyset_pagination(client, auth_headers):
+    project = create_project(client, auth_headers)
+    create_sort_fixture(client, auth_headers, project)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    for sort, expected in (("-priority,due_date", "eadcb"), ("-due_date", "dbaec"), (None, "badce")):
+        seen, cursor = "", None
+        while True:
+            params = {"limit": 2, **({"sort": sort} if sort else {}), **({"cursor": cursor} if cursor else {})}
+            response = client.get(url, params=params, headers=auth_headers)
+            assert response.status_code == 200
+            seen += "".join(task["name"] for task in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+        assert seen == expected
+
+    first_page = client.get(url, params={"limit": 2, "sort": "name"}, headers=auth_headers)
+    cursor = first_page.headers["X-Next-Cursor"]
+    assert client.get(url, params={"sort": "-name", "cursor": cursor}, headers=auth_headers).status_code == 422
+
+def tampered_cursor(keys, values):
+    payload = json.dumps({"s": keys, "v": values}).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def test_list_tasks_tampered_cursor(client, auth_headers):
+    project = create_project(client, auth_headers)
+    url = f"projects/{project['project_id']}/tasks/"
+    for sort, keys, values in (("priority", [["priority", False]], ["bogus", 1]),
+                               ("priority", [["priority", False]], ["high", "1"]),
+                               ("due_date", [["due_date", False]], [20300101, 1]),
+                               ("name", [["name", False]], [None, 1]),
+                               (None, [], [True])):
+        params = {"limit": 1, "cursor": tampered_cursor(keys, values), **({"sort": sort} if sort else {})}
+        response = client.get(url, params=params, headers=auth_headers)
+        assert response.status_code == 422
+        assert response.json()["detail"] == "Invalid cursor"
+
+def test_sorted_listing_uses_index(db):
+    query = db.query(Task).filter(Task.project_id == 1).order_by(Task.due_date.asc().nulls_last(), Task.id).limit(20)
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    assert "ix_tasks_project_due" in plan
+    assert "TEMP B-TREE" not in plan
+
+def test_list_tasks_sparse_fields(client, auth_headers):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    response = client.get(url, params={"fields": "name,status"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == [{"id": task_id, "name": "Test Task", "status": "todo"}]
+
+    response = client.get(url, params={"fields": "name,secret"}, headers=auth_headers)
+    assert response.status_code == 422
+
+def test_list_tasks_sparse_fields_with_pagination(client, auth_headers):
+    project = create_project(client, auth_headers)
+    create_sort_fixture(client, auth_headers, project)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    response = client.get(url, params={"fields": "name", "sort": "due_date", "limit": 3}, headers=auth_headers)
+    assert [task["name"] for task in response.json()] == ["c", "e", "a"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(url, params={"fields": "name", "sort": "due_date", "cursor": cursor}, headers=auth_headers)
+    assert [task["name"] for task in response.json()] == ["b", "d"]
+
+def test_list_tasks_columnar(client, auth_headers):
+    project = create_project(client, auth_headers)
+    first = create_task(client, auth_headers, project)
+    second = create_task(client, auth_headers, project)
+    url = f"projects/{project['project_id']}/tasks/"
+
+    response = client.get(url, params={"fields": "priority", "format": "columnar"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": [first, second], "priority": ["medium", "medium"]}
+
+    response = client.get(url, params={"format": "columnar"}, headers=auth_headers)
+    assert set(response.json()) == set(TaskResponse.model_fields)
+
+def test_get_task_sparse_fields(client, auth_headers):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+
+    response = client.get(f"/tasks/{task_id}", params={"fields": "description"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": task_id, "description": "A test task"}
+
+def test_archive_done_tasks(client, auth_headers, db):
+    project = create_project(client, auth_headers)
+    done_id = create_task(client, auth_headers, project)
+    live_id = create_task(client, auth_headers, project)
+    client.put(f"/tasks/{done_id}", json={"status": "done"}, headers=auth_headers)
+
+    response = client.post(f"/projects/{project['project_id']}/tasks/archive", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["tasks_moved"] == 1
+    assert db.query(Task).filter(Task.id == done_id).count() == 0
+
+    # Archived tasks stay readable but are no longer listed with live ones
+    response = client.get(f"/tasks/{done_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    listed = client.get(f"/projects/{project['project_id']}/tasks/", headers=auth_headers).json()
+    assert [task["id"] for task in listed] == [live_id]
+    archived = client.get(f"/projects/{project['project_id']}/tasks/", params={"archived": "true", "fields": "name"},
+                          headers=auth_headers).json()
+    assert archived == [{"id": done_id, "name": "Test Task"}]
+
+    assert client.put(f"/tasks/{done_id}", json={"name": "x"}, headers=auth_headers).status_code == 409
+    assert client.delete(f"/tasks/{done_id}", headers=auth_headers).status_code == 409
+
+def test_archive_done_tasks_completed_before(client, auth_headers):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+    client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+
+    response = client.post(f"/projects/{project['project_id']}/tasks/archive",
+                           params={"completed_before": "2000-01-01T00:00:00"}, headers=auth_headers)
+    assert response.json()["tasks_moved"] == 0
+    assert client.put(f"/tasks/{task_id}", json={"name": "x"}, headers=auth_headers).status_code == 200
+
+def test_archive_skips_tasks_reopened_meanwhile(client, auth_headers, db, monkeypatch):
+    project = create_project(client, auth_headers)
+    reopened_id, done_id = (create_task(client, auth_headers, project) for _ in range(2))
+    for task_id in (reopened_id, done_id):
+        client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+
+    # Reopen a task between selecting the batch and moving it
+    def reopen_before_insert(table):
+        db.execute(update(Task).where(Task.id == reopened_id).values(status=TaskStatus.TODO))
+        return insert(table)
+    monkeypatch.setattr(archive, "insert", reopen_before_insert)
+
+    assert archive_tasks(db, completed_tasks(project["project_id"])) == 1
+    assert db.query(Task).filter(Task.id == reopened_id).count() == 1
+    assert db.query(ArchivedTask).filter(ArchivedTask.id == reopened_id).count() == 0
+    assert db.query(ArchivedTask).filter(ArchivedTask.id == done_id).count() == 1
+
+def test_get_tasks_batch(client, auth_headers, db):
+    project = create_project(client, auth_headers)
+    first, second, archived = (create_task(client, auth_headers, project) for _ in range(3))
+    client.put(f"/tasks/{archived}", json={"status": "done"}, headers=auth_headers)
+    client.post(f"/projects/{project['project_id']}/tasks/archive", headers=auth_headers)
+
+    client.post("/auth/register", json={"email": "otheruser", "password": "otherpass"})
+    token = client.post("/auth/login", data={"username": "otheruser", "password": "otherpass"}).json()["access_token"]
+    other_project = create_project(client, {"Authorization": f"Bearer {token}"})
+    foreign = create_task(client, {"Authorization": f"Bearer {token}"}, other_project)
+
+    with query_budget(4, db.get_bind()):
+        response = client.get("/tasks", params={"ids": f"{second},999,{first},{foreign},{archived},{first}"},
+                              headers=auth_headers)
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()["items"]] == [second, first, archived]
+    assert response.json()["errors"] == [{"id": 999, "status": 404, "detail": "Task not found"},
+                                         {"id": foreign, "status": 403, "detail": "Access denied"}]
+
+def test_get_tasks_batch_limits(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "max_batch_ids", 2)
+    assert client.get("/tasks/", params={"ids": "1,2,3"}, headers=auth_headers).status_code == 422
+    assert client.get("/tasks/", params={"ids": "1,x"}, headers=auth_headers).status_code == 422
+    assert client.get("/tasks/", params={"ids": ","}, headers=auth_headers).status_code == 422
+    assert client.get("/tasks/", params={"ids": "1,1,1"}, headers=auth_headers).status_code == 200
+
+def test_update_task_if_match(client, auth_headers, db):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).headers["ETag"] == '"1"'
+
+    with query_budget(3, db.get_bind()):
+        response = client.put(f"/tasks/{task_id}", json={"status": "done"}, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    assert response.headers["ETag"] == '"2"'
+
+    # A second writer still holding version 1 is rejected instead of overwriting
+    response = client.put(f"/tasks/{task_id}", json={"name": "stale"}, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"2"'
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["name"] == "Test Task"
+
+    for if_match in ('W/"2"', '"7", "3"', "*"):
+        response = client.put(f"/tasks/{task_id}", json={"name": "fresh"}, headers={**auth_headers, "If-Match": if_match})
+        assert response.status_code == 200
+    assert client.put(f"/tasks/{task_id}", json={"name": "x"}, headers=auth_headers).headers["ETag"] == '"6"'
+
+def test_update_task_failures_without_version_match(client, auth_headers):
+    project = create_project(client, auth_headers)
+    task_id = create_task(client, auth_headers, project)
+    headers = {**auth_headers, "If-Match": '"9"'}
+    assert client.put("/tasks/999", json={"name": "x"}, headers=headers).status_code == 404
+
+    client.put(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+    client.post(f"/projects/{project['project_id']}/tasks/archive", headers=auth_headers)
+    assert client.put(f"/tasks/{task_id}", json={"name": "x"}, headers=headers).status_code == 409
+
+def test_compressed_etag_is_weak(client, auth_headers):
+    project = create_project(client, auth_headers)
+    response = client.post(f"projects/{project['project_id']}/tasks/", json={"name": "Big", "description": "x" * 4096},
+                           headers=auth_headers)
+    task_id = response.json()["id"]
+
+    response = client.get(f"/tasks/{task_id}", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"1"'
+    response = client.put(f"/tasks/{task_id}", json={"name": "x"},
+                          headers={**auth_headers, "If-Match": response.headers["ETag"]})
+    assert response.status_code == 200
+
+def test_writes_read_server_values_without_refresh(client, auth_headers, db):
+    project = create_project(client, auth_headers)
+    with query_budget(10, db.get_bind()) as profile:
+        response = client.post(f"projects/{project['project_id']}/tasks/", json={"name": "New"}, headers=auth_headers)
+    assert response.json()["created_at"] is not None
+    insert = next(record.statement for record in profile.records if record.statement.startswith("INSERT INTO tasks"))
+    assert "RETURNING" in insert
+    assert not any(record.statement.startswith("SELECT tasks.") for record in profile.records)
+
+    with query_budget(2, db.get_bind()) as profile:
+        response = client.put(f"/tasks/{response.json()['id']}", json={"name": "Renamed"}, headers=auth_headers)
+    assert response.json()["name"] == "Renamed"
+    assert "RETURNING" in profile.records[-1].statement
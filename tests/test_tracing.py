@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from app import tracing
+from app.tracing import FileExporter, InMemoryExporter, Span, make_exporter
+
+
+@pytest.fixture
+def spans(db):
+    exporter = InMemoryExporter()
+    tracing.configure(exporter, batch=False)
+    tracing.instrument_engine(db.get_bind())
+    tracing.instrument_serialization()
+    yield exporter.spans
+    tracing.configure(None)
+
+
+def test_request_spans(client, auth_headers, create_project, spans):
+    project_id = create_project()
+    # Loads the user's membership map
+    client.get(f"/projects/{project_id}", headers=auth_headers)
+    spans.clear()
+
+    response = client.get(f"/projects/{project_id}", headers=auth_headers)
+    assert response.status_code == 200
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span.name, []).append(span)
+
+    root = by_name["GET /projects/{project_id}"][0]
+    assert root.kind == "server" and root.parent_id is None
+    assert root.attributes["http.response.status_code"] == 200
+    assert response.headers["traceparent"] == root.traceparent
+    assert {span.trace_id for span in spans} == {root.trace_id}
+
+    user = by_name["get_current_user"][0]
+    assert by_name["verify_access_token"][0].parent_id == user.span_id
+    selects = by_name["SQL SELECT"]
+    assert len(selects) == 2
+    assert any(span.parent_id == user.span_id and "FROM users" in span.attributes["db.statement"] for span in selects)
+    assert by_name["serialize_response"][0].parent_id == root.span_id
+    assert all(span.end_ns >= span.start_ns for span in spans)
+
+
+def test_incoming_traceparent_is_continued(client, auth_headers, spans):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    spans.clear()
+    client.get("/projects/", headers={**auth_headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+    assert spans and all(span.trace_id == trace_id for span in spans)
+    assert [span.parent_id for span in spans if span.kind == "server"] == ["00f067aa0ba902b7"]
+
+    spans.clear()
+    client.get("/projects/", headers={**auth_headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-00"})
+    assert spans == []
+
+
+def test_sample_rate(client, auth_headers, spans):
+    tracing.tracer.sample_rate = 0.0
+    spans.clear()
+    response = client.get("/projects/", headers=auth_headers)
+    assert spans == []
+    assert response.headers["traceparent"].endswith("-00")
+
+
+def test_file_exporter(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    span = Span("work", "a" * 32, "b" * 16, attributes={"rows": 3})
+    span.end_ns = span.start_ns + 1000
+    FileExporter(str(path)).export([span, span])
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["traceId"] == "a" * 32
+    assert lines[0]["attributes"] == [{"key": "rows", "value": {"intValue": "3"}}]
+
+
+def test_make_exporter():
+    assert make_exporter("none") is None
+    assert isinstance(make_exporter("app.tracing:InMemoryExporter"), InMemoryExporter)
+    with pytest.raises(ValueError):
+        make_exporter("jaeger")
+
+
+def test_batch_processor_exports_on_shutdown():
+    exporter = InMemoryExporter()
+    processor = tracing.BatchProcessor(exporter, interval=60)
+    for i in range(3):
+        processor.on_end(Span(f"span {i}", "a" * 32, "b" * 16))
+    assert exporter.spans == []
+    processor.shutdown()
+    assert [span.name for span in exporter.spans] == ["span 0", "span 1", "span 2"]
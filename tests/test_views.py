@@ -0,0 +1,243 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.activity import ActivityEntry
+from app.models.task import Task
+from app.models.view import SavedView
+from app.profiling import query_budget
+from app.saved_views import ViewCache, load_filters, view_cache
+
+URGENT = {"status": ["todo", "in_progress"], "priority": ["high"], "assigned_to_me": True, "due_within_days": 7}
+
+
+def in_days(days):
+    return datetime.utcnow() + timedelta(days=days)
+
+
+def create_view(client, headers, project_id, filters, **fields):
+    response = client.post(f"/projects/{project_id}/views/", json={"name": "Urgent", "filters": filters, **fields},
+                           headers=headers)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+def open_view(client, headers, view_id, **params):
+    response = client.get(f"/views/{view_id}/tasks", params=params, headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def names(response):
+    return [task["name"] for task in response.json()]
+
+
+def my_id(client, headers, project_id):
+    return client.get(f"/projects/{project_id}/members/", headers=headers).json()[0]["user_id"]
+
+
+def test_view_lists_matching_tasks(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    me = my_id(client, auth_headers, project_id)
+    create_task(project_id, "later", due_date=in_days(3), priority="high", assignee_id=me)
+    create_task(project_id, "overdue", due_date=in_days(-1), priority="high", assignee_id=me)
+    create_task(project_id, "next month", due_date=in_days(30), priority="high", assignee_id=me)
+    create_task(project_id, "low", due_date=in_days(1), priority="low", assignee_id=me)
+    create_task(project_id, "unassigned", due_date=in_days(1), priority="high")
+    create_task(project_id, "undated", priority="high", assignee_id=me)
+    done = create_task(project_id, "done", due_date=in_days(1), priority="high", assignee_id=me)
+    client.put(f"/tasks/{done}", json={"status": "done"}, headers=auth_headers)
+
+    cached_id = create_view(client, auth_headers, project_id, URGENT, sort="due_date")
+    response = open_view(client, auth_headers, cached_id)
+    assert response.headers["X-View-Cache"] == "miss"
+    assert names(response) == ["overdue", "later"]
+    response = open_view(client, auth_headers, cached_id)
+    assert response.headers["X-View-Cache"] == "hit"
+    assert names(response) == ["overdue", "later"]
+
+    response = client.post(f"/projects/{project_id}/views/", json={"name": "Uncached", "filters": URGENT,
+                                                                   "sort": "due_date", "cached": False},
+                           headers=auth_headers)
+    response = open_view(client, auth_headers, response.json()["id"])
+    assert response.headers["X-View-Cache"] == "off"
+    assert names(response) == ["overdue", "later"]
+
+
+def test_cached_view_is_updated_in_place(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    me = my_id(client, auth_headers, project_id)
+    first = create_task(project_id, "first", due_date=in_days(2), priority="high", assignee_id=me)
+    view_id = create_view(client, auth_headers, project_id, URGENT, sort="-priority,due_date")
+    assert names(open_view(client, auth_headers, view_id)) == ["first"]
+    loads = view_cache.loads
+
+    second = create_task(project_id, "second", due_date=in_days(1), priority="medium", assignee_id=me)
+    client.put(f"/tasks/{second}", json={"priority": "high"}, headers=auth_headers)
+    client.put(f"/tasks/{first}", json={"status": "in_progress"}, headers=auth_headers)
+    with query_budget(2, db.get_bind()) as profile:
+        response = open_view(client, auth_headers, view_id)
+    assert not any("FROM tasks" in record.statement for record in profile.records)
+    assert response.headers["X-View-Cache"] == "hit"
+    assert names(response) == ["second", "first"]
+
+    client.put(f"/tasks/{second}", json={"status": "done"}, headers=auth_headers)
+    client.post(f"/tasks/{first}/move", json={"parent_id": None}, headers=auth_headers)
+    assert names(open_view(client, auth_headers, view_id)) == ["first"]
+    assert view_cache.loads == loads
+
+
+def test_cached_pages_match_the_database(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    for i in range(7):
+        create_task(project_id, f"task {i}", due_date=in_days(i % 3) if i % 2 else None,
+                    priority=["low", "medium", "high"][i % 3])
+    filters = {"status": ["todo"]}
+    cached_id = create_view(client, auth_headers, project_id, filters, sort="-priority,due_date")
+    response = client.post(f"/projects/{project_id}/views/", json={"name": "Uncached", "filters": filters,
+                                                                   "sort": "-priority,due_date", "cached": False},
+                           headers=auth_headers)
+    uncached_id = response.json()["id"]
+    open_view(client, auth_headers, cached_id)
+
+    pages = {}
+    for view_id in (cached_id, uncached_id):
+        cursor, pages[view_id] = None, []
+        while True:
+            response = open_view(client, auth_headers, view_id, limit=3, **({"cursor": cursor} if cursor else {}))
+            pages[view_id].append(names(response))
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+    assert pages[cached_id] == pages[uncached_id]
+    assert sum(len(page) for page in pages[cached_id]) == 7
+
+
+def test_tampered_cursors_are_rejected(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    create_task(project_id, "task", priority="high")
+    cached_id = create_view(client, auth_headers, project_id, {}, sort="priority")
+    response = client.post(f"/projects/{project_id}/views/", json={"name": "Uncached", "sort": "priority",
+                                                                   "cached": False}, headers=auth_headers)
+    uncached_id = response.json()["id"]
+    open_view(client, auth_headers, cached_id)
+
+    for values in (["bogus", 1], ["high", "1"]):
+        payload = json.dumps({"s": [["priority", False]], "v": values}).encode()
+        cursor = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+        for view_id in (cached_id, uncached_id):
+            response = client.get(f"/views/{view_id}/tasks", params={"cursor": cursor}, headers=auth_headers)
+            assert response.status_code == 422
+            assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_bulk_changes_drop_cached_views(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    parent = create_task(project_id, "parent")
+    create_task(project_id, "child", parent_id=parent)
+    create_task(project_id, "other")
+    view_id = create_view(client, auth_headers, project_id, {})
+    open_view(client, auth_headers, view_id)
+
+    client.delete(f"/tasks/{parent}", headers=auth_headers)
+    response = open_view(client, auth_headers, view_id)
+    assert response.headers["X-View-Cache"] == "miss"
+    assert names(response) == ["other"]
+
+    client.post(f"/projects/{project_id}/archive", headers=auth_headers)
+    response = open_view(client, auth_headers, view_id)
+    assert response.headers["X-View-Cache"] == "off"
+    assert names(response) == ["other"]
+
+
+def test_views_are_private_and_validated(client, auth_headers, create_project, create_task):
+    project_id = create_project()
+    create_task(project_id, "high", priority="high")
+    create_task(project_id, "low", priority="low")
+    view_id = create_view(client, auth_headers, project_id, {"priority": ["high"]})
+    assert names(open_view(client, auth_headers, view_id)) == ["high"]
+
+    assert client.post(f"/projects/{project_id}/views/", json={"name": "Urgent"},
+                       headers=auth_headers).status_code == 409
+    assert client.post(f"/projects/{project_id}/views/", json={"name": "Bad", "sort": "status"},
+                       headers=auth_headers).status_code == 422
+    assert client.post(f"/projects/{project_id}/views/", json={"name": "Bad", "filters": {"due_within_days": -1}},
+                       headers=auth_headers).status_code == 422
+
+    response = client.put(f"/views/{view_id}", json={"filters": {"priority": ["low"]}}, headers=auth_headers)
+    assert response.json()["filters"]["priority"] == ["low"]
+    response = open_view(client, auth_headers, view_id)
+    assert response.headers["X-View-Cache"] == "miss"
+    assert names(response) == ["low"]
+    assert [view["name"] for view in client.get(f"/projects/{project_id}/views/", headers=auth_headers).json()] \
+        == ["Urgent"]
+
+    client.post("/auth/register", json={"email": "other", "password": "pass"})
+    token = client.post("/auth/login", data={"username": "other", "password": "pass"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+    assert client.get(f"/views/{view_id}/tasks", headers=other_headers).status_code == 404
+    assert client.post(f"/projects/{project_id}/views/", json={"name": "Mine"},
+                       headers=other_headers).status_code == 403
+
+    assert client.delete(f"/views/{view_id}", headers=auth_headers).status_code == 200
+    assert client.get(f"/views/{view_id}", headers=auth_headers).status_code == 404
+
+
+def test_sync_applies_changes_from_other_workers(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    first = create_task(project_id, "first", priority="high")
+    second = create_task(project_id, "second", priority="low")
+    view_id = create_view(client, auth_headers, project_id, {"priority": ["high"]})
+    cache = ViewCache()
+    cache.sync(db.get_bind())
+    view = db.get(SavedView, view_id)
+    cached = cache.load(db, view, load_filters(view), [])
+    assert list(cached.rows) == [first]
+
+    # Written by another worker: the task row and its activity log entry
+    now = datetime.utcnow()
+    db.execute(update(Task).where(Task.id == second).values(priority="high"))
+    db.add(ActivityEntry(project_id=project_id, task_id=second, actor_id=1, action="updated",
+                         changes='{"priority":"high"}', created_at=now))
+    db.commit()
+    assert cache.sync(db.get_bind()) == 1
+    tasks, _ = cache.page(cache.get(view), now)
+    assert [task.id for task in tasks] == [first, second]
+
+    db.add(ActivityEntry(project_id=project_id, task_id=first, actor_id=1, action="deleted", created_at=now))
+    db.commit()
+    cache.sync(db.get_bind())
+    assert cache.get(view) is None
+
+
+def test_older_writes_do_not_replace_newer_ones(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    task_id = create_task(project_id, "task", priority="high")
+    view_id = create_view(client, auth_headers, project_id, {"priority": ["high"]})
+    view = db.get(SavedView, view_id)
+    cached = view_cache.load(db, view, load_filters(view), [])
+    written = cached.rows[task_id]
+
+    # Same second, so updated_at cannot tell the writes apart
+    view_cache.task_changed(written.model_copy(update={"priority": "low"}), 4)
+    view_cache.task_changed(written, 3)
+    assert task_id not in cached.rows
+    view_cache.task_changed(written.model_copy(update={"name": "renamed"}), 5)
+    assert cached.rows[task_id].name == "renamed"
+
+
+def test_cached_results_expire(client, auth_headers, create_project, create_task, db):
+    project_id = create_project()
+    create_task(project_id, "task")
+    view_id = create_view(client, auth_headers, project_id, {})
+    cache = ViewCache(ttl_seconds=60)
+    view = db.get(SavedView, view_id)
+    cached = cache.load(db, view, load_filters(view), [])
+    assert cache.get(view) is cached
+
+    # Changes whose activity log entries were lost are picked up by the reload
+    cached.loaded_at -= 61
+    assert cache.get(view) is None
+    assert len(cache) == 0